@@ -8,7 +8,8 @@ import { useRouter, usePathname } from "../../navigation";
 import { affordabilityData } from "../../data/affordability";
 import { currencies } from "../../data/currency";
 import { countryDisplayNames } from "../../data/countryDisplayNames";
-import { calcMortgagePayment, calcMPS, calcYDP } from "../../lib/metrics";
+import { derivedMetrics, MORTGAGE_BURDEN_LTV } from "../../data/derivedMetrics";
+import { calcYDP } from "../../lib/metrics";
 import {
   generateAffordabilitySummary,
   getMetricsForYear,
@@ -135,10 +136,9 @@ export default function Home() {
           return null;
 
         const endYear = cData.realIncome.slice(-1)[0].year;
-        const metrics = getMetricsForYear(cData, endYear, countryCode);
-        const rate = cData.mortgageRate.slice(-1)[0]?.value ?? 0;
+        const metrics = derivedMetrics[countryCode]?.latest;
 
-        if (!metrics) {
+        if (!metrics || metrics.mortgageBurden === null) {
           return {
             countryCode,
             countryName:
@@ -152,14 +152,9 @@ export default function Home() {
           };
         }
 
+        // Precomputed at MORTGAGE_BURDEN_LTV; the payment scales linearly with the LTV.
         const currentLtv = 100 - downPaymentPct;
-        const payment = calcMortgagePayment(
-          rate,
-          metrics.housePrice,
-          currentLtv,
-          term,
-        );
-        const mps = calcMPS(metrics.income, payment);
+        const mps = metrics.mortgageBurden * (currentLtv / MORTGAGE_BURDEN_LTV);
 
         // Use shared sliders for YDP
         const computedYdp = calcYDP(
@@ -386,7 +381,6 @@ export default function Home() {
         title={t("Page.chartCard_PriceToIncomeRatio_title")}
         chartComponent={({ isComparing }) => (
           <AffordabilityTrendsChart
-            countryData={countryData}
             countryCode={selectedCountry}
             isComparing={isComparing}
           />
@@ -404,11 +398,8 @@ export default function Home() {
         title={t("Page.chartCard_MortgageBurden_title")}
         chartComponent={({ isComparing }) => (
           <MortgageBurdenChart
-            countryData={countryData}
             countryCode={selectedCountry}
             ltv={ltv}
-            term={term}
-            rate={latestMortgageRate}
             isComparing={isComparing}
           />
         )}
@@ -13,12 +13,11 @@ import {
   XAxis,
   YAxis,
 } from "../../lib/recharts";
-import { CountryData, affordabilityData } from "../../data/affordability";
 import { countryDisplayNames } from "../../data/countryDisplayNames";
-import { getMetricsForYear } from "../../lib/insights";
+import { derivedMetrics, rankings } from "../../data/derivedMetrics";
+import { pickComparisonCodes } from "../../lib/insights";
 
 interface AffordabilityTrendsChartProps {
-  countryData: CountryData;
   countryCode: string;
   isComparing?: boolean;
 }
@@ -38,76 +37,46 @@ const COMPARE_COLORS = [
 ];
 
 export function AffordabilityTrendsChart({
-  countryData,
   countryCode,
   isComparing = false,
 }: AffordabilityTrendsChartProps) {
   const t = useTranslations("Charts");
 
   const chartData = useMemo(() => {
-    // 1. Get base data for selected country
-    const years = countryData.realIncome.map((d) => d.year);
-    const baseData = years
-      .map((year) => {
-        const metrics = getMetricsForYear(countryData, year, countryCode);
-        if (!metrics) return null;
-        return {
-          year,
-          [countryCode]: parseFloat(metrics.pti.toFixed(2)),
-        };
-      })
-      .filter(Boolean) as ChartDataPoint[];
+    // PTI series are precomputed per country; this only merges them by year.
+    const ptiSeries = (code: string) => {
+      const series = derivedMetrics[code]?.pti;
+      if (!series || series.start === null) return [];
+      const start = series.start;
+      return series.values.flatMap((value, i) =>
+        value === null
+          ? []
+          : [{ year: start + i, val: parseFloat(value.toFixed(2)) }],
+      );
+    };
 
-    if (!isComparing) return baseData;
-
-    // 2. Identify comparison countries
-    const allCodes = Object.keys(affordabilityData).filter(
-      (c) => c !== countryCode,
+    const dataMap = new Map<number, ChartDataPoint>();
+    ptiSeries(countryCode).forEach((d) =>
+      dataMap.set(d.year, { year: d.year, [countryCode]: d.val }),
     );
-    const codeMetrics = allCodes
-      .map((c) => {
-        const cData = affordabilityData[c as keyof typeof affordabilityData];
-        const lastYear = cData.realIncome.slice(-1)[0]?.year;
-        if (!lastYear) return null;
-        const m = getMetricsForYear(cData, lastYear, c);
-        return m ? { code: c, val: m.pti } : null;
-      })
-      .filter(Boolean) as { code: string; val: number }[];
 
-    codeMetrics.sort((a, b) => b.val - a.val);
+    if (!isComparing) return Array.from(dataMap.values());
 
-    // Pick 5
-    let selectedCodes: string[] = [];
-    if (codeMetrics.length <= 5) {
-      selectedCodes = codeMetrics.map((c) => c.code);
-    } else {
-      const top2 = codeMetrics.slice(0, 2);
-      const bottom2 = codeMetrics.slice(-2);
-      const median = codeMetrics[Math.floor(codeMetrics.length / 2)];
-      selectedCodes = [...top2, median, ...bottom2].map((c) => c.code);
-    }
-
-    // 3. Merge data
-    // Create a map of year -> object
-    const dataMap = new Map<number, ChartDataPoint>();
-    baseData.forEach((d) => dataMap.set(d.year, { ...d }));
+    // Comparison countries: Top 2, Median, Bottom 2 by latest PTI
+    const selectedCodes = pickComparisonCodes(rankings.pti, countryCode);
 
     selectedCodes.forEach((code) => {
-      const cData = affordabilityData[code as keyof typeof affordabilityData];
-      cData.realIncome.forEach((d) => {
-        const m = getMetricsForYear(cData, d.year, code);
-        if (m) {
-          const existing = dataMap.get(d.year) || { year: d.year };
-          existing[code] = parseFloat(m.pti.toFixed(2));
-          dataMap.set(d.year, existing);
-        }
+      ptiSeries(code).forEach((d) => {
+        const existing = dataMap.get(d.year) || { year: d.year };
+        existing[code] = d.val;
+        dataMap.set(d.year, existing);
       });
     });
 
     return Array.from(dataMap.values())
       .sort((a, b) => a.year - b.year)
       .map((item) => ({ ...item, _comparisonCodes: selectedCodes }));
-  }, [countryData, countryCode, isComparing]);
+  }, [countryCode, isComparing]);
 
   const comparisonCodes =
     (chartData[0] as ChartDataPoint | undefined)?._comparisonCodes || [];
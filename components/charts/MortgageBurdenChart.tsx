@@ -14,17 +14,17 @@ import {
   Legend,
 } from "../../lib/recharts";
 import { useTranslations } from "next-intl";
-import { CountryData, affordabilityData } from "../../data/affordability";
 import { countryDisplayNames } from "../../data/countryDisplayNames";
-import { calcMortgagePayment, calcMPS } from "../../lib/metrics";
-import { getMetricsForYear } from "../../lib/insights";
+import {
+  MORTGAGE_BURDEN_LTV,
+  derivedMetrics,
+  rankings,
+} from "../../data/derivedMetrics";
+import { pickComparisonCodes } from "../../lib/insights";
 
 interface MortgageBurdenChartProps {
-  countryData: CountryData;
   countryCode: string;
   ltv: number;
-  term: number;
-  rate: number;
   isMini?: boolean;
   isComparing?: boolean;
 }
@@ -38,38 +38,29 @@ interface ChartDataPoint {
 const COMPARE_COLORS = ["#ef4444", "#f97316", "#8b5cf6", "#ec4899", "#3b82f6"];
 
 export function MortgageBurdenChart({
-  countryData,
   countryCode,
   ltv,
-  term,
-  rate,
   isMini = false,
   isComparing = false,
 }: MortgageBurdenChartProps) {
   const t = useTranslations("Charts");
 
   const chartData = useMemo(() => {
-    const processOne = (cData: CountryData, cCode: string) => {
-      return cData.realIncome
-        .map(({ year }) => {
-          const metrics = getMetricsForYear(cData, year, cCode);
-          if (!metrics) return null;
-          const cRate = cData.mortgageRate.slice(-1)[0]?.value ?? rate;
-
-          const payment = calcMortgagePayment(
-            cRate,
-            metrics.housePrice,
-            ltv,
-            term,
-          );
-          const mps = calcMPS(metrics.income, payment);
-          return { year, val: parseFloat(mps.toFixed(2)) };
-        })
-        .filter(Boolean) as { year: number; val: number }[];
+    // Burden series are precomputed at MORTGAGE_BURDEN_LTV; the payment scales linearly with the LTV.
+    const scale = ltv / MORTGAGE_BURDEN_LTV;
+    const processOne = (cCode: string) => {
+      const series = derivedMetrics[cCode]?.mortgageBurden;
+      if (!series || series.start === null) return [];
+      const start = series.start;
+      return series.values.flatMap((value, i) =>
+        value === null
+          ? []
+          : [{ year: start + i, val: parseFloat((value * scale).toFixed(2)) }],
+      );
     };
 
     // Base data
-    const base = processOne(countryData, countryCode);
+    const base = processOne(countryCode);
     const dataMap = new Map<number, ChartDataPoint>();
     base.forEach((d) =>
       dataMap.set(d.year, { year: d.year, [countryCode]: d.val }),
@@ -78,33 +69,13 @@ export function MortgageBurdenChart({
     if (!isComparing) return Array.from(dataMap.values());
 
     // Select comparison countries based on latest MPS
-    const allCodes = Object.keys(affordabilityData).filter(
-      (c) => c !== countryCode,
+    const selectedCodes = pickComparisonCodes(
+      rankings.mortgageBurden,
+      countryCode,
     );
-    const codeMetrics = allCodes
-      .map((c) => {
-        const cData = affordabilityData[c as keyof typeof affordabilityData];
-        const lastSeries = processOne(cData, c);
-        const lastVal = lastSeries[lastSeries.length - 1]?.val;
-        return lastVal ? { code: c, val: lastVal } : null;
-      })
-      .filter(Boolean) as { code: string; val: number }[];
-
-    codeMetrics.sort((a, b) => b.val - a.val);
-
-    let selectedCodes: string[] = [];
-    if (codeMetrics.length <= 5) {
-      selectedCodes = codeMetrics.map((c) => c.code);
-    } else {
-      const top2 = codeMetrics.slice(0, 2);
-      const bottom2 = codeMetrics.slice(-2);
-      const median = codeMetrics[Math.floor(codeMetrics.length / 2)];
-      selectedCodes = [...top2, median, ...bottom2].map((c) => c.code);
-    }
 
     selectedCodes.forEach((code) => {
-      const cData = affordabilityData[code as keyof typeof affordabilityData];
-      const series = processOne(cData, code);
+      const series = processOne(code);
       series.forEach((d) => {
         const existing = dataMap.get(d.year) || { year: d.year };
         existing[code] = d.val;
@@ -115,7 +86,7 @@ export function MortgageBurdenChart({
     return Array.from(dataMap.values())
       .sort((a, b) => a.year - b.year)
       .map((item) => ({ ...item, _comparisonCodes: selectedCodes }));
-  }, [countryData, countryCode, ltv, term, rate, isComparing]);
+  }, [countryCode, ltv, isComparing]);
 
   const comparisonCodes =
     (chartData[0] as ChartDataPoint | undefined)?._comparisonCodes || [];
@@ -16,6 +16,8 @@ import {
 import { useTranslations } from "next-intl";
 import { CountryData, affordabilityData } from "../../data/affordability";
 import { countryDisplayNames } from "../../data/countryDisplayNames";
+import { rankings } from "../../data/derivedMetrics";
+import { pickComparisonCodes } from "../../lib/insights";
 
 interface PriceToRentChartProps {
   countryData: CountryData;
@@ -59,29 +61,10 @@ export function PriceToRentChart({
 
     if (!isComparing || !countryCode) return Array.from(dataMap.values());
 
-    const allCodes = Object.keys(affordabilityData).filter(
-      (c) => c !== countryCode,
+    const selectedCodes = pickComparisonCodes(
+      rankings.priceToRent,
+      countryCode,
     );
-    const codeMetrics = allCodes
-      .map((c) => {
-        const cData = affordabilityData[c as keyof typeof affordabilityData];
-        const series = processOne(cData);
-        const lastVal = series[series.length - 1]?.val;
-        return lastVal ? { code: c, val: lastVal } : null;
-      })
-      .filter(Boolean) as { code: string; val: number }[];
-
-    codeMetrics.sort((a, b) => b.val - a.val);
-
-    let selectedCodes: string[] = [];
-    if (codeMetrics.length <= 5) {
-      selectedCodes = codeMetrics.map((c) => c.code);
-    } else {
-      const top2 = codeMetrics.slice(0, 2);
-      const bottom2 = codeMetrics.slice(-2);
-      const median = codeMetrics[Math.floor(codeMetrics.length / 2)];
-      selectedCodes = [...top2, median, ...bottom2].map((c) => c.code);
-    }
 
     selectedCodes.forEach((code) => {
       const cData = affordabilityData[code as keyof typeof affordabilityData];
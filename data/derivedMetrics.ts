@@ -0,0 +1,76 @@
+// This file is generated by scripts/01_fetch_affordability_data.py. Do not edit manually.
+
+// Loan assumptions mortgageBurden was computed with; the payment scales linearly with the LTV.
+export const MORTGAGE_BURDEN_LTV = 90;
+export const MORTGAGE_BURDEN_TERM = 30;
+
+export type DerivedSeries = {
+  readonly start: number | null;
+  readonly values: readonly (number | null)[];
+};
+
+export type DerivedSnapshot = {
+  readonly year: number;
+  readonly housePrice: number;
+  readonly income: number;
+  readonly pti: number;
+  readonly mortgageBurden: number | null;
+  readonly mortgageRate: number | null;
+};
+
+export type DerivedCountryMetrics = {
+  readonly housePrice: DerivedSeries;
+  readonly pti: DerivedSeries;
+  readonly mortgageBurden: DerivedSeries;
+  readonly latest: DerivedSnapshot | null;
+};
+
+export const derivedMetrics: { readonly [countryCode: string]: DerivedCountryMetrics } = {
+  "AUS": {"housePrice":{"start":2012,"values":[373753.35,389780.55,418057.2,450000.0,471806.1,504916.64999999997,489464.55,461293.2,480151.35,552147.2999999999,559698.75,535401.9]},"pti":{"start":2012,"values":[7.681548719521454,7.960789143266811,8.485177886615311,9.202140437496995,9.721102336499992,10.315918224692327,9.916908964395937,9.114873101727573,9.258405769059445,10.015663965555046,9.734077978570209,9.084405806073248]},"mortgageBurden":{"start":2012,"values":[39.33077366837311,40.760529868119434,43.44548517231067,47.11644956335388,49.77361854547909,52.819172238758604,50.776180196226846,46.66962666902445,47.4045371745715,51.28182179807439,49.840055934617624,46.51362918031201]},"latest":{"year":2023,"housePrice":535401.9,"income":58936.3698,"pti":9.084405806073248,"mortgageBurden":46.51362918031201,"mortgageRate":3.9422}},
+  "AUT": {"housePrice":{"start":2007,"values":[195761.25,193929.25000000003,200921.5,214654.5,219420.5,228693.99999999997,235400.75000000003,239877.5,250000.0,263224.25,271561.0,281786.25,293639.75,312744.0,342007.5,354588.25]},"pti":{"start":2007,"values":[7.730537533468885,7.461844721592873,7.596121169416921,8.133328655646476,8.394357364247881,8.836613302091008,8.980849399238982,9.167985696264479,9.594947377470602,9.651649110087549,10.105372531887857,10.47276202164036,10.673249439936534,11.271543847514375,12.422005635057534,12.38969941324164]},"mortgageBurden":{"start":2007,"values":[29.667709725953845,28.636539472439683,29.15185611889913,31.213512982353503,32.215270482837695,33.91252901521065,34.46606809883377,35.18424653277911,36.822809849662015,37.04041574536528,38.78168337592264,40.19162475336947,40.96104117544429,43.2571331015016,47.67229391222943,47.548311380998356]},"latest":{"year":2022,"housePrice":354588.25,"income":28619.6007,"pti":12.38969941324164,"mortgageBurden":47.548311380998356,"mortgageRate":1.7112}},
+  "BEL": {"housePrice":{"start":2018,"values":[230000.0,235162.61178047073,243022.88473976307,252632.16140538407,241101.2966340959]},"pti":{"start":2018,"values":[8.914709677944485,8.915391770721916,9.161864259426016,9.126310752336524,9.0546463269319]},"mortgageBurden":{"start":2018,"values":[34.31626296626927,34.318888612640635,35.26765924476189,35.13079965620178,34.854934781589435]},"latest":{"year":2022,"housePrice":241101.2966340959,"income":26627.3566,"pti":9.0546463269319,"mortgageBurden":34.854934781589435,"mortgageRate":1.7333}},
+  "CAN": {"housePrice":{"start":1985,"values":[157832.84,177130.36000000002,199467.4,226651.91999999998,245368.64,227499.36,227126.68,226652.80000000002,226514.63999999998,231115.28,218169.15999999997,214847.6,217116.24,211315.28,214526.4,219018.36,224660.47999999998,237935.72,253498.96000000002,269750.36,286393.8,314470.2,344987.28,357001.04000000004,350547.11999999994,376942.72000000003,389118.83999999997,402434.56,408321.75999999995,421815.68,440000.0,479941.87999999995,529895.96,540601.6,539722.48,570543.6000000001,635813.2,669223.28,633005.56]},"pti":{"start":1985,"values":[4.882004434839063,5.438273393676524,6.113164520019062,6.761147984817463,7.154501042355086,6.858850344852057,7.217036333852607,7.165159614959544,7.233361078798243,7.346342647856637,6.939222844952307,6.839631008656698,6.861315236035543,6.419451428185777,6.44462519017979,6.4479797536512375,6.410200621246007,6.732450041918418,7.180378161563217,7.516421624775506,7.842350382699238,8.452488382559762,8.98979761846165,9.035893293325925,8.82625108925973,9.44281072494448,9.64519322695915,9.779845470423172,9.873504036806267,10.04218051839737,10.390837170858426,11.314072645576259,12.213147813151103,12.366340804867061,12.141761172722626,12.134188526987653,13.608726866334893,14.592938726957533,13.882605712553472]},"mortgageBurden":{"start":1985,"values":[23.269551558503043,25.920948006587135,29.137744318514606,32.22628814194539,34.10116338534902,32.69197598278147,34.3992311583611,34.15196633075184,34.47704130770899,35.015555862837935,33.075062901265646,32.60036907408499,32.703724622760355,30.597628080687965,30.71761612257931,30.733605290286338,30.553535099635642,32.08950246900605,34.2245039041126,35.82621910070563,37.379723637240346,40.28788110310394,42.84890806130476,43.06861816136608,42.06938103623279,45.008146541866985,45.97278107426565,46.61458657927384,47.06100011052636,47.86497850454034,49.52681311754496,53.92731618269505,58.21266173001886,58.942839726928696,57.87240494979463,57.836310744491,64.86453990126381,69.55568038278687,66.16995410518939]},"latest":{"year":2023,"housePrice":633005.56,"income":45597.0279,"pti":13.882605712553472,"mortgageBurden":66.16995410518939,"mortgageRate":3.3612}},
+  "CHE": {"housePrice":{"start":2006,"values":[433297.8,451255.2,460510.80000000005,466201.19999999995,477579.0,510960.60000000003,540951.6000000001,559945.2,576025.2,600000.0,610971.0000000001,618286.2000000001,629794.2000000001,655153.7999999999,686230.8,731232.6,768295.7999999999]},"pti":{"start":2006,"values":[8.990817486024069,9.143871868056582,9.28180732242243,9.312199369240938,9.415382332954817,9.735980139325036,10.064727008460153,10.958057597218646,11.059055572398757,11.621737996052095,11.66049729010922,11.900870729135121,12.22787376445061,12.778843116226257,13.244555509805581,13.806761276653843,14.880569557639676]},"mortgageBurden":{"start":2006,"values":[30.47374762157377,30.992514754560847,31.460037338680262,31.563049057680214,31.91278050311892,32.99942436554223,34.113688906778776,37.14157051451642,37.48389609399936,39.39106885066602,39.52244076950691,40.33716974461864,41.44552368297664,43.31299580098291,44.89149541664482,46.797052578377794,50.43665071276159]},"latest":{"year":2022,"housePrice":768295.7999999999,"income":51630.806,"pti":14.880569557639676,"mortgageBurden":50.43665071276159,"mortgageRate":0.8288}},
+  "CHL": {"housePrice":{"start":2009,"values":[36709255.0,38332360.0,41677570.0,44876095.0,48165480.0,51374785.0,55000000.0,56576739.99999999,59716360.0,64550695.00000001,68720685.0,69599200.0,74521425.00000001,71902874.99999999]},"pti":{"start":2009,"values":[11.814193810355428,11.879635933810045,12.455042175667392,12.328502553633802,12.243960698659397,12.66961056543115,13.170157476770237,13.204046844761995,13.591985028259364,14.93308243498117,16.162615230049976,16.646562658110746,16.139400670735068,14.227698516312678]},"mortgageBurden":{"start":2009,"values":[78.64438848880728,79.08002175021412,82.91036961397177,82.0680242661484,81.50524845656723,84.33870235278359,87.67072875967385,87.89632253820555,90.4787383765057,99.40611735374195,107.59083620526138,110.81236364517946,107.43630218875,94.71053779714983]},"latest":{"year":2022,"housePrice":71902874.99999999,"income":5053724.9519,"pti":14.227698516312678,"mortgageBurden":94.71053779714983,"mortgageRate":6.26}},
+  "CZE": {"housePrice":{"start":2008,"values":[2750547.5,2617215.0,2512090.0,2482290.0,2401312.5,2387027.5,2417957.5,2500000.0,2650782.5,2875935.0,3035250.0,3219127.4999999995,3388615.0,3892517.5,3983007.5]},"pti":{"start":2008,"values":[11.931399069604744,11.229543736320082,10.76974587745629,10.812189383430798,10.742939160246717,10.582882458781222,10.423147584349744,10.345217058657942,10.49538385616709,10.931357006758347,10.98516705600918,11.268216707065658,12.284548922097198,12.789709059626322,13.982066783052755]},"mortgageBurden":{"start":2008,"values":[64.02242540810312,60.256355690682696,57.789136720788,58.01688337308411,57.64529516096976,56.7864505132581,55.929332749976325,55.511167098235795,56.31694373316496,58.656322237800715,58.9450603685321,60.463870112958276,65.91738424379226,68.62801164259376,75.02605708240432]},"latest":{"year":2022,"housePrice":3983007.5,"income":284865.4324,"pti":13.982066783052755,"mortgageBurden":75.02605708240432,"mortgageRate":4.3335}},
+  "DEU": {"housePrice":{"start":2008,"values":[214552.32,216525.12,215201.27999999997,218355.84,222414.0,225824.40000000002,230393.28,240000.0,256199.75999999998,267389.76,280418.16000000003,292419.83999999997,313347.12,338559.83999999997]},"pti":{"start":2008,"values":[10.162282387472532,10.269081855997706,10.219607080004794,10.38295374860896,10.357983224374038,10.536138076837771,10.60832834330609,10.881886193606892,11.36084607643501,11.541034864147086,11.88020526038368,11.975244818681764,12.147705641922418,13.06406952100977]},"mortgageBurden":{"start":2008,"values":[28.80464798847951,29.10736749369781,28.967132903430816,29.430133547364317,29.35935543539595,29.864329378944632,30.068950263754697,30.8443407992621,32.201936494740366,32.712675559413036,33.67404265188349,33.943429086680034,34.4322634957075,37.02966612240558]},"latest":{"year":2021,"housePrice":338559.83999999997,"income":25915.3428,"pti":13.06406952100977,"mortgageBurden":37.02966612240558,"mortgageRate":-0.3738}},
+  "DNK": {"housePrice":{"start":2011,"values":[1851265.9999999998,1760854.0,1815426.0,1872330.0,2000000.0,2089423.9999999998,2172058.0000000005,2256704.0,2288448.0,2382964.0,2608946.0000000005,2535806.0]},"pti":{"start":2011,"values":[7.809822640863589,7.531571473059106,7.796550639033077,7.930698632436661,8.425274137357244,8.698449629443349,8.973179107176328,9.105107901930081,9.08835583796664,9.126374495848662,9.839105382326396,10.144681234764905]},"mortgageBurden":{"start":2011,"values":[29.01936862859977,27.985456133889926,28.970053153553778,29.468513906170195,31.306234114676652,32.32128665423973,33.34211341997975,33.832328179487114,33.77008165459148,33.911349580711885,36.55968121112123,37.69512547326277]},"latest":{"year":2022,"housePrice":2535806.0,"income":249964.0887,"pti":10.144681234764905,"mortgageBurden":37.69512547326277,"mortgageRate":1.4777}},
+  "ESP": {"housePrice":{"start":2007,"values":[295397.46,281139.66000000003,265093.56,255439.08,230549.03999999998,192583.8,173322.18,173641.13999999998,180000.0,187955.28000000003,196621.02,206939.34000000003,215357.75999999998,220061.7,223221.96000000002,224872.38000000003]},"pti":{"start":2007,"values":[18.015092154300753,15.387279812871538,14.686088695815222,15.27246479653992,14.316089342009302,12.535737505560352,11.719109778340208,11.709995647759573,11.79630053859549,11.793500607763916,12.118320194312206,12.641088797175918,12.402255992447905,12.734233496147715,12.582949315392836,12.61112776257368]},"mortgageBurden":{"start":2007,"values":[73.86189487078666,63.08786178561792,60.212977542520704,62.61712011006955,58.69597984198174,51.39653562873573,48.04836117479023,48.010993230789744,48.36484336484168,48.353363645784135,49.685124257837096,51.82847602399776,50.849261298731754,52.2103693778757,51.59010409370048,51.7056357537923]},"latest":{"year":2022,"housePrice":224872.38000000003,"income":17831.2665,"pti":12.61112776257368,"mortgageBurden":51.7056357537923,"mortgageRate":2.1986}},
+  "EST": {"housePrice":{"start":2021,"values":[120000.0,124724.64064174546]},"pti":{"start":2021,"values":[8.261716358216978,10.130010142363943]},"mortgageBurden":{"start":2021,"values":[34.26964717910758,42.01934058826912]},"latest":{"year":2022,"housePrice":124724.64064174546,"income":12312.3905,"pti":10.130010142363943,"mortgageBurden":42.01934058826912,"mortgageRate":2.2858}},
+  "FIN": {"housePrice":{"start":1988,"values":[206556.71999999997,245259.36,222450.72,187248.95999999996,154790.16,134183.76,138728.63999999998,135705.59999999998,142360.8,161689.20000000004,173145.36000000002,182717.99999999997,184286.64,176880.24,184459.68,194227.91999999998,209496.24,223702.8,235991.28,245177.76,239039.52000000002,237945.60000000003,249436.80000000002,249110.63999999998,248119.43999999997,245087.04,241109.52000000002,240000.0,242713.68,242855.03999999998,241976.63999999998,240632.63999999996,243939.12,249645.83999999997,236875.92,212819.52000000002]},"pti":{"start":1988,"values":[11.053091270857534,12.56419514396535,10.885750302425425,9.21394110640517,8.106380276090594,7.429117269814674,7.758045218735233,7.464139575740302,7.717561141215959,8.639532096570903,9.038583277199784,9.25000173135684,9.196420912684143,8.493944238474633,8.648159192567524,8.905227076277326,9.151480389694239,9.487162437403802,9.896252950224994,9.877477749033671,9.499018855959859,9.25459388333114,9.645933659139647,9.593193013365296,9.563627519857436,9.468612711256704,9.354530812448768,9.340883881137252,9.427554342184667,9.297049746142786,9.196784946635672,9.040573459190298,9.161959277148776,9.270058802264307,9.113245229391909,8.334642942809042]},"mortgageBurden":{"start":1988,"values":[50.57005096713798,57.48364626885969,49.8044333588935,42.15557982296181,37.08827274427265,33.98966223737929,35.494571835410525,34.14989612600331,35.309349275192915,39.5275464347015,41.35328351117942,42.32056422388872,42.07542151541554,38.86145355410289,39.567017083550475,40.74315285069956,41.86980984693314,43.40562076583716,45.2772897475351,45.19138953573943,43.4598661960046,42.341574215908,44.132030109480766,43.89073135608309,43.755463449854616,43.320752146398675,42.79880518190053,42.736367806232785,43.13290209018184,42.53581807888049,42.07708704183086,41.362388982420725,41.91775280331241,42.412329239954076,41.69487652214249,38.13261901872001]},"latest":{"year":2023,"housePrice":212819.52000000002,"income":25534.3296,"pti":8.334642942809042,"mortgageBurden":38.13261901872001,"mortgageRate":3.0375}},
+  "FRA": {"housePrice":{"start":2020,"values":[220000.0,231539.12753554608,234794.35995611866]},"pti":{"start":2020,"values":[9.29799193085604,9.815672994990893,9.95793907900875]},"mortgageBurden":{"start":2020,"values":[35.63218819972003,37.6160691540011,38.1612677213755]},"latest":{"year":2022,"housePrice":234794.35995611866,"income":23578.6098,"pti":9.95793907900875,"mortgageBurden":38.1612677213755,"mortgageRate":1.7008}},
+  "GBR": {"housePrice":{"start":2002,"values":[143627.22,163899.252,179792.316,188630.44199999998,197301.456,213715.458,196290.072,177066.44999999998,185607.378,175995.864,173852.514,174426.318,186174.05399999997,198000.0,209211.552,214898.904,217438.65,216551.01600000003,221840.784,233659.008,235299.24,220631.79599999997]},"pti":{"start":2002,"values":[8.983479004174932,10.172601407411586,10.92838561115767,11.295062090420977,11.619131998119023,12.316538942580646,11.336469722745766,10.397211201481293,10.85569992861082,10.451929546661905,10.352514054265038,10.319715901802674,10.74074718942049,11.245691558317693,11.715011809726146,11.897358237644692,12.180149495458373,11.646477525818973,12.174802923955404,12.623832742312393,12.748234403111947,11.98731368627726]},"mortgageBurden":{"start":2002,"values":[46.64627171305561,52.820731150839194,56.745103357641405,58.64905289373471,60.331769908098835,63.95302107491408,58.864059982582894,53.98700643001778,56.36768653547779,54.27112873895816,53.75491869731657,53.5846159080815,55.7708001060733,58.39269884047342,60.82962110160014,61.7764459362372,63.244825596714335,60.47376021214873,63.21706378784887,65.5486289759692,66.19457846486037,62.243535167150355]},"latest":{"year":2023,"housePrice":220631.79599999997,"income":18405.4411,"pti":11.98731368627726,"mortgageBurden":62.243535167150355,"mortgageRate":4.0583}},
+  "GRC": {"housePrice":{"start":2004,"values":[215781.6,233099.24999999997,255829.80000000002,262188.45,256796.09999999998,245752.94999999998,225925.2,207499.8,181485.44999999998,164499.30000000002,155923.05000000002,150000.0,147685.2,145760.25,148281.30000000002,158882.25,167994.6,179037.6,188241.0]},"pti":{"start":2004,"values":[16.489674879179145,17.913128287321292,19.44102277717876,19.00674356637065,18.5671270183869,17.229275748903106,18.55676489437898,20.738694417272008,20.486084701885282,19.908531948410083,18.659583359950325,17.79504260720437,17.02736260086481,16.394970954766066,16.144117583366988,16.22326030920598,16.893815167535568,16.79609751177171,18.605427434494]},"mortgageBurden":{"start":2004,"values":[79.83753216069664,86.72942105993123,94.12697900852187,92.02434322499934,89.89586582655505,83.41843406781817,89.84569586172574,100.40987433902858,99.18682194872603,96.39050323001699,90.343508742326,86.15768939432049,82.44083762833169,79.3790071948333,78.16445843911582,78.5476412468881,81.79424528606152,81.32112883337965,90.08130372785534]},"latest":{"year":2022,"housePrice":188241.0,"income":10117.5316,"pti":18.605427434494,"mortgageBurden":90.08130372785534,"mortgageRate":3.4867}},
+  "HUN": {"housePrice":{"start":2007,"values":[18959925.0,18359670.0,16718819.999999998,15749025.000000002,14726580.0,13470540.0,12937755.0,13328655.0,15000000.0,16846815.0,18305280.0,20221500.0,22644375.0,23115000.0,25435214.999999996,27189780.0]},"pti":{"start":2007,"values":[11.921341066583702,10.968607778903179,10.364066522996465,9.9356658061455,9.143946205500182,9.017027963024853,8.59796895983808,8.333899406328229,8.871085225389562,9.609895787228517,10.180309236251784,10.25227422549007,10.484080525092354,10.902396607832912,10.964451037092726,11.373286753864535]},"mortgageBurden":{"start":2007,"values":[90.64921537875671,83.40468437246345,78.80778623776928,75.55025097950112,69.53005910698992,68.56497984003659,65.37847845364762,63.370508234744506,67.45523936847587,73.07311384838384,77.41050603493821,77.95772381628976,79.72036604432745,82.90121830490398,83.37307673859532,86.48184082286933]},"latest":{"year":2022,"housePrice":27189780.0,"income":2390670.4006,"pti":11.373286753864535,"mortgageBurden":86.48184082286933,"mortgageRate":7.5708}},
+  "IRL": {"housePrice":{"start":2004,"values":[254852.59999999998,272408.0,304253.60000000003,316998.8,293539.4,256919.80000000002,225934.0,185416.40000000002,158155.8,157838.19999999998,181401.19999999998,200000.0,213171.40000000002,233747.99999999997,253831.19999999998,255403.8,255995.6,269132.2,281368.60000000003]},"pti":{"start":2004,"values":[10.307389216514157,10.675766772071745,11.008532819970185,11.603242650805884,11.786523246354673,10.930347653991689,9.692068325963028,8.341346923709605,7.11247896752053,6.974951366570468,7.52939666206372,7.930655930673378,8.28364023778574,8.309384681937921,8.958715994456202,8.613565770331125,8.184604759202472,8.458356200533808,9.098256236806947]},"mortgageBurden":{"start":2004,"values":[39.744274242970754,41.16470169414129,42.44781469090634,44.7409570294003,45.44766889405322,42.14634041714912,37.371657694998426,32.163409446159605,27.42501604379084,26.894723205000993,29.032609474154718,30.579825561484096,31.94089816781023,32.0401662003958,34.543923574564545,33.21305841807352,31.559027149076307,32.61458565474033,35.08197695970626]},"latest":{"year":2022,"housePrice":281368.60000000003,"income":30925.5524,"pti":9.098256236806947,"mortgageBurden":35.08197695970626,"mortgageRate":1.7456}},
+  "ISL": {"housePrice":{"start":2004,"values":[35104760.0,44520000.0,48449000.0,50598279.99999999,46940120.0,36670280.0,34219040.0,34551240.0,34968680.0,35659320.0,37617880.0,40000000.0,42880680.0,51303480.00000001]},"pti":{"start":2004,"values":[8.480129376747202,10.36109905981898,10.495683440288843,9.999362184021194,9.330462512533769,8.328095630835255,8.39329669688373,8.667434676118425,8.481921093206521,8.31454657071481,8.86865851678217,8.47143808258743,8.50955326799493,9.822937249594231]},"mortgageBurden":{"start":2004,"values":[48.37495238520586,59.104955998843565,59.872693459886825,57.04142567221038,53.22568320872736,47.5076749071521,47.87961480634848,49.44343666605007,48.3851732432325,47.43038420684886,50.591319354911924,48.32537284196235,48.54280116142844,56.03500850293116]},"latest":{"year":2017,"housePrice":51303480.00000001,"income":5222824.7719,"pti":9.822937249594231,"mortgageBurden":56.03500850293116,"mortgageRate":4.8583}},
+  "ISR": {"housePrice":{"start":2011,"values":[1149596.0000000002,1164013.2,1243912.6,1317244.5999999999,1400000.0,1516761.4000000001,1574588.4,1550137.4000000001,1568369.5999999999,1622016.2,1735053.6,1944850.5999999999]},"pti":{"start":2011,"values":[16.536938017066387,15.982901477189047,15.916006753943243,16.343918215559064,16.663691007558175,17.876570522115184,17.567600714256645,16.638557849726183,17.494464053202975,18.177603469127128,19.26009599443707,22.018822265622745]},"mortgageBurden":{"start":2011,"values":[71.68000271564436,69.27850972812823,68.98855194156744,70.8433508589379,72.22941849583843,77.48669204959265,76.1474503687267,72.12047784311356,75.83043665932475,78.79153109761022,83.48363716185283,95.44144376463699]},"latest":{"year":2022,"housePrice":1944850.5999999999,"income":88326.7314,"pti":22.018822265622745,"mortgageBurden":95.44144376463699,"mortgageRate":2.6192}},
+  "ITA": {"housePrice":{"start":2004,"values":[253918.77000000002,267284.43,276854.97,284625.18,280595.69999999995,271510.47,266068.32,262084.83000000002,248695.86000000002,230011.74,218611.05,210000.0,209434.89,204434.58,200630.43000000002,198645.30000000002,201893.37000000002,204057.0,198472.26]},"pti":{"start":2004,"values":[13.219213808022996,13.975949801111119,14.210557736952355,14.238840185680061,14.485254863498849,13.913160995322375,13.785134992047114,14.06104318141463,13.977604817791331,12.995901392314327,12.422825181685004,11.503183738902269,11.369676096223749,11.031827179546765,10.659338241669236,10.141247357603959,10.558310798043053,10.377090217158223,10.125113336132472]},"mortgageBurden":{"start":2004,"values":[61.40539112670498,64.92055249031267,66.01034438497258,66.14172094422696,67.28635706938293,64.62888830862764,64.03418676890863,65.31582503644997,64.92824031108972,60.36806875419614,57.70603685349823,53.434153267189345,52.81398862380462,51.244625636597874,49.51435413536391,47.1077379903175,49.04506528199566,48.203266305819945,47.032792845069764]},"latest":{"year":2022,"housePrice":198472.26,"income":19601.9791,"pti":10.125113336132472,"mortgageBurden":47.032792845069764,"mortgageRate":3.1568}},
+  "JPN": {"housePrice":{"start":2018,"values":[30000000.0]},"pti":{"start":2018,"values":[12.259947580773925]},"mortgageBurden":{"start":2018,"values":[37.14060774311122]},"latest":{"year":2018,"housePrice":30000000.0,"income":2446992.5179,"pti":12.259947580773925,"mortgageBurden":37.14060774311122,"mortgageRate":0.065}},
+  "KOR": {"housePrice":{"start":2011,"values":[354038650.0,350350350.0,342658400.0,343709800.0,350000000.0,351024100.0,348416600.0,348323150.0,344858850.0,353088400.0,374632999.99999994,366404850.00000006]},"pti":{"start":2011,"values":[16.15303387090215,15.49114485256792,14.333283923722176,14.400805409474469,14.297385620915033,13.904864699065884,13.538779871397198,13.20166224324446,12.577344119564438,12.25203963362084,12.6143799344218,12.045395017730877]},"mortgageBurden":{"start":2011,"values":[77.0138981924038,73.85816572257426,68.3377548568656,68.65968155318079,68.1666001214911,66.29515191211577,64.54974483421398,62.9424466077063,59.965843401086495,58.414867481502576,60.14242152861928,57.429634147792676]},"latest":{"year":2022,"housePrice":366404850.00000006,"income":30418666.1758,"pti":12.045395017730877,"mortgageBurden":57.429634147792676,"mortgageRate":3.3635}},
+  "LTU": {"housePrice":{"start":2006,"values":[126275.19999999998,150785.8,148186.8,99489.90000000001,90762.5,92725.3,89465.2,89716.5,95485.7,100000.0,104227.19999999998,109385.5,114435.70000000001,119661.8,126855.6,140677.8,141548.5]},"pti":{"start":2006,"values":[24.07786958508352,24.60990765453915,23.515139378092936,19.59901544249919,19.177454391940792,18.028280072843152,17.013012657888922,16.615754702037357,16.523313673528886,15.751454646836635,15.242205339474951,15.049927184606611,14.515319101486254,13.715474683077126,13.23370813101137,14.960697883017508,16.200565005699158]},"mortgageBurden":{"start":2006,"values":[79.10080281071608,80.8486583787135,77.25211719584041,64.38683664777936,63.001921034084184,59.22664470040079,55.89128036068395,54.586205461106054,54.2825174814935,51.74680025566889,50.07381050461277,49.44213682769947,47.685838230994875,45.05818318052364,43.47547998906853,49.14900003812609,53.22222106942072]},"latest":{"year":2022,"housePrice":141548.5,"income":8737.257,"pti":16.200565005699158,"mortgageBurden":53.22222106942072,"mortgageRate":0.6133}},
+  "LUX": {"housePrice":{"start":2015,"values":[450000.0,473454.45,489151.80000000005,514256.8500000001,558484.2000000001,633377.2499999999,710703.0,738204.3]},"pti":{"start":2015,"values":[11.394839808809781,11.427865870560908,10.946367610482739,12.718070863830361,13.853774784651554,14.223327877044232,15.589149952685801,16.376744879092477]},"mortgageBurden":{"start":2015,"values":[43.8283520145682,43.95538125625743,42.10337845576239,48.917939709448504,53.2862355399518,54.70765991214315,59.96106686870304,62.99041947555162]},"latest":{"year":2022,"housePrice":738204.3,"income":45076.3754,"pti":16.376744879092477,"mortgageBurden":62.99041947555162,"mortgageRate":1.7275}},
+  "LVA": {"housePrice":{"start":2006,"values":[113963.68000000001,140699.75999999998,124580.16,75974.64,69258.4,73421.76,73925.68,78802.16,82880.08,80000.0,86183.68000000001,91152.87999999999,97282.8,102577.76,105900.16,114439.68,114644.4]},"pti":{"start":2006,"values":[21.212397140134073,20.200319458475455,17.904530487130803,13.506644207101296,13.016247267953249,13.724106720297689,13.585497199355068,12.884891026813788,12.268943508793662,10.798387849286847,11.306505070399407,11.242450883419664,11.005257189462652,11.021690231693924,10.85531078569442,11.061988146607712,11.864198472723139]},"mortgageBurden":{"start":2006,"values":[87.83338511445322,83.64271264157766,74.13662450219847,55.92646009826351,53.89589170325431,56.82689905117172,56.252963755077865,53.351989793490404,50.80155877887423,44.71248356873114,46.81642567722699,46.55119888385622,45.569059763491154,45.63710345121612,44.948182257677146,45.80396353103404,49.12564603824935]},"latest":{"year":2022,"housePrice":114644.4,"income":9663.0548,"pti":11.864198472723139,"mortgageBurden":49.12564603824935,"mortgageRate":2.2725}},
+  "MEX": {"housePrice":{"start":2012,"values":[913713.9999999999,938906.9999999999,932403.0000000001,1000000.0,1016381.9999999999,1037151.9999999999,1081273.0000000002,1144531.9999999998,1155013.0,1181166.9999999998,1180153.0]},"pti":{"start":2012,"values":[18.28146344512027,19.11954034792848,19.330809860823365,19.15767312894574,18.09707586564232,18.102137450504692,18.506670032558265,20.059839219757336,20.74166030460062,19.409815293291896,17.874996495137335]},"mortgageBurden":{"start":2012,"values":[183.9606519736178,192.3939578688185,194.51989693551099,192.777676124119,182.10521739977057,182.1561505460199,186.2268354647926,201.85589148430623,208.7168439279472,195.31490390582263,179.8705021150436]},"latest":{"year":2022,"housePrice":1180153.0,"income":66022.5584,"pti":17.874996495137335,"mortgageBurden":179.8705021150436,"mortgageRate":10.7267}},
+  "NLD": {"housePrice":{"start":2011,"values":[272800.32,251791.44,232161.12,232014.71999999997,240000.0,250908.48,265908.72,284754.48,298420.08,315770.88,346441.92,365400.48,334841.76]},"pti":{"start":2011,"values":[11.314372759013903,10.652330810063772,9.29045571270211,9.29961212375881,9.56175298804781,9.71826666825779,10.243780892134328,10.908733212054134,11.194359346821274,11.54711811875755,12.497575280374642,13.736648058595575,12.097238088684437]},"mortgageBurden":{"start":2011,"values":[50.157385149248455,47.22250809280747,41.18522301846524,41.22581401239283,42.38790232020692,43.08173812592263,45.41137847716391,48.359157406361106,49.62535751796634,51.189161183060165,55.40260252342173,60.895496552007124,53.627880482628356]},"latest":{"year":2023,"housePrice":334841.76,"income":27679.1907,"pti":12.097238088684437,"mortgageBurden":53.627880482628356,"mortgageRate":2.792}},
+  "NOR": {"housePrice":{"start":2004,"values":[1869336.0,2000763.0,2233670.9999999995,2483214.0,2374914.0,2360700.0,2502840.0,2673582.0,2825343.0,2880552.0,2893389.0,3000000.0,3114797.9999999995,3206862.0,3178116.0,3183714.0000000005,3268236.0,3510297.0,3492875.9999999995]},"pti":{"start":2004,"values":[6.435575571580836,6.571722101733915,7.014603357113606,7.470272828769652,6.856106640491369,6.878470360499014,7.253050900096186,7.502733923894551,7.678971910607201,7.678162505161765,7.6238555795747915,7.892775695049667,8.356885352734071,8.536361796353306,8.42618713838101,8.298626561943383,8.462297004956952,9.095980739414955,9.070833921392722]},"mortgageBurden":{"start":2004,"values":[28.84940942284389,29.459727326223113,31.4450761920765,33.48775209620967,30.73456683372113,30.834818956867267,32.51398925460866,33.6332687501835,34.42330870511514,34.419680300969354,34.17623312000964,35.381748683781886,37.46226026859797,38.26681758381187,37.77292643444824,37.20109765939446,37.9347998074615,40.77547836008474,40.66275016029344]},"latest":{"year":2022,"housePrice":3492875.9999999995,"income":385066.6907,"pti":9.070833921392722,"mortgageBurden":40.66275016029344,"mortgageRate":2.8784}},
+  "NZL": {"housePrice":{"start":2006,"values":[398686.5,435036.0,401046.5,384429.50000000006,387082.0,378884.5,392797.0,424651.5,448251.5,500000.0,567190.0,594723.0,608168.5,617613.5,670797.5,823558.5000000001,780658.0]},"pti":{"start":2006,"values":[11.614140711142447,12.240660612107819,11.020040290586147,10.579415495821548,10.737096984080488,10.432907685319472,10.300524935333032,11.178815412769227,11.436039039580344,12.2967954551044,13.702058988321802,13.842345952611284,13.666292962656346,13.902635430729877,14.431429919596413,17.20835705252051,16.575263829570265]},"mortgageBurden":{"start":2006,"values":[57.28638746367031,60.3766773691447,54.356005635967286,52.18263755417985,52.960396585769985,51.45999234024474,50.807018547534135,55.139158982839106,56.407906513698215,60.65356073452611,67.58497936072078,68.27694044439176,67.40856455266346,68.5743164181623,71.18257877103696,84.87968539748326,81.75697278597195]},"latest":{"year":2022,"housePrice":780658.0,"income":47097.7722,"pti":16.575263829570265,"mortgageBurden":81.75697278597195,"mortgageRate":3.6367}},
+  "POL": {"housePrice":{"start":2005,"values":[205615.2,276531.3,402008.70000000007,383374.2,362333.69999999995,340274.4,325718.99999999994,305046.6,290439.9,294214.2,300000.0,307704.30000000005,313691.99999999994,329366.10000000003,350094.3,374090.39999999997,386931.60000000003,379484.39999999997]},"pti":{"start":2005,"values":[11.412817829446738,13.837708229683198,18.02149191233568,15.623716338625265,14.370911740855899,13.161307046669627,12.608617757337772,11.858767698309835,11.060716698738847,10.874370955671695,10.317455022258534,9.852013049351635,9.654783058417067,9.515930742792442,9.147307789829915,9.7438528014409,9.11539668495504,8.961038459630744]},"mortgageBurden":{"start":2005,"values":[74.32256341372234,90.11393704608648,117.35957722978772,101.74478079720456,93.58626547222711,85.70907660154894,82.1098528718521,77.22667858520978,72.02961008649402,70.81608915652252,67.18934067111199,64.15828900063615,62.873887661073816,61.96965347567163,59.56910672142284,63.453927728571635,59.361295193094975,58.35608340740481]},"latest":{"year":2022,"housePrice":379484.39999999997,"income":42348.2615,"pti":8.961038459630744,"mortgageBurden":58.35608340740481,"mortgageRate":6.0533}},
+  "PRT": {"housePrice":{"start":2004,"values":[195748.65,192810.15,190140.45,184736.4,168366.30000000002,172046.85,170183.85,159043.8,145022.4,141041.69999999998,146672.4,150000.0,158967.75,170904.45,185431.95,202072.80000000002,218859.59999999998,234671.85,246414.0]},"pti":{"start":2004,"values":[20.096029397588232,19.80691086528253,19.249621872475352,17.90357426133791,16.735852054401057,16.204883396406068,16.671417132637156,16.36400446636928,15.224125718501861,14.900826601348358,15.315866006419924,15.10509429778058,15.497414682292947,16.554153979030687,17.018833408546552,17.012464397826207,17.854203268999154,19.51769183684692,20.372780191745253]},"mortgageBurden":{"start":2004,"values":[82.07876254517443,80.89790781556415,78.62175713899572,73.12405806306239,68.35469831315082,66.1860484999827,68.09152499973446,66.83595103839221,62.18031308994612,60.859853662717576,62.555010457215886,61.694149802487466,63.296514679893875,67.61258389401938,69.51048679813421,69.48447367344076,72.92241076863326,79.71664262686168,83.2091033835755]},"latest":{"year":2022,"housePrice":246414.0,"income":12095.2564,"pti":20.372780191745253,"mortgageBurden":83.2091033835755,"mortgageRate":2.17}},
+  "SVK": {"housePrice":{"start":2005,"values":[88107.47,98071.49,123265.45,139326.11000000002,121447.37,115814.05000000002,109896.38,103327.4,102820.18999999999,104334.89000000001,110000.0,117698.02,123296.69,130001.84999999999,138655.55,148686.00999999998,153302.05,156350.36999999997]},"pti":{"start":2005,"values":[14.426833101636642,13.99435185866556,16.325171435195656,17.518107380006448,15.028311005980914,14.059487531451559,12.615230843485332,12.715503707395422,12.801735743826908,12.850546015453903,13.337393720978135,13.721686362766967,13.576941923705009,14.308113082144262,14.0884397522566,16.021860788049512,15.86450667207936,17.50238657657554]},"mortgageBurden":{"start":2005,"values":[58.16940334092558,56.42562661026417,65.82355775058653,70.63350957055421,60.59457943965562,56.68825550431726,50.86497126596241,51.26927431874216,51.61696435388393,51.813768763933474,53.776752625237755,55.326231538848305,54.74261782419347,57.69072082967427,56.80499168596982,64.60060055359507,63.966144261300116,70.57012284186793]},"latest":{"year":2022,"housePrice":156350.36999999997,"income":8933.0886,"pti":17.50238657657554,"mortgageBurden":70.57012284186793,"mortgageRate":2.0741}},
+  "SVN": {"housePrice":{"start":2007,"values":[217751.99999999997,220694.24,200329.12,196480.32,197466.87999999998,180238.71999999997,168447.84,157431.84000000003,160000.0,165978.88,176962.08,188613.12000000002,198478.24,208258.88,224991.04000000004,235511.36]},"pti":{"start":2007,"values":[14.775542904610276,14.411546349065944,13.68918304471783,13.398337714153477,13.635092896208745,13.104412320552921,12.456294539172532,11.305781698269715,11.437397014281807,11.567827642860657,11.966597356430109,12.323775329158636,12.53962196823773,12.50889152059272,12.991844855904281,13.52909831093937]},"mortgageBurden":{"start":2007,"values":[58.12267341642809,56.69081720246748,53.84925079115567,52.70515014644701,53.63647593359976,51.54893343269704,48.99942723954063,44.47364551057713,44.99138175069754,45.50445777621688,47.07310144500066,48.478135344226395,49.327213025650444,49.206328413562574,51.10612588055987,53.21952417058877]},"latest":{"year":2022,"housePrice":235511.36,"income":17407.7647,"pti":13.52909831093937,"mortgageBurden":53.21952417058877,"mortgageRate":1.8918}},
+  "SWE": {"housePrice":{"start":2013,"values":[2058305.0,2233150.0,2500000.0,2682605.0,2811757.5,2717495.0,2728832.5,2818962.5,3037372.5,2950557.5,2615915.0]},"pti":{"start":2013,"values":[7.888222562770484,8.314707312916124,9.022502120287998,9.559434416037208,9.990271972189642,9.539129587178582,9.51240915719539,9.78703085478728,10.315976675286086,10.317936457567292,9.256550520853176]},"mortgageBurden":{"start":2013,"values":[33.702664552455694,35.524833280140285,38.548907559865754,40.84296669765204,42.6837329179329,40.756213714914566,40.642049886339144,41.8153792237298,44.07531590944541,44.08368913729157,39.54888628390882]},"latest":{"year":2023,"housePrice":2615915.0,"income":282601.4933,"pti":9.256550520853176,"mortgageBurden":39.54888628390882,"mortgageRate":2.5093}},
+  "USA": {"housePrice":{"start":2013,"values":[271956.96,281149.16,295000.0,308283.85,321496.9,334195.765,345965.675,368909.3,412920.055,439730.24500000005,443802.42499999993]},"pti":{"start":2013,"values":[8.77165211347218,9.070286003022208,9.197194076383477,9.04482699993721,9.339539131044736,8.925192005091985,8.719030176880958,8.898415015632388,10.13027581539215,11.699060597058818,11.437353862702649]},"mortgageBurden":{"start":2013,"values":[44.99557891681345,46.527468755883255,47.17846382001004,46.396872766936646,47.90864532488203,45.78318611108956,44.72564635792761,45.64582930226976,51.964854397324345,60.01218442521764,58.66971827785431]},"latest":{"year":2023,"housePrice":443802.42499999993,"income":38802.8936,"pti":11.437353862702649,"mortgageBurden":58.66971827785431,"mortgageRate":3.9575}}
+};
+
+// Country codes by descending latest value, as the comparison charts order them.
+export const rankings: {
+  readonly pti: readonly string[];
+  readonly mortgageBurden: readonly string[];
+  readonly priceToRent: readonly string[];
+} = {"pti":["ISR","PRT","GRC","MEX","SVK","NZL","LUX","LTU","CHE","CHL","CZE","CAN","SVN","DEU","ESP","AUT","JPN","NLD","KOR","GBR","LVA","USA","HUN","DNK","EST","ITA","FRA","ISL","SWE","IRL","AUS","NOR","BEL","POL","FIN"],"mortgageBurden":["MEX","ISR","CHL","GRC","HUN","PRT","NZL","CZE","SVK","CAN","LUX","GBR","USA","POL","KOR","ISL","NLD","LTU","SVN","ESP","CHE","LVA","AUT","ITA","AUS","EST","NOR","SWE","FRA","FIN","DNK","JPN","DEU","IRL","BEL"],"priceToRent":["EST","LTU","HUN","SVN","POL","USA","IRL","CHL","AUT","CZE","NZL","CAN","MEX","NLD","GBR","PRT","FIN","NOR","SWE","BEL","ISR","AUS","DNK","LVA","LUX","DEU","ISL","SVK","KOR","ESP","CHE","FRA","ITA","JPN","GRC"]};
+
+export function derivedValue(series: DerivedSeries, year: number): number | null {
+  if (series.start === null) return null;
+  return series.values[year - series.start] ?? null;
+}
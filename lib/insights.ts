@@ -1,5 +1,5 @@
 import { CountryData } from "../data/affordability";
-import { BASE_HOUSE_PRICES_2015 } from "./constants";
+import { derivedMetrics, derivedValue } from "../data/derivedMetrics";
 
 export interface AffordabilityMetrics {
   year: number;
@@ -54,36 +54,24 @@ export function getRepresentativeCountries(
   );
 }
 
-// ... (Rest of the file remains unchanged, providing full file below)
-
-function calculateHousePrice(
-  year: number,
-  countryData: CountryData,
-  basePrice2015: number,
-): number | null {
-  const priceIndexCurrentYear = countryData.realHousePriceIndex.find(
-    (p) => p.year === year,
-  );
-
-  let priceIndexBaseYear = countryData.realHousePriceIndex.find(
-    (p) => p.year === 2015,
-  );
-
-  if (!priceIndexBaseYear && countryData.realHousePriceIndex.length > 0) {
-    priceIndexBaseYear = countryData.realHousePriceIndex[0];
-  }
-
-  if (
-    !priceIndexCurrentYear ||
-    !priceIndexBaseYear ||
-    priceIndexBaseYear.value === 0
-  ) {
-    return null;
+/**
+ * Picks the comparison lines of a chart from a precomputed ranking: Top 2, Median, Bottom 2.
+ *
+ * @param ranking - Country codes by descending value (see `rankings` in data/derivedMetrics).
+ * @param excludeCode - The country code to exclude (the currently selected one).
+ * @returns Up to 5 country codes.
+ */
+export function pickComparisonCodes(
+  ranking: readonly string[],
+  excludeCode: string,
+): string[] {
+  const codes = ranking.filter((code) => code !== excludeCode);
+  if (codes.length <= 5) {
+    return codes;
   }
 
-  return (
-    basePrice2015 * (priceIndexCurrentYear.value / priceIndexBaseYear.value)
-  );
+  const median = codes[Math.floor(codes.length / 2)];
+  return [...codes.slice(0, 2), median, ...codes.slice(-2)];
 }
 
 export function generateAffordabilitySummary(
@@ -113,23 +101,21 @@ export function getMetricsForYear(
   year: number,
   countryCode: string,
 ): AffordabilityMetrics | null {
-  const basePriceData = BASE_HOUSE_PRICES_2015[countryCode];
-  if (!basePriceData) return null;
+  // House prices and PTI are precomputed by scripts/derived_metrics.py.
+  const derived = derivedMetrics[countryCode];
+  if (!derived) return null;
 
-  const incomePoint = countryData.realIncome.find((p) => p.year === year);
-  if (!incomePoint || incomePoint.value === 0) return null;
+  const pti = derivedValue(derived.pti, year);
+  const housePrice = derivedValue(derived.housePrice, year);
+  if (pti === null || housePrice === null) return null;
 
-  const housePrice = calculateHousePrice(
-    year,
-    countryData,
-    basePriceData.price,
-  );
-  if (housePrice === null) return null;
+  const incomePoint = countryData.realIncome.find((p) => p.year === year);
+  if (!incomePoint) return null;
 
   return {
     year,
     housePrice,
     income: incomePoint.value,
-    pti: housePrice / incomePoint.value,
+    pti,
   };
-}
\ No newline at end of file
+}
@@ -1,98 +1,175 @@
-import pandas as pd
+import argparse
 import os
-import inquirer
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from csv_profile import EXACT_DISTINCT_LIMIT, SHOWN_VALUES, ProfileCache, profile_csv
+from paths import project_path
 
 # --- Configuration ---
-ARTIFACTS_FOLDER = "_artifacts"
+ARTIFACTS_FOLDER = project_path("_artifacts")
 DIVIDER = "=" * 80
 
-# Key columns often found in OECD data that are useful to summarize.
-# The script will look for these and report their unique values if they exist.
-KEY_COLUMNS_TO_INSPECT = [
-    "MEASURE",
-    "Measure",
-    "UNIT_MEASURE",
-    "Unit of measure",
-    "PRICE_BASE",
-    "Price base",
-    "ADJUSTMENT",
-    "Adjustment",
-    "FREQ",
-    "Frequency of observation",
-]
-
-def inspect_csv(file_path):
+
+def get_profiles(file_paths, cache, workers=1, exact_limit=EXACT_DISTINCT_LIMIT):
     """
-    Performs a comprehensive inspection of a given CSV file and prints a summary.
+    Returns {path: profile}, profiling the files missing from `cache` (in parallel
+    with workers > 1) and storing them. Files that cannot be read map to an error string.
+    """
+    profiles, missing = {}, []
+    for file_path in file_paths:
+        profile = cache.get(file_path, exact_limit)
+        if profile is not None:
+            profiles[file_path] = dict(profile, cached=True)
+        else:
+            missing.append(file_path)
+
+    def collect(file_path, result):
+        try:
+            profile = result()
+        except Exception as e:
+            profiles[file_path] = f"{type(e).__name__}: {e}"
+            return
+        cache.put(profile)
+        profiles[file_path] = dict(profile, cached=False)
+
+    if workers > 1 and len(missing) > 1:
+        with ProcessPoolExecutor(max_workers=min(workers, len(missing))) as executor:
+            futures = {path: executor.submit(profile_csv, path, exact_limit=exact_limit) for path in missing}
+            for file_path, future in futures.items():
+                collect(file_path, future.result)
+    else:
+        for file_path in missing:
+            collect(file_path, lambda: profile_csv(file_path, exact_limit=exact_limit))
+
+    if missing:
+        cache.save()
+    return {path: profiles[path] for path in file_paths}
+
+
+def print_profile(file_path, profile):
+    """
+    Prints the full inspection of one profiled file.
     """
+    import pandas as pd
+
     print("\n" + DIVIDER)
     print(f"🔬 Inspecting: {file_path}")
     print(DIVIDER)
 
-    try:
-        df = pd.read_csv(file_path, low_memory=False)
-        print(f"✅ File loaded successfully.")
-        print(f"📊 Total Rows: {len(df):,}")
-        print(f"🔢 Total Columns: {len(df.columns)}")
+    if isinstance(profile, str):
+        print(f"\n❌ CRITICAL ERROR: Could not process file. Reason: {profile}")
+    else:
+        source = "from cache" if profile["cached"] else f"in {profile['seconds']:.2f}s"
+        print(f"✅ File profiled successfully ({source}).")
+        print(f"📊 Total Rows: {profile['rows']:,}")
+        print(f"🔢 Total Columns: {len(profile['columns'])}")
 
         # --- Column List ---
         print("\n--- Columns Present ---")
-        print(", ".join(df.columns))
+        for column in profile["columns"]:
+            nulls = f", {column['nulls']:,} empty" if column["nulls"] else ""
+            print(f"  {column['name']:<32} {column['dtype']}{nulls}")
 
         # --- Data Sample ---
         print("\n--- First 5 Rows ---")
-        print(df.head().to_string())
+        head = profile["head"]
+        print(pd.DataFrame(head["data"], columns=head["columns"]).to_string())
 
         # --- Key Column Analysis ---
         print("\n--- Key Column Summary ---")
         inspected_cols = set()
 
         # Special case: Show Measure and its description together if both exist
-        if 'MEASURE' in df.columns and 'Measure' in df.columns:
+        if profile["pairs"]:
             print("\n>> Combinations of 'MEASURE' and 'Measure':")
-            unique_combinations = df[['MEASURE', 'Measure']].drop_duplicates().dropna()
-            for _, row in unique_combinations.iterrows():
-                print(f"  - Code: {row['MEASURE']:<15} | Description: {row['Measure']}")
-            inspected_cols.add('MEASURE')
-            inspected_cols.add('Measure')
-
-        # Inspect other key columns
-        for col in KEY_COLUMNS_TO_INSPECT:
-            if col in df.columns and col not in inspected_cols:
-                print(f"\n>> Unique values in '{col}':")
-                unique_values = df[col].unique()
-                # Limit display for very long lists of unique values
-                if len(unique_values) > 15:
-                    print(f"  (Showing first 15 of {len(unique_values)})")
-                    print(unique_values[:15])
-                else:
-                    print(unique_values)
-                inspected_cols.add(col)
-
-    except FileNotFoundError:
-        print(f"❌ ERROR: File not found at '{file_path}'")
-    except Exception as e:
-        print(f"\n❌ CRITICAL ERROR: Could not process file. Reason: {e}")
+            for code, description in profile["pairs"]:
+                print(f"  - Code: {code:<15} | Description: {description}")
+            inspected_cols.update(("MEASURE", "Measure"))
+
+        for col, summary in profile["keys"].items():
+            if col in inspected_cols:
+                continue
+            count = f"{summary['distinct']:,}" if summary["exact"] else f"~{summary['distinct']:,}"
+            print(f"\n>> Unique values in '{col}' ({count}):")
+            if summary["distinct"] > SHOWN_VALUES:
+                print(f"  (Showing first {SHOWN_VALUES})")
+            print(summary["values"])
 
     print("\n" + DIVIDER)
     print("Inspection Complete.")
     print(DIVIDER)
 
 
-def main():
+def inspect_csv(file_path, cache=None):
     """
-    Main function to find CSVs and prompt the user for selection.
+    Performs a comprehensive inspection of a given CSV file and prints a summary.
     """
-    print("Starting Interactive CSV Inspector...")
-
+    if not os.path.exists(file_path):
+        print(f"❌ ERROR: File not found at '{file_path}'")
+        return
+    cache = cache or ProfileCache()
+    print_profile(file_path, get_profiles([file_path], cache)[file_path])
+
+
+def print_batch_summary(profiles):
+    print(f"\n{'FILE':<32} {'SIZE MB':>9} {'ROWS':>12} {'COLS':>5} {'KEY COLUMNS (distinct)':<40} {'SOURCE'}")
+    print("-" * 112)
+    for file_path, profile in profiles.items():
+        name = os.path.basename(file_path)
+        if isinstance(profile, str):
+            print(f"{name:<32} ❌ {profile}")
+            continue
+        keys = ", ".join(
+            f"{col}={'' if s['exact'] else '~'}{s['distinct']}" for col, s in profile["keys"].items() if col.isupper()
+        )
+        source = "cache" if profile["cached"] else f"{profile['seconds']:.2f}s"
+        print(f"{name:<32} {profile['size'] / 1e6:>9.1f} {profile['rows']:>12,} {len(profile['columns']):>5} {keys:<40} {source}")
+
+
+def list_csv_files():
     if not os.path.exists(ARTIFACTS_FOLDER):
         print(f"Error: The '{ARTIFACTS_FOLDER}' directory was not found.")
-        return
+        return None
+    csv_files = sorted(f for f in os.listdir(ARTIFACTS_FOLDER) if f.endswith('.csv'))
+    if not csv_files:
+        print(f"No CSV files found in the '{ARTIFACTS_FOLDER}' directory.")
+        return None
+    return csv_files
 
-    csv_files = [f for f in os.listdir(ARTIFACTS_FOLDER) if f.endswith('.csv')]
 
+def run_batch(args):
+    """
+    Profiles every CSV in the artifacts folder and prints one summary line per file.
+    """
+    csv_files = list_csv_files()
     if not csv_files:
-        print(f"No CSV files found in the '{ARTIFACTS_FOLDER}' directory.")
+        return
+    cache = ProfileCache(rebuild=args.rebuild)
+    start = time.perf_counter()
+    paths = [os.path.join(ARTIFACTS_FOLDER, f) for f in csv_files]
+    profiles = get_profiles(paths, cache, workers=args.workers, exact_limit=args.exact_limit)
+    print_batch_summary(profiles)
+    if args.details:
+        for file_path, profile in profiles.items():
+            print_profile(file_path, profile)
+    print(f"\nProfiled {len(paths)} files in {time.perf_counter() - start:.2f}s (cache: {cache.path}).")
+
+
+def main(cache=None):
+    """
+    Main function to find CSVs and prompt the user for selection.
+    """
+    print("Starting Interactive CSV Inspector...")
+
+    csv_files = list_csv_files()
+    if not csv_files:
+        return
+
+    try:
+        import inquirer
+    except ImportError:
+        print("Please install the 'inquirer' library (`pip install inquirer`), or use --batch.")
         return
 
     questions = [
@@ -107,7 +184,7 @@ def main():
         answers = inquirer.prompt(questions)
         if answers and 'file' in answers:
             selected_file_path = os.path.join(ARTIFACTS_FOLDER, answers['file'])
-            inspect_csv(selected_file_path)
+            inspect_csv(selected_file_path, cache)
         else:
             print("\nNo file selected. Exiting.")
     except Exception as e:
@@ -116,4 +193,16 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Inspects the source CSV files in _artifacts/.")
+    parser.add_argument("--batch", action="store_true", help="Profile every CSV file without prompting.")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Files profiled in parallel in batch mode.")
+    parser.add_argument("--details", action="store_true", help="In batch mode, also print the full inspection of every file.")
+    parser.add_argument("--rebuild", action="store_true", help="Ignore cached profiles and re-read every file.")
+    parser.add_argument("--exact-limit", type=int, default=EXACT_DISTINCT_LIMIT,
+                        help="Distinct values counted exactly per key column before switching to an estimate.")
+    args = parser.parse_args()
+
+    if args.batch:
+        run_batch(args)
+    else:
+        main(ProfileCache(rebuild=args.rebuild))
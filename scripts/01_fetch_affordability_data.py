@@ -1,32 +1,48 @@
-import pandas as pd
+import argparse
+import contextlib
+import io
 import json
 import os
+import time
+
+# Only standard-library modules are imported here, so `--help` starts instantly.
+# numpy, pandas and the helper modules built on them are imported by the
+# functions that use them.
+from build_manifest import BuildManifest, file_digest
+from dataset import generate_sidecar, load_config, pack_series, sidecar_path
+from paths import project_path
+from run_report import PROFILE_DIR, REPORT_PATH, RunReport, count_points, peak_rss_mb
 
 # --- Configuration ---
 
 METRIC_CONFIG = {
     "realHousePriceIndex": {
-        "file": "_artifacts/RHP_RPI_HPI.csv",
+        "file": project_path("_artifacts", "RHP_RPI_HPI.csv"),
         "measure": "RHP",
     },
     "rentPriceIndex": {
-        "file": "_artifacts/RHP_RPI_HPI.csv",
+        "file": project_path("_artifacts", "RHP_RPI_HPI.csv"),
         "measure": "RPI",
     },
     "nominalIncome": {
-        "file": "_artifacts/INC_DISP.csv",
+        "file": project_path("_artifacts", "INC_DISP.csv"),
         "measure": "INC_DISP",
+        "statistical_operation": "MEDIAN",
     },
     "cpi": {
-        "file": "_artifacts/CPI_HSH.csv",
+        "file": project_path("_artifacts", "CPI_HSH.csv"),
         "measure": "CPI",
     },
+    "hpi": {
+        "file": project_path("_artifacts", "RHP_RPI_HPI.csv"),
+        "measure": "HPI",
+    },
     "numberOfHouseholds": {
-        "file": "_artifacts/CPI_HSH.csv",
+        "file": project_path("_artifacts", "CPI_HSH.csv"),
         "measure": "HSH",
     },
     "mortgageRate": {
-        "file": "_artifacts/IRLT.csv",
+        "file": project_path("_artifacts", "IRLT.csv"),
         "measure": "IRLT",
     },
 }
@@ -40,250 +56,552 @@ COUNTRIES = [
 CORE_METRICS = ["realHousePriceIndex", "realIncome", "mortgageRate"]
 ALL_METRICS = CORE_METRICS + ["rentPriceIndex", "numberOfHouseholds"]
 
+# Real income is expressed in prices of this year (deflator rebased to 100 when the year is missing).
+BASE_YEAR = 2015
+
+# Price indices in METRIC_CONFIG that --deflator may use to deflate nominal income:
+# cpi gives income in consumer prices, hpi (the nominal house price index) in house prices.
+DEFLATORS = ["cpi", "hpi"]
+
+# Build settings that change every country's values. They are recorded in the
+# sidecar; a dataset written before that was built with these defaults.
+DEFAULT_SETTINGS = {"base_year": BASE_YEAR, "deflator": "cpi", "resolution": "annual"}
+
+# Country-specific patch sources, applied after ingestion.
+MEXICO_BANXICO_FILE = project_path("_artifacts", "MEX-banxico.csv")
+AUSTRALIA_GROWTH_FILE = project_path("_artifacts", "AUS_income_growth.csv")
+
+# Country-specific fixes applied on top of the OECD series by overlays.py, all in
+# one pass. Rules: replace, fill_gaps, splice_with_ratio, extend_by_growth. A
+# source with a `date_column` is a high-frequency feed aggregated to annual
+# values by feed_aggregator.py; otherwise it is an annual (year, value) CSV.
+OVERLAYS = [
+    {
+        "name": "Mexico Banxico",
+        "country": "MEX",
+        "metric": "mortgageRate",
+        # Banxico's rate is much better than the OECD long-term rate proxy, so it wins where both exist.
+        "rule": "replace",
+        "source": {
+            "file": MEXICO_BANXICO_FILE,
+            "date_column": "Fecha",
+            "date_format": "%d/%m/%Y",
+            # SF43426: Tasa de interés promedio de créditos en pesos a tasa fija.
+            "value_column": "SF43426",
+            "sentinels": ["N/E"],
+            "aggregate": "mean",
+        },
+        "decimals": 4,
+    },
+    {
+        "name": "Australia income growth",
+        "country": "AUS",
+        "metric": "realIncome",
+        "rule": "extend_by_growth",
+        "source": {"file": AUSTRALIA_GROWTH_FILE, "year_column": "year", "value_column": "growth_pct"},
+        "decimals": 4,
+    },
+]
+
+# Helper modules the build runs, directly or through each other. --incremental
+# hashes them together with this script, so a change to any of them recomputes
+# every country. downloader.py is left out: it only fetches the source files,
+# whose content is already part of each country's fingerprint.
+PIPELINE_MODULES = [
+    "build_manifest", "dataset", "derived_metrics", "feed_aggregator", "monte_carlo", "overlays",
+    "parse_cache", "paths", "periods", "run_report", "simulator", "timeseries", "validation",
+]
+
+OUTPUT_PATH = project_path("data", "affordability.ts")
+DERIVED_PATH = project_path("data", "derivedMetrics.ts")
+BANDS_PATH = project_path("data", "simulationBands.json")
+CHUNK_DIR = project_path("data", "countries")
+
+# Where --download fetches each source file from. None means there is no verified
+# public endpoint: the file is placed in _artifacts/ by hand, or fetched from a
+# --mirror. Only add a URL once it is known to return the CSV layout read here
+# (source_columns() lists the columns a download must have).
+SOURCE_URLS = {
+    project_path("_artifacts", "RHP_RPI_HPI.csv"): None,
+    project_path("_artifacts", "INC_DISP.csv"): None,
+    project_path("_artifacts", "IRLT.csv"): None,
+    project_path("_artifacts", "CPI_HSH.csv"): None,
+    MEXICO_BANXICO_FILE: None,
+    AUSTRALIA_GROWTH_FILE: None,
+}
+
+# Only these columns of the OECD SDMX extracts are used; the label columns are never read.
+SOURCE_COLUMNS = ["REF_AREA", "MEASURE", "STATISTICAL_OPERATION", "TIME_PERIOD", "OBS_VALUE"]
+CSV_CHUNK_SIZE = 250_000
+
 # --- Data Processing Functions ---
 
-def parse_time_period(series):
-    return pd.to_numeric(series.astype(str).str[:4], errors='coerce')
+def select_resolution(df_metric, resolution):
+    """
+    Resolves a metric's observations (REF_AREA, year, freq, period, OBS_VALUE) to one
+    frequency per country, as a (REF_AREA, year, freq, period, value) frame.
+
+    annual: a year's annual observation wins; otherwise the year is the mean of its
+            finest sub-annual observations (quarters, months).
+    native: every country keeps the finest frequency it reports.
+
+    Repeated observations of the same period keep their first row.
+    """
+    import numpy as np
+    import pandas as pd
+
+    freq = df_metric['freq'].to_numpy()
+    group_keys = [df_metric['REF_AREA']]
+    if resolution == "annual":
+        preference = np.where(freq == 1, np.iinfo(np.int64).max, freq)
+        group_keys.append(df_metric['year'])
+    else:
+        preference = freq
+    best = pd.Series(preference, index=df_metric.index).groupby(group_keys, observed=True).transform('max')
+    df = df_metric[preference == best.to_numpy()].drop_duplicates(subset=['REF_AREA', 'year', 'period'])
+    df = df[['REF_AREA', 'year', 'freq', 'period', 'OBS_VALUE']].rename(columns={'OBS_VALUE': 'value'})
+
+    if resolution == "annual" and (df['freq'] > 1).any():
+        df = df.groupby(['REF_AREA', 'year'], observed=True, sort=False).agg(value=('value', 'mean')).reset_index()
+        df['freq'], df['period'] = 1, 1
+    return df
+
+def to_long_frame(raw_data, metrics=ALL_METRICS):
+    """
+    Flattens the observations of {country: {metric: TimeSeries}} into one long
+    (country, metric, year, freq, period, value) frame, ordered by series and period.
+    """
+    import numpy as np
+    import pandas as pd
+
+    keys, series_list = [], []
+    for country, data in raw_data.items():
+        for metric in metrics:
+            series = data.get(metric)
+            if series:
+                keys.append((country, metric))
+                series_list.append(series)
+
+    observations = [series.observations() for series in series_list]
+    lengths = [len(index) for index, _ in observations]
+    index = np.concatenate([index for index, _ in observations]) if observations else np.empty(0, dtype=np.int64)
+    freq = np.repeat(np.array([series.freq for series in series_list], dtype=np.int64), lengths)
+
+    countries = sorted({country for country, _ in keys})
+    country_codes = np.array([countries.index(country) for country, _ in keys], dtype=np.int64)
+    metric_codes = np.array([metrics.index(metric) for _, metric in keys], dtype=np.int64)
+    return pd.DataFrame({
+        'country': pd.Categorical.from_codes(np.repeat(country_codes, lengths), categories=countries),
+        'metric': pd.Categorical.from_codes(np.repeat(metric_codes, lengths), categories=metrics),
+        'year': index // freq,
+        'freq': freq,
+        'period': index % freq + 1,
+        'value': np.concatenate([values for _, values in observations]) if observations else np.empty(0),
+    })
+
+def fill_gaps(series_list):
+    """
+    Standardizes, interpolates, and rounds many TimeSeries at once. Each series is cut
+    to its first and last observation and keeps its own frequency; missing periods
+    (years, quarters or months) in between are linearly interpolated.
+    Returns the filled series, in order.
+    """
+    import numpy as np
+
+    from timeseries import TimeSeries
+
+    trimmed = [series.trim() for series in series_list]
+    lengths = np.array([len(series.values) for series in trimmed], dtype=np.int64)
+
+    # All series laid out contiguously; unobserved slots are NaN.
+    values = np.concatenate([series.values for series in trimmed]) if trimmed else np.empty(0)
+    positions = np.arange(len(values))
+
+    # Linear interpolation between the surrounding known points. The first and last
+    # period of every series are known, so neighbours never cross a series boundary.
+    # Mirrors np.interp (used by pandas' interpolate) so results are bit-identical.
+    known = ~np.isnan(values)
+    prev_known = np.maximum.accumulate(np.where(known, positions, 0))
+    next_known = np.minimum.accumulate(np.where(known, positions, len(positions) - 1)[::-1])[::-1]
+    missing = ~known
+    left, right = prev_known[missing], next_known[missing]
+    slope = (values[right] - values[left]) / (right - left).astype(np.float64)
+    values[missing] = slope * (positions[missing] - left).astype(np.float64) + values[left]
+    values = np.round(values, 4)
+
+    observed = np.ones(len(values), dtype=bool)
+    ends = np.cumsum(lengths).tolist()
+    return [
+        TimeSeries(series.start, values[end - n:end], observed[end - n:end], series.freq)
+        for series, n, end in zip(trimmed, lengths.tolist(), ends)
+    ]
+
+def process_series(series):
+    """
+    Standardizes, interpolates, and rounds a single TimeSeries.
+    """
+    return fill_gaps([series])[0]
+
+def source_dtypes(df):
+    """
+    Sets consistent categorical code dtypes on a filtered source frame.
+    """
+    import pandas as pd
+
+    df['REF_AREA'] = df['REF_AREA'].astype(str).astype(pd.CategoricalDtype(COUNTRIES))
+    df['MEASURE'] = df['MEASURE'].astype(str).astype("category")
+    if "STATISTICAL_OPERATION" in df.columns:
+        df['STATISTICAL_OPERATION'] = df['STATISTICAL_OPERATION'].astype(str).astype("category")
+    df['TIME_PERIOD'] = df['TIME_PERIOD'].astype("category")
+    return df
+
+def read_source_csv(file_path, specs, chunksize=CSV_CHUNK_SIZE):
+    """
+    Streams an OECD extract in chunks, keeping only SOURCE_COLUMNS and the rows
+    for COUNTRIES that match one of the (measure, statistical_operation) specs.
+    Codes are read as categoricals, so memory stays flat regardless of file size.
+    """
+    import pandas as pd
+
+    dtypes = {
+        "REF_AREA": "category",
+        "MEASURE": "category",
+        "STATISTICAL_OPERATION": "category",
+        # Only a few hundred distinct periods: parse_periods() parses each category once.
+        "TIME_PERIOD": "category",
+        "OBS_VALUE": "float64",
+    }
+
+    start = time.perf_counter()
+    rows_read = 0
+    kept = []
+    reader = pd.read_csv(file_path, usecols=lambda c: c in SOURCE_COLUMNS, dtype=dtypes, chunksize=chunksize)
+    for chunk in reader:
+        rows_read += len(chunk)
+        mask = pd.Series(False, index=chunk.index)
+        for measure, operation in specs:
+            spec_mask = chunk['MEASURE'] == measure
+            if operation is not None:
+                spec_mask &= chunk['STATISTICAL_OPERATION'] == operation
+            mask |= spec_mask
+        mask &= chunk['REF_AREA'].isin(COUNTRIES)
+        kept.append(chunk[mask])
+
+    df = pd.concat(kept, ignore_index=True) if kept else pd.DataFrame(columns=SOURCE_COLUMNS)
+    # Chunks carry their own categories; unify them on the (small) filtered frame.
+    df = source_dtypes(df)
+
+    elapsed = time.perf_counter() - start
+    rate = rows_read / elapsed if elapsed > 0 else float("inf")
+    rss = peak_rss_mb()
+    rss_text = f"{rss:.1f} MB" if rss is not None else "n/a"
+    print(f"  - Parsed {file_path}: {rows_read:,} rows in {elapsed:.2f}s ({rate:,.0f} rows/s), "
+          f"kept {len(df):,}. Peak RSS: {rss_text}")
+    df.attrs["rows_read"] = rows_read
+    return df
+
+def parse_source(file_path, specs):
+    """
+    Parses one source file in a worker process. Returns the filtered frame and the
+    progress output it printed, so the parent can replay it in the sequential order.
+    """
+    log = io.StringIO()
+    with contextlib.redirect_stdout(log):
+        df = read_source_csv(file_path, specs)
+    return df, log.getvalue()
+
+def source_config(specs):
+    return {"specs": specs, "countries": COUNTRIES, "columns": SOURCE_COLUMNS}
 
-def process_series(data_points):
+def load_source(file_path, specs, cache=None, pending=None):
+    """
+    Returns the filtered frame for a source file, from the parse cache when possible.
+    Files already submitted to the worker pool are taken from `pending`.
+    """
+    config = source_config(specs)
+    if cache is not None:
+        df = cache.load(file_path, config)
+        if df is not None:
+            print(f"  - Loaded {file_path} from cache ({len(df):,} rows).")
+            return source_dtypes(df)
+
+    if pending and file_path in pending:
+        df, log = pending[file_path].result()
+        print(log, end="")
+    else:
+        df = read_source_csv(file_path, specs)
+    if cache is not None:
+        cache.store(file_path, config, df)
+    return df
+
+def process_files(cache=None, workers=1, report=None, resolution="annual"):
     """
-    Standardizes, interpolates, and rounds a list of data points.
+    Loads every metric in METRIC_CONFIG into {country: {metric: TimeSeries}}.
+    `resolution` is "annual" or "native" (sub-annual series keep their quarters or
+    months, see select_resolution()).
+    With workers > 1, source files missing from the cache are parsed concurrently,
+    one per worker process; results and log output keep the sequential order.
+    Reading each file and filtering each metric are recorded as stages of `report`.
     """
-    if not data_points: return []
-    df = pd.DataFrame(data_points).drop_duplicates(subset=['year']).set_index('year')
-    min_year, max_year = df.index.min(), df.index.max()
-    # Reindex to fill missing years
-    series = df['value'].reindex(range(int(min_year), int(max_year) + 1))
-    # Linear Interpolation
-    series = series.interpolate(method='linear').dropna()
-    final_df = series.reset_index()
-    final_df.columns = ['year', 'value']
-    final_df['value'] = final_df['value'].round(4)
-    final_df['year'] = final_df['year'].astype(int)
-    return final_df.to_dict('records')
+    from concurrent.futures import ProcessPoolExecutor
 
-def process_files():
+    from periods import parse_periods, period_index
+    from timeseries import TimeSeries
+
+    report = report or RunReport()
     all_data = {country: {} for country in COUNTRIES}
     loaded_dfs = {}
-    
-    for metric, config in METRIC_CONFIG.items():
-        file_path, measure = config["file"], config["measure"]
-        print(f"\nProcessing metric '{metric}' with measure '{measure}'...")
-        try:
-            if file_path not in loaded_dfs:
-                if not os.path.exists(file_path):
-                    print(f"  - WARNING: File not found: {file_path}. Skipping.")
-                    continue
-                loaded_dfs[file_path] = pd.read_csv(file_path, low_memory=False)
-            
-            df = loaded_dfs[file_path]
-            df_metric = pd.DataFrame()
-
-            if metric == "nominalIncome":
-                df_metric = df[(df['MEASURE'] == measure) & (df['STATISTICAL_OPERATION'] == 'MEDIAN') & (df['REF_AREA'].isin(COUNTRIES))].copy()
-            else:
-                df_metric = df[(df['MEASURE'] == measure) & (df['REF_AREA'].isin(COUNTRIES))].copy()
-
-            print(f"  - Found {len(df_metric)} relevant rows.")
-
-            df_metric['year'] = parse_time_period(df_metric['TIME_PERIOD'])
-            df_metric = df_metric.dropna(subset=['year', 'OBS_VALUE'])
-            df_metric['year'] = df_metric['year'].astype(int)
-
-            for country, group in df_metric.groupby('REF_AREA'):
-                series = group[['year', 'OBS_VALUE']].rename(columns={'OBS_VALUE': 'value'}).to_dict('records')
-                
-                if metric == "nominalIncome":
-                    if country not in all_data: all_data[country] = {}
-                    if metric not in all_data[country]: all_data[country][metric] = []
-                    all_data[country][metric].extend(series)
-                else:
-                    all_data[country][metric] = series
-        except Exception as e:
-            print(f"  - CRITICAL ERROR during processing for '{metric}': {e}")
-    return all_data
 
-# --- Special Handling Functions ---
+    # Every metric sourced from the same file is filtered in a single streaming pass.
+    specs_by_file = {}
+    for config in METRIC_CONFIG.values():
+        spec = (config["measure"], config.get("statistical_operation"))
+        specs_by_file.setdefault(config["file"], []).append(spec)
+
+    pending = {}
+    executor = None
+    if workers > 1:
+        to_parse = [
+            file_path for file_path, specs in specs_by_file.items()
+            if os.path.exists(file_path) and (cache is None or not cache.contains(file_path, source_config(specs)))
+        ]
+        if to_parse:
+            executor = ProcessPoolExecutor(max_workers=min(workers, len(to_parse)))
+            pending = {file_path: executor.submit(parse_source, file_path, specs_by_file[file_path]) for file_path in to_parse}
 
-def process_mexico_banxico(raw_data):
+    try:
+        for metric, config in METRIC_CONFIG.items():
+            file_path, measure = config["file"], config["measure"]
+            operation = config.get("statistical_operation")
+            print(f"\nProcessing metric '{metric}' with measure '{measure}'...")
+            try:
+                if file_path not in loaded_dfs:
+                    if not os.path.exists(file_path):
+                        print(f"  - WARNING: File not found: {file_path}. Skipping.")
+                        continue
+                    with report.stage(f"read {os.path.basename(file_path)}") as stage:
+                        loaded_dfs[file_path] = load_source(file_path, specs_by_file[file_path], cache, pending)
+                        stage.rows_in = loaded_dfs[file_path].attrs.get("rows_read")
+                        stage.rows_out = len(loaded_dfs[file_path])
+
+                df = loaded_dfs[file_path]
+                with report.stage(f"filter {metric}", rows_in=len(df)) as stage:
+                    mask = df['MEASURE'] == measure
+                    if operation is not None:
+                        mask &= df['STATISTICAL_OPERATION'] == operation
+                    df_metric = df[mask].copy()
+
+                    print(f"  - Found {len(df_metric)} relevant rows.")
+
+                    periods = parse_periods(df_metric['TIME_PERIOD'])
+                    unparsed = int((periods['year'].isna() & df_metric['TIME_PERIOD'].notna()).sum())
+                    if unparsed:
+                        print(f"  - WARNING: Skipped {unparsed} rows with an unrecognized TIME_PERIOD.")
+                    df_metric[['year', 'freq', 'period']] = periods
+                    df_metric = df_metric.dropna(subset=['year', 'OBS_VALUE'])
+                    df_metric['year'] = df_metric['year'].astype(int)
+                    df_metric = select_resolution(df_metric, resolution)
+
+                    df_metric['index'] = period_index(
+                        df_metric['year'].to_numpy(), df_metric['freq'].to_numpy(), df_metric['period'].to_numpy()
+                    )
+                    for country, group in df_metric.groupby('REF_AREA', observed=True):
+                        all_data[country][metric] = TimeSeries.from_points(
+                            group['index'].to_numpy(), group['value'].to_numpy(), int(group['freq'].iat[0])
+                        )
+                    stage.rows_out = len(df_metric)
+            except Exception as e:
+                print(f"  - CRITICAL ERROR during processing for '{metric}': {e}")
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    if cache is not None:
+        cache.save()
+    return all_data
+
+def align_periods(income_df, deflator_df):
     """
-    Parses the raw Banxico CSV to fix Mexico's mortgage rates.
-    Column SF43426: Tasa de interés promedio de créditos en pesos a tasa fija.
+    Adds the 'bucket' both frames are joined on within (country, year). Income keeps
+    its own periods; a deflator finer than the income (monthly CPI, quarterly income)
+    is averaged into the income's periods, and a coarser one applies to every income
+    period it covers. For annual data the bucket is always 0.
     """
-    file_path = "_artifacts/MEX-banxico.csv"
-    print("\n--- Processing Mexico Banxico Data ---")
-    
-    if not os.path.exists(file_path):
-        print(f"  - WARNING: {file_path} not found. Skipping Mexico patch.")
-        return raw_data
+    import numpy as np
 
-    try:
-        df = pd.read_csv(file_path)
-        # Filter valid rows
-        target_col = "SF43426"
-        if target_col not in df.columns:
-            print(f"  - ERROR: Column {target_col} not found in Banxico file.")
-            return raw_data
-
-        # Drop N/E and convert to numeric
-        df = df[df[target_col] != "N/E"].copy()
-        df['value'] = pd.to_numeric(df[target_col])
-        
-        # Parse Date (DD/MM/YYYY)
-        df['date'] = pd.to_datetime(df['Fecha'], format="%d/%m/%Y")
-        df['year'] = df['date'].dt.year
-
-        # Aggregate by Year (Mean)
-        annual_rates = df.groupby('year')['value'].mean().reset_index()
-        annual_rates['value'] = annual_rates['value'].round(4)
-        
-        # Convert to list of dicts
-        new_series = annual_rates[['year', 'value']].to_dict('records')
-
-        # Merge/Overwrite into raw_data
-        # Since Banxico data is much better than the OECD proxy for mortgage rates, 
-        # we prioritize it completely if it overlaps or extends.
-        # However, OECD might have earlier data. Let's check overlap.
-        
-        if "MEX" not in raw_data: raw_data["MEX"] = {}
-        current_series = raw_data["MEX"].get("mortgageRate", [])
-        
-        # Dict map for merging
-        merged_map = {item['year']: item['value'] for item in current_series}
-        
-        # Overwrite/Append with Banxico data
-        count = 0
-        for item in new_series:
-            merged_map[item['year']] = item['value']
-            count += 1
-            
-        # Reconstruct list
-        final_series = [{'year': k, 'value': v} for k, v in sorted(merged_map.items())]
-        
-        raw_data["MEX"]["mortgageRate"] = final_series
-        print(f"  - Successfully patched MEX mortgage rates. Total points: {len(final_series)} (Updated/Added: {count})")
+    if not ((income_df['freq'] > 1).any() or (deflator_df['freq'] > 1).any()):
+        return income_df.assign(bucket=0), deflator_df.assign(bucket=0)
 
-    except Exception as e:
-        print(f"  - ERROR processing Banxico file: {e}")
+    common = np.minimum(
+        income_df.groupby('country', observed=True)['freq'].first(),
+        deflator_df.groupby('country', observed=True)['freq'].first(),
+    )
 
-    return raw_data
+    def bucket(df):
+        freq = np.asarray(df['country'].map(common), dtype=np.int64)
+        return (df['period'].to_numpy() - 1) * freq // df['freq'].to_numpy()
 
-def process_australia_growth(raw_data):
+    income_df = income_df.assign(bucket=bucket(income_df))
+    deflator_df = deflator_df.assign(bucket=bucket(deflator_df))
+    deflator_df = deflator_df.groupby(['country', 'year', 'bucket'], observed=True, sort=False).agg(
+        value=('value', 'mean'), base=('base', 'first')
+    ).reset_index()
+    return income_df, deflator_df
+
+def deflate_income(raw_data, base_year=BASE_YEAR, deflator="cpi", income="nominalIncome", target="realIncome"):
     """
-    Applies real income growth rates from AUS_income_growth.csv to extend the series.
+    Converts nominal income to real income for every country in one join.
+    The deflator is rebased so its `base_year` value is 1 (its raw value is used
+    as-is when the base year is missing). Input-only series, including the
+    DEFLATORS not used, are dropped afterwards.
     """
-    file_path = "_artifacts/AUS_income_growth.csv"
-    print("\n--- Processing Australia Income Growth ---")
+    from periods import period_index
+    from timeseries import TimeSeries
 
-    if not os.path.exists(file_path):
-        print(f"  - WARNING: {file_path} not found. Skipping AUS patch.")
+    print(f"\nConverting nominal household income to real income using {deflator} (base year {base_year})...")
+    countries = [c for c, data in raw_data.items() if data.get(income) and data.get(deflator)]
+    if not countries:
         return raw_data
 
-    if "AUS" not in raw_data or "realIncome" not in raw_data["AUS"]:
-        print("  - WARNING: No base realIncome data for AUS to extend.")
+    try:
+        panel = to_long_frame({c: raw_data[c] for c in countries}, metrics=[income, deflator])
+        income_df = panel[panel['metric'] == income].drop(columns='metric')
+        deflator_df = panel[panel['metric'] == deflator].drop(columns='metric')
+
+        deflator_df['base'] = (
+            deflator_df['value'].where(deflator_df['year'] == base_year)
+            .groupby(deflator_df['country'], observed=True).transform('mean')
+            .fillna(100.0)
+        )
+        income_df, deflator_df = align_periods(income_df, deflator_df)
+
+        deflator_df = deflator_df[['country', 'year', 'bucket', 'value', 'base']]
+        merged = income_df.merge(deflator_df, on=['country', 'year', 'bucket'], suffixes=('_income', '_deflator'))
+        merged = merged.sort_values(['country', 'year', 'period'], kind='stable')
+        merged['value'] = merged['value_income'] / (merged['value_deflator'] / merged['base'])
+    except Exception as e:
+        print(f"  - WARNING: Could not convert income. Reason: {e}")
         return raw_data
 
-    try:
-        growth_df = pd.read_csv(file_path)
-        growth_map = dict(zip(growth_df['year'], growth_df['growth_pct']))
-
-        current_series = sorted(raw_data["AUS"]["realIncome"], key=lambda x: x['year'])
-        if not current_series:
-            return raw_data
-
-        last_point = current_series[-1]
-        last_year = int(last_point['year'])
-        last_val = float(last_point['value'])
-
-        # Identify years to add
-        patch_years = sorted([y for y in growth_map.keys() if y > last_year])
-        
-        new_points = []
-        for year in patch_years:
-            growth = growth_map[year]
-            # Calculate new value: prev * (1 + pct/100)
-            new_val = last_val * (1 + growth / 100.0)
-            new_points.append({'year': year, 'value': round(new_val, 4)})
-            
-            # Update pointers for next iteration
-            last_val = new_val
-            last_year = year
-
-        if new_points:
-            raw_data["AUS"]["realIncome"].extend(new_points)
-            print(f"  - Extended AUS income by {len(new_points)} years: {[p['year'] for p in new_points]}")
-        else:
-            print("  - No new years to add for AUS (Growth data predates or matches existing data).")
+    real_income = {c: TimeSeries.empty() for c in countries}
+    merged['index'] = period_index(merged['year'].to_numpy(), merged['freq'].to_numpy(), merged['period'].to_numpy())
+    for country, group in merged.groupby('country', observed=True):
+        real_income[country] = TimeSeries.from_points(
+            group['index'].to_numpy(), group['value'].to_numpy(), int(group['freq'].iat[0])
+        )
 
-    except Exception as e:
-        print(f"  - ERROR processing AUS growth file: {e}")
+    for country in countries:
+        data = raw_data[country]
+        data[target] = real_income[country]
+        for metric in (income, *DEFLATORS):
+            if metric in data and metric not in ALL_METRICS:
+                del data[metric]
 
     return raw_data
 
+def check_deflators(base_year=BASE_YEAR):
+    """
+    Deflates one synthetic income series with every entry of DEFLATORS, each
+    growing at a different rate. Returns [(check, passed)].
+    """
+    import numpy as np
+
+    from timeseries import TimeSeries
+
+    years = np.arange(base_year - 5, base_year + 6)
+    income = 100 * 1.03 ** (years - base_year)
+    growth = {deflator: 1.02 + 0.02 * i for i, deflator in enumerate(DEFLATORS)}
+    real, checks = {}, []
+    for deflator in DEFLATORS:
+        data = {"nominalIncome": TimeSeries.from_points(years, income)}
+        data.update({d: TimeSeries.from_points(years, 100 * g ** (years - base_year)) for d, g in growth.items()})
+        with contextlib.redirect_stdout(io.StringIO()):
+            data = deflate_income({"AAA": data}, base_year=base_year, deflator=deflator)["AAA"]
+        real[deflator] = data["realIncome"].values
+        expected = income / growth[deflator] ** (years - base_year)
+        checks.append((f"{deflator}: income in {base_year} prices, input series dropped",
+                       np.allclose(real[deflator], expected) and sorted(data) == ["realIncome"]))
+    for deflator in DEFLATORS[1:]:
+        checks.append((f"{deflator} and {DEFLATORS[0]} give different real income",
+                       not np.allclose(real[deflator], real[DEFLATORS[0]])))
+    return checks
+
+# --- Special Handling Functions ---
+
+def process_overlays(raw_data):
+    """
+    Applies every OVERLAYS entry whose country is present in `raw_data`.
+    Overlay sources are annual, so sub-annual series they target are collapsed to annual means first.
+    """
+    from overlays import apply_overlays
+
+    print("\n--- Applying Source Overlays ---")
+    overlays = [overlay for overlay in OVERLAYS if overlay["country"] in raw_data]
+    for overlay in overlays:
+        data = raw_data[overlay["country"]]
+        if overlay["metric"] in data:
+            data[overlay["metric"]] = data[overlay["metric"]].annual()
+    raw_data, summary = apply_overlays(raw_data, overlays)
+    for overlay in overlays:
+        if overlay["name"] in summary:
+            print(f"  - {overlay['name']}: {overlay['rule']} wrote {summary[overlay['name']]} years "
+                  f"of {overlay['country']} {overlay['metric']}.")
+    return raw_data
+
 def synchronize_data(raw_data):
     """
     Enforces that all Core Metrics share the same time range.
     Drops countries with gaps or missing core metrics.
+    Series are interpolated and trimmed at their own frequency; quarterly and monthly
+    series are only averaged into annual values (of the periods in range) at the end.
     """
+    from timeseries import TimeSeries
+
     cleaned_data = {}
     print("\n--- Synchronizing Data Series ---")
 
+    keys = [(country, metric) for country, data in raw_data.items() for metric in ALL_METRICS if data.get(metric)]
+    filled = dict(zip(keys, fill_gaps([raw_data[country][metric] for country, metric in keys])))
+
     for country in sorted(raw_data.keys()):
-        data = raw_data[country]
-        
-        # 1. Check presence of Core Metrics
-        missing_core = [m for m in CORE_METRICS if m not in data or not data[m]]
+        missing_core = [m for m in CORE_METRICS if (country, m) not in filled]
         if missing_core:
             print(f"[{country}] SKIPPED. Missing core metrics: {missing_core}")
             continue
 
-        # 2. Process/Interpolate individual series first to get continuous ranges
-        processed_metrics = {}
-        for metric in ALL_METRICS:
-            if metric in data:
-                processed_metrics[metric] = process_series(data[metric])
-            else:
-                processed_metrics[metric] = []
-
-        # 3. Find Intersection of Years for CORE METRICS
-        core_years = []
-        for m in CORE_METRICS:
-            years = set(d['year'] for d in processed_metrics[m])
-            core_years.append(years)
-        
-        common_years = set.intersection(*core_years)
-
-        if not common_years:
+        # Intersection of the continuous year ranges of the core series.
+        spans = [filled[(country, m)] for m in CORE_METRICS]
+        min_year = max(series.start // series.freq for series in spans)
+        max_year = min((series.start + len(series.values) - 1) // series.freq for series in spans)
+        if min_year > max_year:
             print(f"[{country}] SKIPPED. No overlapping years found between Income, Price, and Rates.")
             continue
 
-        min_year = min(common_years)
-        max_year = max(common_years)
-
-        # 4. Filter ALL metrics to this Core Range
-        final_country_data = {}
-        is_valid = True
-
-        for metric in ALL_METRICS:
-            series = processed_metrics.get(metric, [])
-            # Filter to range
-            filtered = [d for d in series if min_year <= d['year'] <= max_year]
-            
-            if metric in CORE_METRICS and not filtered:
-                is_valid = False
-                break
-            
-            filtered.sort(key=lambda x: x['year'])
-            final_country_data[metric] = filtered
-
-        if is_valid:
-            cleaned_data[country] = final_country_data
-            print(f"[{country}] SUCCESS. Range: {min_year}-{max_year} ({len(common_years)} yrs).")
-        else:
-            print(f"[{country}] SKIPPED. Error during final filtering.")
+        cleaned_data[country] = {
+            metric: filled[(country, metric)].between(min_year, max_year).annual()
+            if (country, metric) in filled else TimeSeries.empty()
+            for metric in ALL_METRICS
+        }
+        print(f"[{country}] SUCCESS. Range: {min_year}-{max_year} ({max_year - min_year + 1} yrs).")
 
     return cleaned_data
 
+def write_if_changed(path, content):
+    """
+    Writes `content` to `path` unless the file already holds exactly that. Returns True if written.
+    """
+    if os.path.exists(path):
+        with open(path, "r", encoding="utf-8") as f:
+            if f.read() == content:
+                return False
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    # Replaced in one step, so readers such as data_server.py never see a half-written file.
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(content)
+    os.replace(tmp_path, path)
+    return True
+
 def generate_typescript_file(data):
     data_as_string = json.dumps(data, indent=2)
     return f"""// This file is generated by scripts/01_fetch_affordability_data.py. Do not edit manually.
@@ -308,51 +626,326 @@ export type AffordabilityData = {{
 export const affordabilityData = {data_as_string} as const;
 """
 
-if __name__ == "__main__":
-    print("Starting data processing from local CSV files...")
-    raw_data = process_files()
+def generate_country_modules(data):
+    """
+    Returns {file name: content} for the chunked front-end output: one module per
+    country holding its packed series, plus an index that lazy-loads them and
+    unpacks to the CountryData type of data/affordability.ts.
+    """
+    modules = {}
+    ranges = {}
+    for country, metrics in data.items():
+        packed = {metric: pack_series(metrics.get(metric, [])) for metric in ALL_METRICS}
+        ranges[country] = [packed[CORE_METRICS[0]]["start"], metrics[CORE_METRICS[0]][-1]['year']]
+        modules[f"{country}.ts"] = f"""// This file is generated by scripts/01_fetch_affordability_data.py. Do not edit manually.
 
-    print("\nConverting nominal household income to real income using CPI...")
-    BASE_YEAR = 2015
-    for country, data in raw_data.items():
-        if "nominalIncome" in data and "cpi" in data:
-            try:
-                income_df = pd.DataFrame(data["nominalIncome"]).drop_duplicates(subset='year').sort_values('year')
-                cpi_df = pd.DataFrame(data["cpi"]).drop_duplicates(subset='year').sort_values('year')
-                
-                # Base CPI logic
-                cpi_base_value_series = cpi_df[cpi_df['year'] == BASE_YEAR]['value']
-                cpi_base_value = 100.0 
-                if not cpi_base_value_series.empty:
-                    cpi_base_value = cpi_base_value_series.iloc[0]
-
-                merged_df = pd.merge(income_df, cpi_df, on="year", suffixes=('_income', '_cpi'))
-                merged_df['value'] = merged_df['value_income'] / (merged_df['value_cpi'] / cpi_base_value)
-                
-                real_income_series = merged_df[['year', 'value']].to_dict('records')
-                data['realIncome'] = real_income_series
-                
-                del data['nominalIncome']
-                del data['cpi']
-            except Exception as e:
-                print(f"  - WARNING: Could not convert income for {country}. Reason: {e}")
+import type {{ PackedCountryData }} from "./index";
+
+const data: PackedCountryData = {json.dumps(packed, separators=(",", ":"))};
+
+export default data;
+"""
+
+    loaders = "\n".join(f'  {json.dumps(c)}: () => import("./{c}"),' for c in data)
+    modules["index.ts"] = f"""// This file is generated by scripts/01_fetch_affordability_data.py. Do not edit manually.
+
+import type {{ CountryData, TimeSeriesDataPoint }} from "../affordability";
+
+export type PackedSeries = {{
+  readonly start: number | null;
+  readonly values: readonly number[];
+}};
+
+export type PackedCountryData = {{
+  readonly [K in keyof CountryData]: PackedSeries;
+}};
+
+export const countryCodes: readonly string[] = {json.dumps(list(data))};
+
+// [first year, last year] of each country's synchronized core range.
+export const countryRanges: {{ readonly [countryCode: string]: readonly [number, number] }} = {json.dumps(ranges, separators=(",", ":"))};
+
+const loaders: {{ readonly [countryCode: string]: () => Promise<{{ default: PackedCountryData }}> }} = {{
+{loaders}
+}};
+
+export function unpackSeries(series: PackedSeries): TimeSeriesDataPoint[] {{
+  const {{ start, values }} = series;
+  if (start === null) return [];
+  return values.map((value, i) => ({{ year: start + i, value }}));
+}}
+
+export function unpackCountryData(packed: PackedCountryData): CountryData {{
+  return {{
+{chr(10).join(f"    {m}: unpackSeries(packed.{m})," for m in ALL_METRICS)}
+  }};
+}}
+
+const cache = new Map<string, Promise<CountryData>>();
+
+/**
+ * Loads a single country's series on demand. Each country is its own chunk.
+ *
+ * @param countryCode - The country code, e.g. "CAN".
+ * @returns The country's data, or undefined for an unknown code.
+ */
+export function loadCountryData(countryCode: string): Promise<CountryData> | undefined {{
+  const load = loaders[countryCode];
+  if (!load) return undefined;
+  let pending = cache.get(countryCode);
+  if (!pending) {{
+    pending = load().then((module) => unpackCountryData(module.default));
+    cache.set(countryCode, pending);
+  }}
+  return pending;
+}}
+"""
+    return modules
+
+def write_country_modules(modules, output_dir):
+    """
+    Writes the chunked output, removing modules of countries no longer in the dataset.
+    Returns the number of files written.
+    """
+    written = sum(write_if_changed(os.path.join(output_dir, name), content) for name, content in modules.items())
+    for name in os.listdir(output_dir):
+        if name.endswith(".ts") and name not in modules:
+            os.remove(os.path.join(output_dir, name))
+    return written
+
+def source_urls(mirror=None):
+    """
+    {file: url} of every source file of METRIC_CONFIG and OVERLAYS. With a `mirror`,
+    every file is fetched from <mirror>/<file name> instead.
+    """
+    files = [config["file"] for config in METRIC_CONFIG.values()]
+    files += [overlay["source"]["file"] for overlay in OVERLAYS]
+    if mirror:
+        return {f: f"{mirror.rstrip('/')}/{os.path.basename(f)}" for f in dict.fromkeys(files)}
+    return {f: SOURCE_URLS.get(f) for f in dict.fromkeys(files)}
+
+def source_columns():
+    """
+    {file: columns its CSV header must have} for every source file. A download
+    without them does not replace the local copy.
+    """
+    columns = {}
+    for config in METRIC_CONFIG.values():
+        required = columns.setdefault(config["file"], ["REF_AREA", "MEASURE", "TIME_PERIOD", "OBS_VALUE"])
+        if config.get("statistical_operation") and "STATISTICAL_OPERATION" not in required:
+            required.append("STATISTICAL_OPERATION")
+    for overlay in OVERLAYS:
+        source = overlay["source"]
+        columns[source["file"]] = [source.get("date_column") or source["year_column"], source["value_column"]]
+    return columns
+
+def settings_changes(previous, current):
+    """
+    {setting: [previous, current]} of the build settings that differ from those
+    recorded with the previous dataset (DEFAULT_SETTINGS when none were recorded).
+    """
+    previous = {**DEFAULT_SETTINGS, **(previous or {})}
+    return {key: [previous.get(key), value] for key, value in current.items() if previous.get(key) != value}
+
+def pipeline_digests():
+    """
+    {file name: SHA-256} of this script and every module in PIPELINE_MODULES.
+    """
+    files = [os.path.abspath(__file__)] + [project_path("scripts", f"{module}.py") for module in PIPELINE_MODULES]
+    return {os.path.basename(path): file_digest(path) for path in files}
+
+def run(args, report):
+    """
+    Runs the whole pipeline for parsed command-line `args`, recording every stage in `report`.
+    """
+    from derived_metrics import SERIES as DERIVED_SERIES, build_derived, generate_derived_file
+    from monte_carlo import DEFAULT_PATHS, build_bands, generate_bands_file
+    from overlays import overlay_files
+    from parse_cache import ParseCache
+    from simulator import load_base_house_prices
+    from timeseries import TimeSeries, to_records
+    from validation import VALIDATION_REPORT_PATH, load_previous, print_report as print_validation, save_report, validate
+
+    settings = {"base_year": args.base_year, "deflator": args.deflator, "resolution": args.resolution}
+
+    if args.download or args.mirror:
+        from downloader import CONNECTIONS_PER_HOST, download_sources
+
+        with report.stage("download"):
+            download_sources(source_urls(args.mirror), connections=args.connections or CONNECTIONS_PER_HOST,
+                             columns=source_columns())
+
+    print("Starting data processing from local CSV files...")
+    cache = None if args.no_cache else ParseCache(rebuild=args.rebuild)
+    raw_data = process_files(cache, workers=args.workers, report=report, resolution=args.resolution)
+
+    # deflate_income() drops the price indices; the sidecar keeps the annual CPI for the simulation bands.
+    cpi = {country: data["cpi"].annual() for country, data in raw_data.items() if data.get("cpi")}
+    with report.stage("deflate_income", rows_in=count_points(raw_data)) as stage:
+        raw_data = deflate_income(raw_data, base_year=args.base_year, deflator=args.deflator)
+        stage.rows_out = count_points(raw_data)
+
+    # --- Incremental mode: only countries whose inputs changed are recomputed ---
+    if args.incremental:
+        manifest = BuildManifest({**settings, "pipeline": pipeline_digests()})
+        patch_files = overlay_files(OVERLAYS)
+        fingerprints = {
+            country: manifest.fingerprint(
+                {metric: series.to_packed() for metric, series in data.items()}, patch_files.get(country, [])
+            )
+            for country, data in raw_data.items()
+        }
+        changed = manifest.changed(fingerprints)
+        print(f"\n--- Incremental build: {len(changed)} of {len(fingerprints)} countries changed ---")
+        if changed:
+            print(f"Recomputing: {', '.join(changed)}")
+        raw_data = {country: raw_data[country] for country in changed}
 
     # --- Apply Patches BEFORE synchronization ---
-    raw_data = process_mexico_banxico(raw_data)
-    raw_data = process_australia_growth(raw_data)
+    if any(overlay["country"] in raw_data for overlay in OVERLAYS):
+        with report.stage("process_overlays", rows_in=count_points(raw_data)) as stage:
+            raw_data = process_overlays(raw_data)
+            stage.rows_out = count_points(raw_data)
 
     # --- Synchronize ---
-    final_data = synchronize_data(raw_data)
-    
+    with report.stage("synchronize_data", rows_in=count_points(raw_data)) as stage:
+        final_data = synchronize_data(raw_data)
+        stage.rows_out = count_points(final_data)
+
+    if args.incremental:
+        # The manifest stores packed series; they are unpacked again for the stages below.
+        computed = {
+            country: {metric: series.to_packed() for metric, series in metrics.items()}
+            for country, metrics in final_data.items()
+        }
+        final_data = {
+            country: {metric: TimeSeries.from_packed(packed) for metric, packed in metrics.items()}
+            for country, metrics in manifest.merge(computed, fingerprints, changed).items()
+        }
+        manifest.save()
+
     if not final_data:
         print("\n❌ No valid data could be processed. Aborting.")
         exit(1)
 
-    output_path = os.path.join(os.getcwd(), "data", "affordability.ts")
-    os.makedirs(os.path.dirname(output_path), exist_ok=True)
-    with open(output_path, "w", encoding="utf-8") as f:
-        f.write(generate_typescript_file(final_data))
+    # --- Validation against outliers, breaks and the previously generated dataset ---
+    if args.validation != "off":
+        validation_report = args.validation_report or VALIDATION_REPORT_PATH
+        with report.stage("validate", rows_in=count_points(final_data)):
+            validation = validate(final_data, load_previous(OUTPUT_PATH),
+                                  settings_changes(load_config(OUTPUT_PATH), settings))
+            save_report(validation, validation_report)
+        print_validation(validation)
+        print(f"Validation report written to {validation_report}")
+        if validation["errors"] and args.validation == "fail":
+            print(f"\n❌ Validation found {validation['errors']} error(s). Not writing data/ "
+                  "(--validation warn writes it anyway).")
+            exit(1)
+
+    # --- Derived series (house price, PTI, mortgage burden) and rankings for the front end ---
+    with report.stage("derive_metrics", rows_in=count_points(final_data)) as stage:
+        packed = {
+            country: {metric: series.to_packed() for metric, series in metrics.items()}
+            for country, metrics in final_data.items()
+        }
+        base_prices = load_base_house_prices()
+        derived = build_derived(packed, base_prices)
+        stage.rows_out = sum(
+            len(entry[name]["values"]) for entry in derived["countries"].values() for name in DERIVED_SERIES
+        )
+
+    # --- Monte Carlo buy-vs-rent bands ---
+    band_paths = DEFAULT_PATHS if args.band_paths is None else args.band_paths
+    if band_paths > 0:
+        with report.stage("simulate_bands", rows_in=len(packed)) as stage:
+            bands = build_bands(packed, {country: series.to_packed() for country, series in cpi.items()},
+                                base_prices, band_paths, workers=args.workers)
+            stage.rows_out = len(bands["countries"])
+        if bands["constantInflation"]:
+            print(f"  - WARNING: No CPI for {', '.join(bands['constantInflation'])}; their simulated market "
+                  "returns are deflated by a constant FALLBACK_INFLATION.")
+
+    print()
+    with report.stage("emit", rows_in=count_points(final_data)) as stage:
+        # Point records are only built here, for the generated files.
+        records = to_records(final_data)
+        outputs = [
+            (OUTPUT_PATH, generate_typescript_file(records)),
+            (sidecar_path(OUTPUT_PATH), generate_sidecar(records, ALL_METRICS, settings, {
+                country: cpi[country].to_packed() for country in records if country in cpi
+            })),
+            (DERIVED_PATH, generate_derived_file(derived)),
+        ]
+        if band_paths > 0:
+            outputs.append((BANDS_PATH, generate_bands_file(bands)))
+        for path, content in outputs:
+            if write_if_changed(path, content):
+                print(f"✅ Data successfully written to {path}")
+            else:
+                print(f"✅ {path} is up to date. Not rewritten.")
+
+        if args.chunked:
+            modules = generate_country_modules(records)
+            written = write_country_modules(modules, CHUNK_DIR)
+            total_kb = sum(len(content.encode("utf-8")) for content in modules.values()) / 1024
+            largest_kb = max(len(content.encode("utf-8")) for name, content in modules.items() if name != "index.ts") / 1024
+            print(f"✅ Chunked output in {CHUNK_DIR}: {len(modules)} modules ({written} rewritten), "
+                  f"{total_kb:.1f} KB total, largest country {largest_kb:.1f} KB.")
+        stage.rows_out = count_points(final_data)
 
     countries_found = ", ".join(sorted(final_data.keys()))
-    print(f"\n✅ Data successfully written to {output_path}")
-    print(f"Included countries ({len(final_data.keys())}): {countries_found}")
\ No newline at end of file
+    print(f"Included countries ({len(final_data.keys())}): {countries_found}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Builds data/affordability.ts from the CSV files in _artifacts/.")
+    parser.add_argument("--no-cache", action="store_true", help="Parse every source file without reading or writing the cache.")
+    parser.add_argument("--rebuild", action="store_true", help="Ignore cached entries, re-parse every source file and refresh the cache.")
+    parser.add_argument("--workers", type=int, default=1, help="Parse up to this many source files concurrently, one per process.")
+    parser.add_argument("--incremental", action="store_true", help="Only recompute countries whose inputs changed since the last incremental build.")
+    parser.add_argument("--chunked", action="store_true", help="Also write data/countries/: one packed module per country plus a lazy-loading index.")
+    parser.add_argument("--report", default=REPORT_PATH, help="Where to write the JSON run report with per-stage timings.")
+    parser.add_argument("--profile", nargs="?", const=PROFILE_DIR, default=None, metavar="DIR",
+                        help=f"Run every stage under cProfile and dump <stage>.prof files to DIR (default: {PROFILE_DIR}).")
+    parser.add_argument("--base-year", type=int, default=BASE_YEAR, help="Year the deflator is rebased to when computing real income.")
+    parser.add_argument("--deflator", default=DEFAULT_SETTINGS["deflator"], choices=DEFLATORS, help="Price index used to deflate nominal income.")
+    parser.add_argument("--band-paths", type=int, default=None,
+                        help="Bootstrapped paths per country for data/simulationBands.json "
+                             "(default: DEFAULT_PATHS in monte_carlo.py; 0 skips the simulation).")
+    parser.add_argument("--resolution", default=DEFAULT_SETTINGS["resolution"], choices=["annual", "native"],
+                        help="annual: average quarterly/monthly observations into years on ingestion. native: keep them "
+                             "through interpolation and synchronization and only average into years for the output.")
+    parser.add_argument("--validation", default="fail", choices=["fail", "warn", "off"],
+                        help="Check the synchronized data for jumps, outliers, level shifts and changes against the "
+                             "previous data/affordability.ts. fail: stop before writing data/ on any error.")
+    parser.add_argument("--validation-report", default=None,
+                        help="Where to write the JSON validation report (default: _artifacts/validation_report.json).")
+    parser.add_argument("--download", action="store_true",
+                        help="Bring the source files in _artifacts/ up to date from SOURCE_URLS before parsing (conditional, resumable). "
+                             "Files without a URL there are left as they are; while none has one, use --mirror.")
+    parser.add_argument("--mirror", metavar="URL",
+                        help="Download every source file from URL/<file name> instead (implies --download), e.g. a fixture_server.py.")
+    parser.add_argument("--connections", type=int, default=None,
+                        help="Concurrent connections per host when downloading (default: CONNECTIONS_PER_HOST in downloader.py).")
+    parser.add_argument("--check", action="store_true",
+                        help="Only check that every entry of DEFLATORS deflates a synthetic income series correctly.")
+    args = parser.parse_args()
+    if args.check:
+        checks = check_deflators()
+        for name, passed in checks:
+            print(f"{'✅' if passed else '❌'} {name}")
+        if not all(passed for _, passed in checks):
+            print("❌ Deflator check failed.")
+            exit(1)
+        print("✅ All deflator checks passed.")
+        exit(0)
+    if args.download and not args.mirror and not any(SOURCE_URLS.values()):
+        parser.error("--download has nothing to fetch: no source in SOURCE_URLS has a verified URL yet. "
+                     "Use --mirror URL to fetch every file from URL/<file name>, or place the files in _artifacts/ by hand.")
+
+    report = RunReport(profile_dir=args.profile)
+    try:
+        run(args, report)
+    finally:
+        report.print_summary()
+        report.save(args.report)
+        print(f"\nRun report written to {args.report}")
@@ -1,102 +1,207 @@
+import argparse
 import json
 import os
-import re
 import sys
 
-def load_typescript_data(filepath):
+from dataset import load_packed, sidecar_path
+from paths import project_path
+
+# Metrics reported for every country; the overlap window is computed over WINDOW_METRICS.
+REPORT_METRICS = ["realHousePriceIndex", "realIncome", "mortgageRate", "rentPriceIndex", "numberOfHouseholds"]
+WINDOW_METRICS = ["realHousePriceIndex", "realIncome", "mortgageRate"]
+# Window metrics whose end years differ by more than this are reported as out of sync.
+DRIFT_THRESHOLD = 2
+DIVIDER = "-" * 78
+
+DATA_PATH = project_path("data", "affordability.ts")
+CACHE_PATH = project_path("_artifacts", "_cache", "coverage.json")
+# Bump when the layout of the coverage report changes.
+COVERAGE_VERSION = 1
+
+def load_data(filepath):
     """
-    Reads the affordability.ts file and extracts the JSON object.
+    Loads the generated dataset as packed series, preferring the JSON sidecar
+    written next to affordability.ts.
     """
     if not os.path.exists(filepath):
         print(f"Error: File not found at {filepath}")
         sys.exit(1)
 
-    with open(filepath, "r", encoding="utf-8") as f:
-        content = f.read()
-
-    # Regex to find the JSON object assigned to affordabilityData
-    # Matches: export const affordabilityData = { ... } as const;
-    match = re.search(r"export const affordabilityData = ({[\s\S]*?}) as const;", content)
-    
-    if not match:
-        print("Error: Could not find 'affordabilityData' JSON structure in the file.")
-        sys.exit(1)
-
-    json_str = match.group(1)
-    
-    # JavaScript object keys usually aren't quoted in TS, but JSON requires them.
-    # The generator script produces valid JSON syntax inside the variable, 
-    # so json.loads should work directly if the generator uses json.dumps.
     try:
-        return json.loads(json_str)
-    except json.JSONDecodeError as e:
-        print(f"Error parsing JSON data: {e}")
+        return load_packed(filepath)
+    except ValueError as e:
+        print(f"Error: {e}")
         sys.exit(1)
 
-def analyze_ranges(data):
-    print(f"{'COUNTRY':<8} {'METRIC':<22} {'START':<6} {'END':<6} {'COUNT':<6} {'STATUS'}")
-    print("-" * 70)
+def presence_cube(data, metrics=REPORT_METRICS):
+    """
+    Builds the boolean country x metric x year presence cube of a packed dataset.
+    Returns (countries, years, cube); cube[c, m, y] is True when the value exists.
+    """
+    import numpy as np
 
-    metrics_of_interest = [
-        "realHousePriceIndex", 
-        "realIncome", 
-        "mortgageRate", 
-        # "numberOfHouseholds", # Less critical for affordability ratios
-        # "rentPriceIndex"      # Less critical for mortgage burden
+    countries = sorted(data)
+    spans = [
+        (ci, mi, series['start'], series['values'])
+        for ci, country in enumerate(countries)
+        for mi, metric in enumerate(metrics)
+        for series in [data[country].get(metric)]
+        if series and series['values']
     ]
+    if not spans:
+        return countries, np.arange(0), np.zeros((len(countries), len(metrics), 0), dtype=bool)
+
+    country_idx, metric_idx, starts, values = zip(*spans)
+    lengths = np.fromiter((len(v) for v in values), dtype=np.int64, count=len(values))
+    starts = np.asarray(starts, dtype=np.int64)
+    first_year = int(starts.min())
+    last_year = int((starts + lengths - 1).max())
+    years = np.arange(first_year, last_year + 1)
+
+    total = int(lengths.sum())
+    flat = (v for series in values for v in series)
+    present = np.fromiter((v is not None for v in flat), dtype=bool, count=total)
+    offsets = np.arange(total) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+    cube = np.zeros((len(countries), len(metrics), len(years)), dtype=bool)
+    cube[
+        np.repeat(country_idx, lengths),
+        np.repeat(metric_idx, lengths),
+        np.repeat(starts - first_year, lengths) + offsets,
+    ] = present
+    return countries, years, cube
+
+def coverage_report(data, metrics=REPORT_METRICS, window_metrics=WINDOW_METRICS):
+    """
+    Computes start/end, point count and interior gaps of every series, plus each
+    country's overlap window and end-year drift over `window_metrics`, from the
+    presence cube in one vectorized pass. Returns one JSON-ready dict per country.
+    numpy is only imported here, so a cached report (see cached_coverage()) never loads it.
+    """
+    import numpy as np
 
-    for country_code, metrics in sorted(data.items()):
-        print(f"[{country_code}]")
-        
-        ranges = {}
-        
-        for metric in metrics_of_interest:
-            series = metrics.get(metric, [])
-            if not series:
-                print(f"{'':<8} {metric:<22} {'N/A':<6} {'N/A':<6} {'0':<6} ❌ MISSING")
+    countries, years, cube = presence_cube(data, metrics)
+    if not len(years):
+        years = np.zeros(1, dtype=np.int64)
+        cube = np.zeros(cube.shape[:2] + (1,), dtype=bool)
+    has = cube.any(axis=2)
+    count = cube.sum(axis=2)
+    first = cube.argmax(axis=2)
+    last = len(years) - 1 - cube[..., ::-1].argmax(axis=2)
+    start, end = years[first], years[last]
+
+    # Interior gaps: absent years between a series' first and last value.
+    positions = np.arange(len(years))
+    interior_missing = ~cube & has[..., None] & (positions >= first[..., None]) & (positions <= last[..., None])
+    gaps = interior_missing.sum(axis=2)
+    missing_years = {}
+    for c, m, y in zip(*(idx.tolist() for idx in np.nonzero(interior_missing))):
+        missing_years.setdefault((c, m), []).append(int(years[y]))
+
+    w = [metrics.index(m) for m in window_metrics]
+    complete = has[:, w].all(axis=1)
+    window_start = start[:, w].max(axis=1)
+    window_end = end[:, w].min(axis=1)
+    drift = end[:, w].max(axis=1) - end[:, w].min(axis=1)
+    limit_start = np.asarray(window_metrics)[start[:, w].argmax(axis=1)]
+    limit_end = np.asarray(window_metrics)[end[:, w].argmin(axis=1)]
+
+    report = []
+    for c, country in enumerate(countries):
+        series = {}
+        for m, metric in enumerate(metrics):
+            if not has[c, m]:
+                series[metric] = None
                 continue
+            series[metric] = {
+                "start": int(start[c, m]),
+                "end": int(end[c, m]),
+                "count": int(count[c, m]),
+                "gaps": int(gaps[c, m]),
+                "missingYears": missing_years.get((c, m), []),
+            }
+        entry = {"country": country, "metrics": series, "window": None, "drift": None}
+        if complete[c]:
+            entry["window"] = {
+                "start": int(window_start[c]),
+                "end": int(window_end[c]),
+                "overlaps": bool(window_start[c] <= window_end[c]),
+                "limitedStartBy": str(limit_start[c]),
+                "limitedEndBy": str(limit_end[c]),
+            }
+            entry["drift"] = int(drift[c])
+        report.append(entry)
+    return report
+
+def dataset_key(path):
+    """
+    [size, mtime_ns] of the data file and of its JSON sidecar (None when absent).
+    """
+    key = []
+    for file_path in (path, sidecar_path(path)):
+        stat = os.stat(file_path) if os.path.exists(file_path) else None
+        key.append([stat.st_size, stat.st_mtime_ns] if stat else None)
+    return key
 
-            years = [item['year'] for item in series]
-            start, end = min(years), max(years)
-            count = len(years)
-            ranges[metric] = (start, end)
+def cached_coverage(path, cache_path=CACHE_PATH, rebuild=False):
+    """
+    coverage_report() of the dataset at `path`, cached in `cache_path` while the
+    dataset files are unchanged. Only a recomputation loads the dataset.
+    """
+    key = {"version": COVERAGE_VERSION, "path": os.path.abspath(path), "files": dataset_key(path)}
+    if not rebuild and os.path.exists(cache_path):
+        try:
+            with open(cache_path, "r", encoding="utf-8") as f:
+                cached = json.load(f)
+            if cached.get("key") == key:
+                return cached["report"]
+        except (OSError, json.JSONDecodeError):
+            pass
+
+    report = coverage_report(load_data(path))
+    os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+    tmp_path = cache_path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({"key": key, "report": report}, f, separators=(",", ":"))
+    os.replace(tmp_path, cache_path)
+    return report
 
-            status = ""
-            print(f"{'':<8} {metric:<22} {start:<6} {end:<6} {count:<6} {status}")
+def print_report(report, window_metrics=WINDOW_METRICS, drift_threshold=DRIFT_THRESHOLD):
+    print(f"{'COUNTRY':<8} {'METRIC':<22} {'START':<6} {'END':<6} {'COUNT':<6} {'GAPS':<5} {'STATUS'}")
+    print(DIVIDER)
 
-        # Calculate Intersection
-        if len(ranges) == len(metrics_of_interest):
-            latest_starts = [r[0] for r in ranges.values()]
-            earliest_ends = [r[1] for r in ranges.values()]
-            
-            intersection_start = max(latest_starts)
-            intersection_end = min(earliest_ends)
+    for entry in report:
+        print(f"[{entry['country']}]")
+        for metric, stats in entry["metrics"].items():
+            if stats is None:
+                print(f"{'':<8} {metric:<22} {'N/A':<6} {'N/A':<6} {'0':<6} {'0':<5} ❌ MISSING")
+                continue
+            status = f"⚠️  missing {', '.join(map(str, stats['missingYears']))}" if stats["gaps"] else ""
+            print(f"{'':<8} {metric:<22} {stats['start']:<6} {stats['end']:<6} {stats['count']:<6} {stats['gaps']:<5} {status}")
 
-            # Check for Valid Intersection
-            if intersection_start > intersection_end:
+        window = entry["window"]
+        if window is not None:
+            if not window["overlaps"]:
                 print(f"\n   ⚠️  CRITICAL GAP: No overlapping timeline.")
-                print(f"       Earliest End: {intersection_end} (limit by {min(ranges, key=lambda k: ranges[k][1])})")
-                print(f"       Latest Start: {intersection_start} (limit by {max(ranges, key=lambda k: ranges[k][0])})")
-            else:
-                # Check specific mismatch: Income vs Mortgage Rate
-                inc_end = ranges["realIncome"][1]
-                rate_end = ranges["mortgageRate"][1]
-                diff = abs(inc_end - rate_end)
-
-                if diff > 2:
-                    print(f"\n   ⚠️  DATA ASYNC: Metrics out of sync by {diff} years.")
-                    print(f"       Income ends: {inc_end}")
-                    print(f"       Rates end:   {rate_end}")
-        
-        print("-" * 70)
+                print(f"       Earliest End: {window['end']} (limit by {window['limitedEndBy']})")
+                print(f"       Latest Start: {window['start']} (limit by {window['limitedStartBy']})")
+            elif entry["drift"] > drift_threshold:
+                print(f"\n   ⚠️  DATA ASYNC: Metrics out of sync by {entry['drift']} years.")
+                for metric in window_metrics:
+                    print(f"       {metric + ' ends:':<26} {entry['metrics'][metric]['end']}")
+
+        print(DIVIDER)
 
 if __name__ == "__main__":
-    # Assuming script is run from root or scripts/
-    path = os.path.join(os.getcwd(), "data", "affordability.ts")
-    if not os.path.exists(path):
-        # Try going up one level if run from scripts/
-        path = os.path.join(os.getcwd(), "..", "data", "affordability.ts")
-    
-    print(f"Analyzing: {path}\n")
-    data = load_typescript_data(path)
-    analyze_ranges(data)
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Reports the year coverage of every series in the generated dataset.")
+    parser.add_argument("--json", action="store_true", help="Print the coverage report as JSON instead of a table.")
+    parser.add_argument("--data", default=DATA_PATH, help="Generated data file to analyze (default: data/affordability.ts of this project).")
+    parser.add_argument("--rebuild", action="store_true", help="Recompute the report even if the dataset is unchanged since the last run.")
+    args = parser.parse_args()
+
+    report = cached_coverage(args.data, rebuild=args.rebuild)
+    if args.json:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    else:
+        print(f"Analyzing: {args.data}\n")
+        print_report(report)
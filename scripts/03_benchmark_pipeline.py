@@ -0,0 +1,340 @@
+import argparse
+import contextlib
+import copy
+import datetime
+import importlib
+import io
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+# Allow importing the numbered pipeline script as a module.
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+pipeline = importlib.import_module("01_fetch_affordability_data")
+
+from paths import project_path
+from periods import parse_periods
+from run_report import count_points
+from timeseries import TimeSeries, to_records
+from validation import validate
+
+DIVIDER = "-" * 78
+RESULTS_DIR = project_path("_artifacts", "benchmarks")
+# A stage is flagged when it is this much slower than the baseline (0.2 = 20%).
+REGRESSION_TOLERANCE = 0.2
+
+
+# --- Synthetic inputs ---
+
+def synthetic_raw_data(regions, seed=0, first_year=1980, last_year=2024):
+    """
+    Builds a raw_data dict shaped like process_files() output (after the CPI
+    conversion) for any number of regions, with random gaps and ragged ranges.
+    """
+    rng = np.random.default_rng(seed)
+    raw_data = {}
+    for i in range(regions):
+        data = {}
+        for metric in pipeline.ALL_METRICS:
+            start = int(rng.integers(first_year, first_year + 20))
+            end = int(rng.integers(last_year - 10, last_year + 1))
+            years = np.arange(start, end + 1)
+            # Drop ~10% of interior years to exercise gap filling.
+            keep = rng.random(len(years)) > 0.1
+            keep[[0, -1]] = True
+            values = 100 * np.cumprod(1 + rng.normal(0.02, 0.05, len(years)))
+            data[metric] = TimeSeries.from_points(years[keep], values[keep])
+        raw_data[f"R{i:05d}"] = data
+    return raw_data
+
+
+def synthetic_sdmx_frame(rng, areas, measures, years, operations=("_Z",)):
+    """
+    One OECD SDMX-style extract: every (area, measure, operation, year) row with
+    the label columns the real dumps carry and ~5% of observations missing.
+    """
+    grid = pd.MultiIndex.from_product(
+        [areas, measures, operations, years], names=["REF_AREA", "MEASURE", "STATISTICAL_OPERATION", "TIME_PERIOD"]
+    ).to_frame(index=False)
+    n = len(grid)
+    values = np.round(100 * np.exp(rng.normal(0, 0.3, n)), 3)
+    values[rng.random(n) < 0.05] = np.nan
+    return pd.DataFrame({
+        "STRUCTURE": "DATAFLOW",
+        "STRUCTURE_ID": "OECD.SDD.TPS:DSD_SYNTHETIC@DF_SYNTHETIC(1.0)",
+        "ACTION": "I",
+        "REF_AREA": grid["REF_AREA"],
+        "Reference area": grid["REF_AREA"].str.lower(),
+        "FREQ": "A",
+        "Frequency of observation": "Annual",
+        "MEASURE": grid["MEASURE"],
+        "Measure": grid["MEASURE"] + " (synthetic)",
+        "UNIT_MEASURE": "IX",
+        "Unit of measure": "Index",
+        "STATISTICAL_OPERATION": grid["STATISTICAL_OPERATION"],
+        "TIME_PERIOD": grid["TIME_PERIOD"].astype(str),
+        "OBS_VALUE": values,
+        "OBS_STATUS": "A",
+        "UNIT_MULT": 0,
+        "DECIMALS": 3,
+    })
+
+
+def write_synthetic_artifacts(root, countries=len(pipeline.COUNTRIES), years=45, extra_measures=2,
+                              junk_countries=10, banxico_years=20, seed=0):
+    """
+    Writes CSVs shaped like the _artifacts/ inputs under `root`. `countries` are
+    taken from COUNTRIES; `junk_countries` and `extra_measures` add rows the
+    pipeline has to read and filter out.
+    """
+    rng = np.random.default_rng(seed)
+    areas = pipeline.COUNTRIES[:countries] + [f"Z{i:02d}" for i in range(junk_countries)]
+    year_range = list(range(2025 - years, 2025))
+    junk = [f"JUNK{i}" for i in range(extra_measures)]
+
+    measures_by_file = {}
+    operations_by_file = {}
+    for config in pipeline.METRIC_CONFIG.values():
+        measures_by_file.setdefault(config["file"], []).append(config["measure"])
+        if config.get("statistical_operation"):
+            operations_by_file[config["file"]] = (config["statistical_operation"], "MEAN")
+
+    artifacts_dir = os.path.join(root, "_artifacts")
+    os.makedirs(artifacts_dir, exist_ok=True)
+    for file_path, measures in measures_by_file.items():
+        frame = synthetic_sdmx_frame(rng, areas, measures + junk, year_range, operations_by_file.get(file_path, ("_Z",)))
+        frame.to_csv(os.path.join(artifacts_dir, os.path.basename(file_path)), index=False)
+
+    days = pd.date_range(f"{2025 - banxico_years}-01-01", "2024-12-31", freq="D")
+    rates = np.round(8 + rng.normal(0, 1, len(days)), 2).astype(str).astype(object)
+    rates[rng.random(len(days)) < 0.05] = "N/E"
+    pd.DataFrame({"Fecha": days.strftime("%d/%m/%Y"), "SF43426": rates}).to_csv(
+        os.path.join(artifacts_dir, os.path.basename(pipeline.MEXICO_BANXICO_FILE)), index=False
+    )
+    pd.DataFrame({"year": [2025, 2026, 2027], "growth_pct": [1.2, -0.4, 2.1]}).to_csv(
+        os.path.join(artifacts_dir, os.path.basename(pipeline.AUSTRALIA_GROWTH_FILE)), index=False
+    )
+
+
+def use_artifacts_dir(artifacts_dir):
+    """
+    Points the pipeline's source files (METRIC_CONFIG and OVERLAYS) at `artifacts_dir`,
+    so the stages read the synthetic CSVs instead of the project's own _artifacts/.
+    """
+    for entry in list(pipeline.METRIC_CONFIG.values()) + [overlay["source"] for overlay in pipeline.OVERLAYS]:
+        entry["file"] = os.path.join(artifacts_dir, os.path.basename(entry["file"]))
+
+
+# --- Measurement ---
+
+def time_call(fn, *args, repeat=3, setup=None):
+    """
+    Returns the best wall time of `repeat` calls, with the stage's progress output silenced.
+    `setup` builds fresh arguments for each call when the stage mutates its input.
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        call_args = setup() if setup is not None else args
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            fn(*call_args)
+            best = min(best, time.perf_counter() - start)
+    return best
+
+
+def peak_alloc_mb(fn, *args, setup=None):
+    """
+    Peak Python heap allocated by one call, in MB (measured in a separate, untimed run).
+    """
+    call_args = setup() if setup is not None else args
+    tracemalloc.start()
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            fn(*call_args)
+        return tracemalloc.get_traced_memory()[1] / (1024 * 1024)
+    finally:
+        tracemalloc.stop()
+
+
+def csv_rows(file_path):
+    with open(file_path, "rb") as f:
+        return sum(1 for _ in f) - 1
+
+
+def process_all_series(raw_data):
+    for metrics in raw_data.values():
+        for series in metrics.values():
+            pipeline.process_series(series)
+
+
+def emit_typescript(final_data):
+    return pipeline.generate_typescript_file(to_records(final_data))
+
+
+def benchmark_stages(root, repeat):
+    """
+    Times every ETL stage on the synthetic artifacts under `root`.
+    Returns {stage: {'seconds', 'items', 'items_per_s', 'peak_alloc_mb'}}.
+    """
+    results = {}
+
+    def record(name, fn, items, *args, setup=None):
+        seconds = time_call(fn, *args, repeat=repeat, setup=setup)
+        results[name] = {
+            "seconds": round(seconds, 6),
+            "items": items,
+            "items_per_s": round(items / seconds) if seconds > 0 else None,
+            "peak_alloc_mb": round(peak_alloc_mb(fn, *args, setup=setup), 3),
+        }
+        print(f"{name:<28} {items:<12,} {seconds:<10.4f} {results[name]['items_per_s'] or 0:<14,} "
+              f"{results[name]['peak_alloc_mb']:<10.1f}")
+
+    use_artifacts_dir(os.path.join(root, "_artifacts"))
+    source_rows = sum(csv_rows(file_path) for file_path in {c["file"] for c in pipeline.METRIC_CONFIG.values()})
+    with contextlib.redirect_stdout(io.StringIO()):
+        raw_data = pipeline.process_files()
+    record("process_files", pipeline.process_files, source_rows)
+
+    source_files = sorted({c["file"] for c in pipeline.METRIC_CONFIG.values()})
+    labels = pd.concat(
+        [pd.read_csv(f, usecols=["TIME_PERIOD"], dtype=str)["TIME_PERIOD"] for f in source_files], ignore_index=True
+    )
+    record("parse_periods", parse_periods, len(labels), labels)
+
+    record("deflate_income", pipeline.deflate_income, count_points(raw_data),
+           setup=lambda: (copy.deepcopy(raw_data),))
+    with contextlib.redirect_stdout(io.StringIO()):
+        deflated = pipeline.deflate_income(copy.deepcopy(raw_data))
+
+    overlay_rows = sum(csv_rows(overlay["source"]["file"]) for overlay in pipeline.OVERLAYS)
+    record("process_overlays", pipeline.process_overlays, overlay_rows,
+           setup=lambda: (copy.deepcopy(deflated),))
+    with contextlib.redirect_stdout(io.StringIO()):
+        patched = pipeline.process_overlays(copy.deepcopy(deflated))
+
+    record("process_series", process_all_series, count_points(patched), patched)
+    record("synchronize_data", pipeline.synchronize_data, count_points(patched), patched)
+    with contextlib.redirect_stdout(io.StringIO()):
+        final_data = pipeline.synchronize_data(patched)
+    # Against itself as the previous dataset, so the comparison runs too.
+    record("validate", validate, count_points(final_data), final_data, final_data)
+    # Includes building the point records, which only happens at emission.
+    record("generate_typescript_file", emit_typescript, count_points(final_data), final_data)
+    return results
+
+
+def benchmark_synchronize(region_counts, repeat):
+    print(f"{'REGIONS':<10} {'POINTS':<12} {'SECONDS':<10} {'POINTS/S':<14} {'VALIDATE S':<10}")
+    print(DIVIDER)
+    results = {}
+    for regions in region_counts:
+        raw_data = synthetic_raw_data(regions)
+        points = count_points(raw_data)
+        elapsed = time_call(pipeline.synchronize_data, raw_data, repeat=repeat)
+        results[f"synchronize_data[{regions}]"] = {
+            "seconds": round(elapsed, 6), "items": points, "items_per_s": round(points / elapsed),
+        }
+        with contextlib.redirect_stdout(io.StringIO()):
+            final_data = pipeline.synchronize_data(raw_data)
+        final_points = count_points(final_data)
+        validated = time_call(validate, final_data, final_data, repeat=repeat)
+        results[f"validate[{regions}]"] = {
+            "seconds": round(validated, 6), "items": final_points, "items_per_s": round(final_points / validated),
+        }
+        print(f"{regions:<10} {points:<12,} {elapsed:<10.3f} {points / elapsed:<14,.0f} {validated:<10.3f}")
+    return results
+
+
+# --- Baselines ---
+
+def git_commit():
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                             cwd=os.path.dirname(os.path.abspath(__file__)), check=True)
+        return out.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def compare_to_baseline(results, baseline, tolerance=REGRESSION_TOLERANCE):
+    """
+    Prints each stage's change against the baseline and returns the regressed stage names.
+    Stages are only compared when both runs used the same input size.
+    """
+    print(f"{'STAGE':<28} {'BASELINE s':<12} {'NOW s':<10} {'CHANGE':<10}")
+    print(DIVIDER)
+    regressions = []
+    for name, now in results.items():
+        before = baseline.get("results", {}).get(name)
+        if not before or before.get("items") != now["items"]:
+            continue
+        change = now["seconds"] / before["seconds"] - 1 if before["seconds"] > 0 else 0.0
+        flag = ""
+        if change > tolerance:
+            regressions.append(name)
+            flag = "⚠️  REGRESSION"
+        print(f"{name:<28} {before['seconds']:<12.4f} {now['seconds']:<10.4f} {change:<+10.1%} {flag}")
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmarks the stages of 01_fetch_affordability_data.py on synthetic data.")
+    parser.add_argument("--countries", type=int, default=len(pipeline.COUNTRIES), help="Countries from COUNTRIES in the synthetic CSVs.")
+    parser.add_argument("--years", type=int, default=45, help="Years per series in the synthetic CSVs.")
+    parser.add_argument("--extra-measures", type=int, default=2, help="Junk measures per CSV that the pipeline filters out.")
+    parser.add_argument("--junk-countries", type=int, default=10, help="Non-OECD area codes per CSV that the pipeline filters out.")
+    parser.add_argument("--regions", type=int, nargs="+", default=[37, 500, 2000, 5000],
+                        help="Region counts to benchmark synchronize_data() with.")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per measurement (best is reported).")
+    parser.add_argument("--save", default=None, metavar="PATH",
+                        help=f"Where to save the results (default: {RESULTS_DIR}/<commit>.json).")
+    parser.add_argument("--baseline", default=None, metavar="PATH", help="Results file to compare against.")
+    parser.add_argument("--tolerance", type=float, default=REGRESSION_TOLERANCE,
+                        help="Slowdown vs. the baseline that counts as a regression (0.2 = 20%%).")
+    args = parser.parse_args()
+
+    header = f"{'STAGE':<28} {'ITEMS':<12} {'SECONDS':<10} {'ITEMS/S':<14} {'PEAK MB':<10}"
+    print("ETL stages")
+    print(DIVIDER)
+    print(header)
+    print(DIVIDER)
+    with tempfile.TemporaryDirectory() as root:
+        write_synthetic_artifacts(root, countries=args.countries, years=args.years,
+                                  extra_measures=args.extra_measures, junk_countries=args.junk_countries)
+        results = benchmark_stages(root, args.repeat)
+
+    print("\nsynchronize_data() and validate() scaling")
+    print(DIVIDER)
+    results.update(benchmark_synchronize(args.regions, args.repeat))
+
+    commit = git_commit()
+    run = {
+        "commit": commit,
+        "created_at": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+        "scale": {"countries": args.countries, "years": args.years, "extra_measures": args.extra_measures,
+                  "junk_countries": args.junk_countries, "repeat": args.repeat},
+        "results": results,
+    }
+    save_path = args.save or os.path.join(RESULTS_DIR, f"{commit}.json")
+    os.makedirs(os.path.dirname(save_path) or ".", exist_ok=True)
+    with open(save_path, "w", encoding="utf-8") as f:
+        json.dump(run, f, indent=2)
+    print(f"\nResults saved to {save_path}")
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        print(f"\nCompared with {args.baseline} (commit {baseline.get('commit', '?')})")
+        print(DIVIDER)
+        regressions = compare_to_baseline(results, baseline, args.tolerance)
+        if regressions:
+            print(f"\n❌ {len(regressions)} stage(s) slower than the baseline: {', '.join(regressions)}")
+            sys.exit(1)
+        print("\n✅ No regressions.")
@@ -0,0 +1,100 @@
+"""
+Per-country build manifest for incremental runs of 01_fetch_affordability_data.py.
+
+Each country's inputs (its ingested series plus any patch files applied to it)
+are fingerprinted. Countries whose fingerprint matches the previous run reuse
+the synchronized output stored here instead of being recomputed.
+"""
+import hashlib
+import json
+import os
+
+from paths import project_path
+
+MANIFEST_PATH = project_path("_artifacts", "_cache", "build_manifest.json")
+# Bump when the layout of the manifest changes.
+MANIFEST_VERSION = 2
+HASH_BLOCK_SIZE = 1 << 20
+
+
+def file_digest(file_path):
+    """
+    Returns the SHA-256 of a file, or None if it does not exist. The parse cache,
+    the download manifest and this manifest all hash files with it.
+    """
+    if not os.path.exists(file_path):
+        return None
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(HASH_BLOCK_SIZE), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class BuildManifest:
+    """
+    Maps country -> (input fingerprint, synchronized output of the last build).
+
+    `config` covers everything outside a country's inputs that affects its output
+    (base year, deflator, pipeline code); changing it invalidates every country.
+    """
+
+    def __init__(self, config, path=MANIFEST_PATH):
+        self.path = path
+        self.config = config
+        self.countries = {}
+        self._patch_digests = {}
+
+        if os.path.exists(path):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    stored = json.load(f)
+                if stored.get("version") == MANIFEST_VERSION and stored.get("config") == config:
+                    self.countries = stored.get("countries", {})
+            except (OSError, json.JSONDecodeError):
+                self.countries = {}
+
+    def fingerprint(self, country_data, patch_files=()):
+        """
+        Hashes a country's ingested series together with the patch files applied to it.
+        """
+        for file_path in patch_files:
+            if file_path not in self._patch_digests:
+                self._patch_digests[file_path] = file_digest(file_path)
+        payload = json.dumps(
+            {"data": country_data, "patches": {p: self._patch_digests[p] for p in sorted(patch_files)}},
+            sort_keys=True,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def changed(self, fingerprints):
+        """
+        Returns the countries whose fingerprint differs from the last build, in sorted order.
+        """
+        return [
+            country for country, fp in sorted(fingerprints.items())
+            if self.countries.get(country, {}).get("fingerprint") != fp
+        ]
+
+    def merge(self, computed, fingerprints, changed):
+        """
+        Combines freshly computed countries with the stored output of unchanged ones,
+        records the new fingerprints, and returns the full dataset in country order.
+        """
+        changed = set(changed)
+        merged = {}
+        countries = {}
+        for country, fp in sorted(fingerprints.items()):
+            output = computed.get(country) if country in changed else self.countries[country]["output"]
+            countries[country] = {"fingerprint": fp, "output": output}
+            if output is not None:
+                merged[country] = output
+        self.countries = countries
+        return merged
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"version": MANIFEST_VERSION, "config": self.config, "countries": self.countries}, f)
+        os.replace(tmp_path, self.path)
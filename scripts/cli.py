@@ -0,0 +1,60 @@
+"""
+Single entry point for the data tools:
+
+    python scripts/cli.py inspect [--batch ...]    # 00_interactive_inspector.py
+    python scripts/cli.py build [--workers N ...]  # 01_fetch_affordability_data.py
+    python scripts/cli.py analyze [--json]         # 02_analyze_data_ranges.py
+    python scripts/cli.py serve [--port 8787 ...]  # data_server.py
+
+Options after the subcommand go to the script unchanged (`cli.py build --help`
+lists them). The scripts resolve _artifacts/ and data/ against the project root
+(paths.py) wherever they are run from; subcommands also run with the project root
+as their working directory, so relative paths given as options are relative to it.
+
+Only the standard library is imported here. A subcommand's script, and with it
+pandas, numpy or inquirer, is loaded when the subcommand runs, so `--help` does not
+pay for them.
+"""
+import argparse
+import os
+import runpy
+import sys
+
+from paths import PROJECT_ROOT
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# subcommand -> (script, help)
+COMMANDS = {
+    "inspect": ("00_interactive_inspector.py", "Inspect the source CSV files in _artifacts/ (interactive, or --batch)."),
+    "build": ("01_fetch_affordability_data.py", "Build data/affordability.ts from the source files."),
+    "analyze": ("02_analyze_data_ranges.py", "Report the year coverage of every series in the generated dataset."),
+    "serve": ("data_server.py", "Serve per-country slices of the generated dataset over HTTP."),
+}
+
+
+def run_command(name, argv):
+    """
+    Runs a subcommand's script as __main__ with `argv` as its arguments. Returns its exit code.
+    """
+    script = os.path.join(SCRIPTS_DIR, COMMANDS[name][0])
+    sys.argv = [script] + list(argv)
+    if SCRIPTS_DIR not in sys.path:
+        sys.path.insert(0, SCRIPTS_DIR)
+    os.chdir(PROJECT_ROOT)
+    try:
+        runpy.run_path(script, run_name="__main__")
+    except SystemExit as e:
+        return e.code
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Data tools for the affordability dataset. Run `<command> --help` for the options of a command."
+    )
+    subparsers = parser.add_subparsers(dest="command", metavar="command", required=True)
+    for name, (script, help_text) in COMMANDS.items():
+        subparsers.add_parser(name, help=help_text, add_help=False)
+    args, rest = parser.parse_known_args()
+    sys.exit(run_command(args.command, rest))
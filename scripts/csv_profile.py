@@ -0,0 +1,228 @@
+"""
+Streaming profiles of the source CSVs, for 00_interactive_inspector.py.
+
+A profile holds a file's row count, columns with their inferred dtypes and null
+counts, the first rows, and for every key column its distinct count and first
+distinct values. It is built in one chunked pass, so memory does not depend on
+the file size. Distinct counts are exact up to EXACT_DISTINCT_LIMIT values per
+column and switch to a HyperLogLog estimate beyond that.
+
+Profiles are cached in _artifacts/_cache/profiles.json, keyed by path, size and
+mtime, so inspecting an unchanged file again does not read it. numpy and pandas
+are only imported once a file is actually profiled, so serving profiles from the
+cache does not load them.
+"""
+import json
+import os
+import time
+
+from paths import project_path
+
+CACHE_PATH = project_path("_artifacts", "_cache", "profiles.json")
+# Bump when the layout of a profile changes.
+PROFILE_VERSION = 2
+PROFILE_CHUNK_SIZE = 200_000
+HEAD_ROWS = 5
+SHOWN_VALUES = 15
+EXACT_DISTINCT_LIMIT = 10_000
+HLL_PRECISION = 14
+
+# Key columns often found in OECD data that are useful to summarize.
+KEY_COLUMNS_TO_INSPECT = [
+    "MEASURE",
+    "Measure",
+    "UNIT_MEASURE",
+    "Unit of measure",
+    "PRICE_BASE",
+    "Price base",
+    "ADJUSTMENT",
+    "Adjustment",
+    "FREQ",
+    "Frequency of observation",
+]
+# Code/label pairs whose combinations are listed together.
+PAIRED_COLUMNS = ("MEASURE", "Measure")
+
+
+def bit_length(values):
+    """
+    Exact bit length of every value of a uint64 array (0 for 0), by halving the
+    search width; unlike log2 it cannot round up just below a power of two.
+    """
+    import numpy as np
+
+    values = np.asarray(values, dtype=np.uint64)
+    length = np.zeros(values.shape, dtype=np.int64)
+    for shift in (32, 16, 8, 4, 2, 1):
+        high = values >> np.uint64(shift)
+        nonzero = high != 0
+        length += np.where(nonzero, shift, 0)
+        values = np.where(nonzero, high, values)
+    return length + (values != 0)
+
+
+class HyperLogLog:
+    """
+    HyperLogLog distinct-count estimator over pandas' 64-bit value hashes
+    (standard error about 1.04 / sqrt(2 ** precision), 0.8% by default).
+    """
+    __slots__ = ("precision", "registers")
+
+    def __init__(self, precision=HLL_PRECISION):
+        import numpy as np
+
+        self.precision = precision
+        self.registers = np.zeros(1 << precision, dtype=np.uint8)
+
+    def update(self, values):
+        import numpy as np
+        import pandas as pd
+
+        hashes = pd.util.hash_array(np.asarray(values, dtype=object))
+        index = (hashes >> np.uint64(64 - self.precision)).astype(np.int64)
+        rest = hashes & np.uint64((1 << (64 - self.precision)) - 1)
+        # Rank = position of the leftmost 1-bit in the remaining 64 - precision bits
+        # (64 - precision + 1 when they are all zero).
+        rank = 64 - self.precision + 1 - bit_length(rest)
+        np.maximum.at(self.registers, index, rank.astype(np.uint8))
+
+    def estimate(self):
+        import numpy as np
+
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        raw = alpha * m * m / np.sum(np.exp2(-self.registers.astype(np.float64)))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if raw <= 2.5 * m and zeros:
+            return int(round(m * np.log(m / zeros)))
+        return int(round(raw))
+
+
+class DistinctCounter:
+    """
+    Keeps the distinct values of one column in first-seen order until there are
+    more than `limit`, then continues with a HyperLogLog estimate.
+    """
+    __slots__ = ("limit", "values", "sketch", "shown")
+
+    def __init__(self, limit=EXACT_DISTINCT_LIMIT):
+        self.limit = limit
+        self.values = {}
+        self.sketch = None
+        self.shown = []
+
+    def update(self, column):
+        uniques = column.dropna().unique()
+        if self.sketch is None:
+            self.values.update(dict.fromkeys(uniques.tolist()))
+            if len(self.values) > self.limit:
+                self.sketch = HyperLogLog()
+                self.sketch.update(list(self.values))
+                self.shown = list(self.values)[:SHOWN_VALUES]
+                self.values = {}
+        else:
+            self.sketch.update(uniques)
+
+    def summary(self):
+        if self.sketch is not None:
+            return {"distinct": self.sketch.estimate(), "exact": False, "values": [str(v) for v in self.shown]}
+        return {"distinct": len(self.values), "exact": True, "values": [str(v) for v in list(self.values)[:SHOWN_VALUES]]}
+
+
+def merge_dtype(previous, current):
+    """
+    The dtype a column has over all chunks seen so far.
+    """
+    if previous is None or previous == current:
+        return current
+    if {previous, current} <= {"int64", "float64"}:
+        return "float64"
+    return "object"
+
+
+def profile_csv(file_path, chunk_size=PROFILE_CHUNK_SIZE, exact_limit=EXACT_DISTINCT_LIMIT):
+    """
+    Profiles one CSV in a single chunked pass. Returns a JSON-ready dict.
+    """
+    import pandas as pd
+
+    start = time.perf_counter()
+    stat = os.stat(file_path)
+    rows, head, dtypes, nulls = 0, None, {}, {}
+    counters, pairs = {}, {}
+
+    for chunk in pd.read_csv(file_path, chunksize=chunk_size):
+        if head is None:
+            head = chunk.head(HEAD_ROWS)
+            counters = {c: DistinctCounter(exact_limit) for c in KEY_COLUMNS_TO_INSPECT if c in chunk.columns}
+        rows += len(chunk)
+        for column, dtype in chunk.dtypes.items():
+            dtypes[column] = merge_dtype(dtypes.get(column), str(dtype))
+        for column, count in chunk.isna().sum().items():
+            nulls[column] = nulls.get(column, 0) + int(count)
+        for column, counter in counters.items():
+            counter.update(chunk[column])
+        if all(c in chunk.columns for c in PAIRED_COLUMNS) and len(pairs) <= exact_limit:
+            combos = chunk[list(PAIRED_COLUMNS)].drop_duplicates().dropna()
+            pairs.update(dict.fromkeys(zip(*(combos[c].astype(str).tolist() for c in PAIRED_COLUMNS))))
+
+    if head is None:
+        head = pd.read_csv(file_path, nrows=0)
+    return {
+        "version": PROFILE_VERSION,
+        "path": file_path,
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "exact_limit": exact_limit,
+        "rows": rows,
+        "columns": [{"name": c, "dtype": dtypes.get(c, "object"), "nulls": nulls.get(c, 0)} for c in head.columns],
+        "head": json.loads(head.to_json(orient="split", index=False)),
+        "keys": {column: counter.summary() for column, counter in counters.items()},
+        "pairs": [list(pair) for pair in pairs],
+        "seconds": round(time.perf_counter() - start, 3),
+    }
+
+
+class ProfileCache:
+    """
+    Maps a CSV path to its last profile, valid while the file's size and mtime are unchanged.
+    """
+
+    def __init__(self, path=CACHE_PATH, rebuild=False):
+        self.path = path
+        self.rebuild = rebuild
+        self.profiles = {}
+        if os.path.exists(path):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    self.profiles = json.load(f)
+            except (OSError, json.JSONDecodeError):
+                self.profiles = {}
+
+    def get(self, file_path, exact_limit=EXACT_DISTINCT_LIMIT):
+        """
+        Returns the cached profile of `file_path`, or None if the file changed since.
+        """
+        profile = self.profiles.get(file_path)
+        if self.rebuild or profile is None or profile.get("version") != PROFILE_VERSION:
+            return None
+        stat = os.stat(file_path)
+        if profile["size"] != stat.st_size or profile["mtime_ns"] != stat.st_mtime_ns:
+            return None
+        if profile["exact_limit"] < exact_limit and not all(k["exact"] for k in profile["keys"].values()):
+            return None
+        return profile
+
+    def put(self, profile):
+        self.profiles[profile["path"]] = profile
+
+    def save(self):
+        """
+        Persists the profiles, dropping those of files that no longer exist.
+        """
+        self.profiles = {path: p for path, p in self.profiles.items() if os.path.exists(path)}
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.profiles, f, separators=(",", ":"))
+        os.replace(tmp_path, self.path)
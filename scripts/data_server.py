@@ -0,0 +1,419 @@
+"""
+Standalone JSON service for the generated dataset.
+
+The app bundles the whole affordabilityData constant. This server loads
+data/affordability.json (the pipeline's sidecar; the .ts module when there is
+none) into an in-memory index once, and serves slices of it:
+
+    GET /v1/index                        countries with the first and last year of each metric
+    GET /v1/countries/<CODE>             one country, every metric
+    GET /v1/countries/<CODE>/<metric>    one series
+    GET /healthz                         dataset version, reloads and cache statistics
+
+Series are packed ({'start', 'values'}, as in data/countries/) unless
+`?format=records` asks for [{'year', 'value'}, ...] points, as in CountryData.
+Responses carry a strong ETag (a hash of the exact bytes sent, so gzip and
+identity differ) and answer If-None-Match with 304. Encoded bodies are kept in
+an LRU cache. With --precompress every response is encoded, identity and gzip,
+when the dataset loads.
+
+A background thread polls the data files and swaps in the new dataset, and drops
+the cache, when the pipeline rewrites them. A file that cannot be read yet keeps the
+current dataset until the next poll.
+
+    python data_server.py [--port 8787] [--precompress] [--processes N]
+
+load_test.py measures it on localhost.
+"""
+import argparse
+import collections
+import datetime
+import gzip
+import hashlib
+import json
+import multiprocessing
+import os
+import signal
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from dataset import load_packed, sidecar_path, unpack_series
+from paths import project_path
+
+DATA_PATH = project_path("data", "affordability.ts")
+CACHE_ENTRIES = 4096
+POLL_SECONDS = 1.0
+GZIP_LEVEL = 6
+FORMATS = ("packed", "records")
+ENCODINGS = ("identity", "gzip")
+
+
+def strong_etag(body):
+    return f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+
+
+def encode(payload, encoding):
+    """
+    Compact JSON bytes of `payload`, gzipped (with a fixed mtime, so the bytes and
+    their ETag are reproducible) for encoding='gzip'. Returns (body, etag).
+    """
+    body = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    if encoding == "gzip":
+        body = gzip.compress(body, GZIP_LEVEL, mtime=0)
+    return body, strong_etag(body)
+
+
+def files_key(ts_path):
+    """
+    (size, mtime_ns) of the data module and its sidecar; a change means the pipeline rewrote them.
+    """
+    key = []
+    for path in (ts_path, sidecar_path(ts_path)):
+        stat = os.stat(path) if os.path.exists(path) else None
+        key.append((stat.st_size, stat.st_mtime_ns) if stat else None)
+    return tuple(key)
+
+
+class Dataset:
+    """
+    One loaded version of the dataset: {country: {metric: packed series}} plus the
+    pre-encoded responses when loaded with precompress=True.
+    """
+
+    def __init__(self, countries, key, precompress=False):
+        self.countries = countries
+        self.key = key
+        self.metrics = sorted({metric for metrics in countries.values() for metric in metrics})
+        self.loaded_at = datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds")
+        digest = hashlib.sha256(json.dumps(countries, sort_keys=True, separators=(",", ":")).encode("utf-8"))
+        self.version = digest.hexdigest()[:16]
+        self.encoded = {}
+        if precompress:
+            for path in self.paths():
+                for fmt in FORMATS:
+                    payload = self.resource(path, fmt)
+                    for encoding in ENCODINGS:
+                        self.encoded[(path, fmt, encoding)] = encode(payload, encoding)
+
+    @classmethod
+    def load(cls, ts_path, precompress=False):
+        key = files_key(ts_path)
+        return cls(load_packed(ts_path), key, precompress)
+
+    def paths(self):
+        """
+        Every resource path this dataset serves.
+        """
+        yield "/v1/index"
+        for country, metrics in self.countries.items():
+            yield f"/v1/countries/{country}"
+            for metric in metrics:
+                yield f"/v1/countries/{country}/{metric}"
+
+    def resource(self, path, fmt="packed"):
+        """
+        The JSON-ready payload of a resource path, or None if there is no such resource.
+        """
+        parts = path.strip("/").split("/")
+        if parts == ["v1", "index"]:
+            spans = {}
+            for country, metrics in self.countries.items():
+                spans[country] = {
+                    metric: [series["start"], series["start"] + len(series["values"]) - 1] if series["values"] else None
+                    for metric, series in metrics.items()
+                }
+            return {"version": self.version, "metrics": self.metrics, "countries": spans}
+        if len(parts) not in (3, 4) or parts[:2] != ["v1", "countries"]:
+            return None
+        metrics = self.countries.get(parts[2])
+        if metrics is None:
+            return None
+        if len(parts) == 4:
+            series = metrics.get(parts[3])
+            if series is None:
+                return None
+            return unpack_series(series) if fmt == "records" else series
+        if fmt == "records":
+            return {metric: unpack_series(series) for metric, series in metrics.items()}
+        return metrics
+
+
+class ResponseCache:
+    """
+    LRU cache of encoded responses, (body, etag) by (dataset version, path, format, encoding).
+    """
+
+    def __init__(self, max_entries=CACHE_ENTRIES):
+        self.max_entries = max_entries
+        self.entries = collections.OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key, entry):
+        with self._lock:
+            self.entries[key] = entry
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self.entries.clear()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "entries": len(self.entries),
+                "bytes": sum(len(body) for body, _ in self.entries.values()),
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+def accepts_gzip(header):
+    """
+    True if an Accept-Encoding header allows gzip (q > 0).
+    """
+    for item in header.split(","):
+        coding, _, params = item.strip().partition(";")
+        if coding.strip().lower() in ("gzip", "*"):
+            q = params.strip()
+            if not q.startswith("q="):
+                return True
+            try:
+                return float(q[2:]) > 0
+            except ValueError:
+                return False
+    return False
+
+
+def etag_matches(header, etag):
+    """
+    If-None-Match comparison (weak, as RFC 9110 prescribes for it).
+    """
+    if header.strip() == "*":
+        return True
+    return etag in (tag.strip().removeprefix("W/") for tag in header.split(","))
+
+
+class DataHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server_version = "AffordabilityData/1.0"
+    # Headers and body go out in two writes; with Nagle on, the body waits for the
+    # client's delayed ACK (~40 ms) on every keep-alive request.
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def do_GET(self):
+        self.respond(send_body=True)
+
+    def do_HEAD(self):
+        self.respond(send_body=False)
+
+    def respond(self, send_body):
+        server = self.server
+        parts = urlsplit(self.path)
+        path = parts.path.rstrip("/") or "/"
+        if path == "/healthz":
+            body = json.dumps(server.health()).encode("utf-8")
+            self.send(200, body, {"Cache-Control": "no-store"}, send_body)
+            return
+
+        fmt = parse_qs(parts.query).get("format", ["packed"])[0]
+        if fmt not in FORMATS:
+            self.send_error_json(400, f"Unknown format '{fmt}'; use one of {', '.join(FORMATS)}.", send_body)
+            return
+        encoding = "gzip" if accepts_gzip(self.headers.get("Accept-Encoding", "")) else "identity"
+        entry = server.encoded(path, fmt, encoding)
+        if entry is None:
+            self.send_error_json(404, f"No resource at {path}.", send_body)
+            return
+
+        body, etag = entry
+        headers = {"ETag": etag, "Cache-Control": server.cache_control, "Vary": "Accept-Encoding"}
+        if encoding == "gzip":
+            headers["Content-Encoding"] = "gzip"
+        if etag_matches(self.headers.get("If-None-Match", ""), etag):
+            self.send(304, b"", headers, send_body=False)
+            return
+        self.send(200, body, headers, send_body)
+
+    def send_error_json(self, status, message, send_body):
+        self.send(status, json.dumps({"error": message}).encode("utf-8"), {"Cache-Control": "no-store"}, send_body)
+
+    def send(self, status, body, headers, send_body):
+        self.send_response(status)
+        if status != 304:
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+        # Public, read-only data: any origin may read it.
+        self.send_header("Access-Control-Allow-Origin", "*")
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+        if send_body and status != 304:
+            self.wfile.write(body)
+
+
+class DataServer(ThreadingHTTPServer):
+    """
+    Serves the dataset at `ts_path` on (host, port), reloading it when its files change.
+    """
+    daemon_threads = True
+
+    def __init__(self, ts_path=DATA_PATH, host="127.0.0.1", port=0, cache_entries=CACHE_ENTRIES,
+                 precompress=False, poll=POLL_SECONDS, max_age=0, verbose=False, reuse_port=False):
+        # SO_REUSEPORT lets several processes share one port (--processes).
+        self.allow_reuse_port = reuse_port
+        super().__init__((host, port), DataHandler)
+        self.ts_path = ts_path
+        self.precompress = precompress
+        self.poll = poll
+        self.cache_control = f"public, max-age={max_age}" if max_age else "no-cache"
+        self.verbose = verbose
+        self.cache = ResponseCache(cache_entries)
+        self.dataset = Dataset.load(ts_path, precompress)
+        self.reloads = 0
+        self.reload_error = None
+        self._stop = threading.Event()
+
+    def url(self, path=""):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}{path}"
+
+    def encoded(self, path, fmt, encoding):
+        """
+        (body, etag) of a resource in the current dataset, or None if it does not exist.
+        """
+        dataset = self.dataset
+        entry = dataset.encoded.get((path, fmt, encoding))
+        if entry is not None:
+            return entry
+        key = (dataset.version, path, fmt, encoding)
+        entry = self.cache.get(key)
+        if entry is None:
+            payload = dataset.resource(path, fmt)
+            if payload is None:
+                return None
+            entry = encode(payload, encoding)
+            self.cache.put(key, entry)
+        return entry
+
+    def reload_if_changed(self):
+        """
+        Loads the data files again if they changed since the current dataset was
+        loaded. Returns True when a new dataset was swapped in.
+        """
+        key = files_key(self.ts_path)
+        if key == self.dataset.key:
+            return False
+        try:
+            dataset = Dataset.load(self.ts_path, self.precompress)
+        except (OSError, ValueError) as e:
+            # Probably caught mid-write; the next poll tries again.
+            self.reload_error = f"{type(e).__name__}: {e}"
+            return False
+        self.dataset = dataset
+        self.cache.clear()
+        self.reloads += 1
+        self.reload_error = None
+        print(f"Reloaded {self.ts_path} (version {dataset.version}, {len(dataset.countries)} countries).")
+        return True
+
+    def watch(self):
+        while not self._stop.wait(self.poll):
+            self.reload_if_changed()
+
+    def health(self):
+        dataset = self.dataset
+        return {
+            "status": "ok",
+            "version": dataset.version,
+            "loadedAt": dataset.loaded_at,
+            "countries": len(dataset.countries),
+            "precompressed": len(dataset.encoded),
+            "reloads": self.reloads,
+            "reloadError": self.reload_error,
+            "cache": self.cache.stats(),
+            "pid": os.getpid(),
+        }
+
+    def start(self):
+        """
+        Serves (and watches the data files) from background threads.
+        """
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        if self.poll:
+            threading.Thread(target=self.watch, daemon=True).start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self.shutdown()
+        self.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def serve(args):
+    server = DataServer(args.data, args.host, args.port, args.cache_entries, args.precompress,
+                        args.poll, args.max_age, args.verbose, reuse_port=args.processes > 1)
+    dataset = server.dataset
+    print(f"[{os.getpid()}] Serving {len(dataset.countries)} countries (version {dataset.version}) "
+          f"from {args.data} at {server.url()}")
+    if server.poll:
+        threading.Thread(target=server.watch, daemon=True).start()
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serves per-country and per-metric slices of the generated dataset.")
+    parser.add_argument("--data", default=DATA_PATH, help="Generated data file (its .json sidecar is preferred).")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8787)
+    parser.add_argument("--precompress", action="store_true",
+                        help="Encode every response (identity and gzip) when the dataset loads instead of on first request.")
+    parser.add_argument("--cache-entries", type=int, default=CACHE_ENTRIES, help="Encoded responses kept in the LRU cache.")
+    parser.add_argument("--poll", type=float, default=POLL_SECONDS,
+                        help="Seconds between checks for a rewritten dataset (0 disables hot reload).")
+    parser.add_argument("--max-age", type=int, default=0,
+                        help="Cache-Control max-age in seconds (default 0: clients revalidate with the ETag).")
+    parser.add_argument("--processes", type=int, default=1,
+                        help="Server processes sharing the port via SO_REUSEPORT (Linux), one per core.")
+    parser.add_argument("--verbose", action="store_true", help="Log every request.")
+    args = parser.parse_args()
+
+    # SIGTERM exits normally, so multiprocessing stops the --processes workers on the way out.
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    if args.processes > 1:
+        if not sys.platform.startswith("linux") or args.port == 0:
+            parser.error("--processes needs SO_REUSEPORT (Linux) and a fixed --port.")
+        workers = [multiprocessing.Process(target=serve, args=(args,), daemon=True) for _ in range(args.processes - 1)]
+        for worker in workers:
+            worker.start()
+    serve(args)
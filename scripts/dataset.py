@@ -0,0 +1,109 @@
+"""
+Machine-readable sidecar of the generated dataset, for Python consumers.
+
+01_fetch_affordability_data.py writes data/affordability.json next to
+data/affordability.ts. Every series is packed as a start year plus a list of
+yearly values (None marks a missing year), so loading it is a single json.load
+with no per-point objects and no parsing of the TypeScript module.
+"""
+import json
+import os
+
+SIDECAR_FORMAT = "affordability-packed"
+SIDECAR_VERSION = 1
+
+TS_DATA_START = "export const affordabilityData = "
+TS_DATA_END = " as const;"
+
+
+def pack_series(series):
+    """
+    Encodes [{'year', 'value'}, ...] as {'start': first year, 'values': [...]}.
+    Years missing inside the range are stored as None.
+    """
+    if not series:
+        return {"start": None, "values": []}
+    by_year = {point['year']: point['value'] for point in series}
+    start, end = min(by_year), max(by_year)
+    return {"start": start, "values": [by_year.get(year) for year in range(start, end + 1)]}
+
+
+def unpack_series(packed):
+    """
+    Inverse of pack_series(); missing years are skipped.
+    """
+    start = packed["start"]
+    return [{'year': start + i, 'value': v} for i, v in enumerate(packed["values"]) if v is not None]
+
+
+def generate_sidecar(data, metrics, config=None, cpi=None):
+    """
+    Returns the sidecar JSON text for {country: {metric: [{'year', 'value'}, ...]}}.
+    `config` records the settings the data was built with (base year, deflator, ...),
+    `cpi` each country's packed annual consumer price index.
+    """
+    payload = {"format": SIDECAR_FORMAT, "version": SIDECAR_VERSION, "metrics": list(metrics)}
+    if config is not None:
+        payload["config"] = config
+    payload["countries"] = {
+        country: {metric: pack_series(series.get(metric, [])) for metric in metrics}
+        for country, series in data.items()
+    }
+    if cpi is not None:
+        payload["cpi"] = cpi
+    return json.dumps(payload, separators=(",", ":"))
+
+
+def sidecar_path(ts_path):
+    return os.path.splitext(ts_path)[0] + ".json"
+
+
+def load_config(ts_path):
+    """
+    The build settings recorded in a generated data file's sidecar, or None when
+    there is no readable sidecar or it was written without them.
+    """
+    try:
+        with open(sidecar_path(ts_path), "r", encoding="utf-8") as f:
+            return json.load(f).get("config")
+    except (OSError, ValueError):
+        return None
+
+
+def load_cpi(ts_path):
+    """
+    {country: packed annual CPI} recorded in a generated data file's sidecar,
+    or {} when there is no readable sidecar or it was written without it.
+    """
+    try:
+        with open(sidecar_path(ts_path), "r", encoding="utf-8") as f:
+            return json.load(f).get("cpi") or {}
+    except (OSError, ValueError):
+        return {}
+
+
+def load_packed(ts_path):
+    """
+    Returns {country: {metric: {'start', 'values'}}} for a generated data file.
+    Reads the JSON sidecar when present; otherwise falls back to slicing the
+    object literal out of the .ts module.
+    """
+    json_path = sidecar_path(ts_path)
+    if os.path.exists(json_path):
+        with open(json_path, "r", encoding="utf-8") as f:
+            payload = json.load(f)
+        if payload.get("format") != SIDECAR_FORMAT or payload.get("version") != SIDECAR_VERSION:
+            raise ValueError(f"Unsupported sidecar format in {json_path}")
+        return payload["countries"]
+
+    with open(ts_path, "r", encoding="utf-8") as f:
+        content = f.read()
+    start = content.find(TS_DATA_START)
+    end = content.rfind(TS_DATA_END)
+    if start == -1 or end < start:
+        raise ValueError(f"Could not find 'affordabilityData' in {ts_path}")
+    records = json.loads(content[start + len(TS_DATA_START):end])
+    return {
+        country: {metric: pack_series(series) for metric, series in metrics.items()}
+        for country, metrics in records.items()
+    }
@@ -0,0 +1,254 @@
+"""
+Derived affordability series, precomputed at build time.
+
+The front end used to rebuild house prices, price-to-income and mortgage burden
+from the raw series on every render (lib/insights.ts getMetricsForYear(),
+lib/metrics.ts calcMortgagePayment()/calcMPS()). This module evaluates the same
+formulas, in the same order of operations, for every country and year at once
+on a country x year grid, and writes data/derivedMetrics.ts so the client only
+has to look values up.
+
+01_fetch_affordability_data.py calls it in its "derive" stage; running this file
+directly regenerates data/derivedMetrics.ts from the current data/affordability.ts.
+"""
+import json
+import math
+from decimal import ROUND_HALF_UP, Decimal
+
+import numpy as np
+
+from dataset import load_packed
+from paths import project_path
+from simulator import load_base_house_prices
+
+DATA_FILE = project_path("data", "affordability.ts")
+OUTPUT_FILE = project_path("data", "derivedMetrics.ts")
+
+# House prices are anchored to BASE_HOUSE_PRICES_2015 at this index year (lib/insights.ts).
+PRICE_BASE_YEAR = 2015
+# Loan assumptions of the mortgage burden chart (`ltv` and `term` in app/[locale]/page.tsx).
+# The payment is proportional to the LTV, so other LTVs are a single multiplication away.
+BURDEN_LTV = 90
+BURDEN_TERM = 30
+
+SERIES = ["housePrice", "pti", "mortgageBurden"]
+
+
+def to_fixed(value, digits=2):
+    """
+    parseFloat(value.toFixed(digits)): rounds the exact binary value half away from zero.
+    """
+    return float(Decimal(value).quantize(Decimal(1).scaleb(-digits), rounding=ROUND_HALF_UP))
+
+
+def year_grid(data, countries, metric, first_year, n_years):
+    """
+    Country x year float grid of one packed metric; missing values are NaN.
+    """
+    grid = np.full((len(countries), n_years), np.nan)
+    for row, country in enumerate(countries):
+        series = data[country].get(metric)
+        if series and series["values"]:
+            offset = series["start"] - first_year
+            values = [np.nan if v is None else v for v in series["values"]]
+            grid[row, offset:offset + len(values)] = values
+    return grid
+
+
+def mortgage_payment(rate, price, ltv, term):
+    """
+    calcMortgagePayment() over arrays, including its zero-rate branch.
+    """
+    principal = price * (ltv / 100)
+    monthly_rate = rate / 100 / 12
+    number_of_payments = term * 12
+    # Scalar libm pow per element: NumPy's vectorized power may differ from it in the last bit.
+    growth = np.frompyfunc(math.pow, 2, 1)(1 + monthly_rate, number_of_payments).astype(float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        payment = principal * (monthly_rate * growth) / (growth - 1)
+    return np.where(monthly_rate == 0, principal / number_of_payments, payment)
+
+
+def derive_metrics(data, base_prices, ltv=BURDEN_LTV, term=BURDEN_TERM):
+    """
+    Computes the derived series of a packed dataset ({country: {metric: {'start', 'values'}}}).
+
+    Returns (countries, years, grids) where grids maps each name in SERIES to a
+    country x year array (NaN where getMetricsForYear() would return null), plus
+    'rentPriceIndex' and 'latestRate' for the rankings.
+    """
+    countries = sorted(data)
+    spans = [
+        (series["start"], series["start"] + len(series["values"]) - 1)
+        for country in countries
+        for series in data[country].values()
+        if series["values"]
+    ]
+    first_year = min((s for s, _ in spans), default=0)
+    years = np.arange(first_year, max((e for _, e in spans), default=first_year - 1) + 1)
+
+    index = year_grid(data, countries, "realHousePriceIndex", first_year, len(years))
+    income = year_grid(data, countries, "realIncome", first_year, len(years))
+    rent = year_grid(data, countries, "rentPriceIndex", first_year, len(years))
+    rates = year_grid(data, countries, "mortgageRate", first_year, len(years))
+
+    # Index anchor: the base year's value, else the first point of the series.
+    has_index = ~np.isnan(index)
+    first_index = index[np.arange(len(countries)), has_index.argmax(axis=1)]
+    in_range = 0 <= PRICE_BASE_YEAR - first_year < len(years)
+    base_index = index[:, PRICE_BASE_YEAR - first_year] if in_range else np.full(len(countries), np.nan)
+    base_index = np.where(np.isnan(base_index), first_index, base_index)
+    base_price = np.array([base_prices.get(c, np.nan) for c in countries])
+
+    valid_anchor = ~np.isnan(base_price) & ~np.isnan(base_index) & (base_index != 0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        house_price = base_price[:, None] * (index / base_index[:, None])
+    house_price[~valid_anchor] = np.nan
+
+    # getMetricsForYear() needs an income point that is not zero and a price for the year.
+    defined = ~np.isnan(income) & (income != 0) & ~np.isnan(house_price)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        pti = np.where(defined, house_price / income, np.nan)
+
+    # The chart prices every year at the country's latest mortgage rate.
+    has_rate = ~np.isnan(rates)
+    last_rate = rates[np.arange(len(countries)), len(years) - 1 - has_rate[:, ::-1].argmax(axis=1)]
+    last_rate = np.where(has_rate.any(axis=1), last_rate, np.nan)
+    payment = mortgage_payment(last_rate[:, None], house_price, ltv, term)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        burden = np.where(defined, (payment / (income / 12)) * 100, np.nan)
+
+    grids = {
+        "housePrice": np.where(defined, house_price, np.nan),
+        "pti": pti,
+        "mortgageBurden": burden,
+        "rentPriceIndex": rent,
+        "latestRate": last_rate,
+    }
+    return countries, years, grids
+
+
+def pack_row(years, row):
+    """
+    Packs one grid row as {'start', 'values'} over its defined span (None inside gaps).
+    """
+    defined = np.flatnonzero(~np.isnan(row))
+    if not len(defined):
+        return {"start": None, "values": []}
+    lo, hi = defined[0], defined[-1]
+    return {"start": int(years[lo]), "values": [None if np.isnan(v) else float(v) for v in row[lo:hi + 1]]}
+
+
+def last_value(row):
+    defined = np.flatnonzero(~np.isnan(row))
+    return float(row[defined[-1]]) if len(defined) else None
+
+
+def rank_codes(values):
+    """
+    Country codes ordered by descending value, ties in code order, as the charts'
+    stable `sort((a, b) => b.val - a.val)` leaves them. None values are dropped.
+    """
+    return [code for code, _ in sorted(((c, v) for c, v in values.items() if v is not None), key=lambda item: -item[1])]
+
+
+def build_derived(data, base_prices, ltv=BURDEN_LTV, term=BURDEN_TERM):
+    """
+    Returns {'countries': {code: {...}}, 'rankings': {...}} for a packed dataset.
+
+    Every country gets its derived series and a `latest` snapshot at its last
+    realIncome year, the year the home page and comparison table use. Rankings
+    reproduce how each comparison chart orders countries:
+    price-to-income at the last realIncome year, mortgage burden at its last
+    defined year and the rent price index at its last point, the latter two
+    rounded to 2 decimals first and zero values dropped.
+    """
+    countries, years, grids = derive_metrics(data, base_prices, ltv, term)
+    derived, pti_rank, burden_rank, rent_rank = {}, {}, {}, {}
+    for row, country in enumerate(countries):
+        entry = {name: pack_row(years, grids[name][row]) for name in SERIES}
+        income = data[country].get("realIncome")
+        latest = None
+        if income and income["values"]:
+            end = income["start"] + len(income["values"]) - 1 - years[0]
+            if not np.isnan(grids["pti"][row, end]):
+                latest = {
+                    "year": int(years[end]),
+                    "housePrice": float(grids["housePrice"][row, end]),
+                    "income": float(income["values"][-1]),
+                    "pti": float(grids["pti"][row, end]),
+                    "mortgageBurden": None if np.isnan(grids["mortgageBurden"][row, end]) else float(grids["mortgageBurden"][row, end]),
+                    "mortgageRate": None if np.isnan(grids["latestRate"][row]) else float(grids["latestRate"][row]),
+                }
+        entry["latest"] = latest
+        derived[country] = entry
+
+        pti_rank[country] = latest["pti"] if latest else None
+        burden, rent = last_value(grids["mortgageBurden"][row]), last_value(grids["rentPriceIndex"][row])
+        burden_rank[country] = (to_fixed(burden) or None) if burden is not None else None
+        rent_rank[country] = (to_fixed(rent) or None) if rent is not None else None
+
+    return {
+        "countries": derived,
+        "rankings": {
+            "pti": rank_codes(pti_rank),
+            "mortgageBurden": rank_codes(burden_rank),
+            "priceToRent": rank_codes(rent_rank),
+        },
+    }
+
+
+def generate_derived_file(derived, ltv=BURDEN_LTV, term=BURDEN_TERM):
+    countries = ",\n".join(
+        f"  {json.dumps(code)}: {json.dumps(entry, separators=(',', ':'))}" for code, entry in derived["countries"].items()
+    )
+    return f"""// This file is generated by scripts/01_fetch_affordability_data.py. Do not edit manually.
+
+// Loan assumptions mortgageBurden was computed with; the payment scales linearly with the LTV.
+export const MORTGAGE_BURDEN_LTV = {ltv};
+export const MORTGAGE_BURDEN_TERM = {term};
+
+export type DerivedSeries = {{
+  readonly start: number | null;
+  readonly values: readonly (number | null)[];
+}};
+
+export type DerivedSnapshot = {{
+  readonly year: number;
+  readonly housePrice: number;
+  readonly income: number;
+  readonly pti: number;
+  readonly mortgageBurden: number | null;
+  readonly mortgageRate: number | null;
+}};
+
+export type DerivedCountryMetrics = {{
+  readonly housePrice: DerivedSeries;
+  readonly pti: DerivedSeries;
+  readonly mortgageBurden: DerivedSeries;
+  readonly latest: DerivedSnapshot | null;
+}};
+
+export const derivedMetrics: {{ readonly [countryCode: string]: DerivedCountryMetrics }} = {{
+{countries}
+}};
+
+// Country codes by descending latest value, as the comparison charts order them.
+export const rankings: {{
+  readonly pti: readonly string[];
+  readonly mortgageBurden: readonly string[];
+  readonly priceToRent: readonly string[];
+}} = {json.dumps(derived["rankings"], separators=(",", ":"))};
+
+export function derivedValue(series: DerivedSeries, year: number): number | null {{
+  if (series.start === null) return null;
+  return series.values[year - series.start] ?? null;
+}}
+"""
+
+
+if __name__ == "__main__":
+    derived = build_derived(load_packed(DATA_FILE), load_base_house_prices())
+    with open(OUTPUT_FILE, "w", encoding="utf-8") as f:
+        f.write(generate_derived_file(derived))
+    print(f"✅ Derived metrics for {len(derived['countries'])} countries written to {OUTPUT_FILE}")
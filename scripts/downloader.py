@@ -0,0 +1,577 @@
+"""
+Concurrent, resumable downloads of the source files in _artifacts/.
+
+01_fetch_affordability_data.py --download calls download_sources() with
+{local file: url} for every source in METRIC_CONFIG and OVERLAYS before it
+parses anything. Transfers run on asyncio over a small pool of persistent
+HTTP/1.1 connections per host, using only the standard library:
+
+- Conditional requests: a file that is on disk and matches the manifest is
+  revalidated with If-None-Match / If-Modified-Since, so an unchanged source
+  costs a single 304.
+- Resumable streaming: bodies are streamed to <file>.part. A transfer that
+  breaks off is retried with a Range request (guarded by If-Range) and continues
+  where it stopped, also across runs.
+- Checksum manifest: _artifacts/_cache/downloads.json records the URL,
+  validators, size and SHA-256 of every file. A file that changed on disk since
+  it was downloaded is fetched again in full.
+- Safe replacement: a finished download only replaces the local file after its
+  CSV header was checked for the columns the pipeline reads. A local file with
+  no manifest entry (placed by hand) is never replaced by an unchecked download.
+
+Redirects (301/302/303/307/308) are followed. A 206 whose Content-Range does
+not start at the resume offset is discarded and the file fetched from zero.
+
+`python downloader.py --check` runs the whole cycle against a local
+fixture_server.py, with no network access.
+"""
+import argparse
+import asyncio
+import contextlib
+import csv
+import json
+import os
+import random
+import re
+import ssl
+import sys
+import tempfile
+import time
+from urllib.parse import urljoin, urlsplit
+
+from build_manifest import file_digest
+from paths import project_path
+
+MANIFEST_PATH = project_path("_artifacts", "_cache", "downloads.json")
+# Bump when the layout of the manifest changes.
+MANIFEST_VERSION = 1
+CONNECTIONS_PER_HOST = 4
+CHUNK_SIZE = 1 << 16
+TIMEOUT = 60
+RETRIES = 3
+RETRY_DELAY = 0.5
+MAX_REDIRECTS = 5
+REDIRECT_STATUSES = (301, 302, 303, 307, 308)
+CONTENT_RANGE_PATTERN = re.compile(r"^bytes (\d+)-(\d+)/(\d+|\*)$")
+USER_AGENT = "buying-house-data/1.0"
+
+
+class HttpError(Exception):
+    def __init__(self, status, reason, url):
+        super().__init__(f"HTTP {status} {reason} for {url}")
+        self.status = status
+
+
+class RangeMismatch(Exception):
+    """
+    A 206 response that does not continue the partial file where it stopped.
+    """
+
+
+class Response:
+    """
+    Status, headers (lower-cased names) and streamed body of one HTTP/1.1 response.
+    """
+
+    def __init__(self, status, reason, headers, reader, method, timeout):
+        self.status = status
+        self.reason = reason
+        self.headers = headers
+        self._reader = reader
+        self._timeout = timeout
+        self.keep_alive = headers.get("connection", "").lower() != "close"
+        self.complete = False
+        self._chunked = "chunked" in headers.get("transfer-encoding", "").lower()
+        self._length = int(headers["content-length"]) if "content-length" in headers else None
+        if method == "HEAD" or status in (204, 304) or 100 <= status < 200:
+            self._length, self._chunked = 0, False
+        elif self._length is None and not self._chunked:
+            # Body delimited by the end of the connection.
+            self.keep_alive = False
+
+    async def _read(self, n):
+        data = await asyncio.wait_for(self._reader.read(n), self._timeout)
+        if not data:
+            raise asyncio.IncompleteReadError(b"", n)
+        return data
+
+    async def _readline(self):
+        return await asyncio.wait_for(self._reader.readline(), self._timeout)
+
+    async def iter_chunks(self, size=CHUNK_SIZE):
+        """
+        Yields the body in blocks of at most `size` bytes. Raises IncompleteReadError
+        if the connection ends before the body does.
+        """
+        if self._chunked:
+            while True:
+                chunk_size = int((await self._readline()).split(b";")[0].strip() or b"0", 16)
+                if chunk_size == 0:
+                    while (await self._readline()).strip():
+                        pass
+                    break
+                remaining = chunk_size
+                while remaining:
+                    data = await self._read(min(size, remaining))
+                    remaining -= len(data)
+                    yield data
+                await self._readline()
+        elif self._length is not None:
+            remaining = self._length
+            while remaining:
+                data = await self._read(min(size, remaining))
+                remaining -= len(data)
+                yield data
+        else:
+            while True:
+                data = await asyncio.wait_for(self._reader.read(size), self._timeout)
+                if not data:
+                    break
+                yield data
+        self.complete = True
+
+    async def drain(self):
+        async for _ in self.iter_chunks():
+            pass
+
+
+class ConnectionPool:
+    """
+    Keeps up to `limit_per_host` persistent connections per (scheme, host, port)
+    and reuses them for later requests.
+    """
+
+    def __init__(self, limit_per_host=CONNECTIONS_PER_HOST, timeout=TIMEOUT):
+        self.limit_per_host = limit_per_host
+        self.timeout = timeout
+        self.opened = 0
+        self._idle = {}
+        self._limits = {}
+        self._ssl = None
+
+    async def _open(self, scheme, host, port):
+        context = None
+        if scheme == "https":
+            self._ssl = self._ssl or ssl.create_default_context()
+            context = self._ssl
+        reader, writer = await asyncio.wait_for(asyncio.open_connection(host, port, ssl=context), self.timeout)
+        self.opened += 1
+        return reader, writer
+
+    async def _read_head(self, reader):
+        while True:
+            status_line = await asyncio.wait_for(reader.readline(), self.timeout)
+            if not status_line:
+                raise asyncio.IncompleteReadError(b"", None)
+            _, status, *reason = status_line.decode("latin-1").rstrip("\r\n").split(" ", 2)
+            headers = {}
+            while True:
+                line = (await asyncio.wait_for(reader.readline(), self.timeout)).decode("latin-1").rstrip("\r\n")
+                if not line:
+                    break
+                name, _, value = line.partition(":")
+                headers[name.strip().lower()] = value.strip()
+            # Interim responses (100 Continue) are followed by the real one.
+            if not 100 <= int(status) < 200:
+                return int(status), reason[0] if reason else "", headers
+
+    @contextlib.asynccontextmanager
+    async def request(self, url, headers=None, method="GET"):
+        """
+        Sends one request and yields its Response. The connection goes back to the
+        pool if the body was read completely and the server keeps it open.
+        """
+        parts = urlsplit(url)
+        scheme = parts.scheme.lower()
+        key = (scheme, parts.hostname, parts.port or (443 if scheme == "https" else 80))
+        target = (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+        lines = [
+            f"{method} {target} HTTP/1.1",
+            f"Host: {parts.netloc}",
+            f"User-Agent: {USER_AGENT}",
+            "Accept-Encoding: identity",
+            "Connection: keep-alive",
+        ] + [f"{name}: {value}" for name, value in (headers or {}).items()]
+        payload = ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1")
+
+        async with self._limits.setdefault(key, asyncio.Semaphore(self.limit_per_host)):
+            while True:
+                idle = self._idle.setdefault(key, [])
+                reused = bool(idle)
+                reader, writer = idle.pop() if reused else await self._open(*key)
+                try:
+                    writer.write(payload)
+                    await writer.drain()
+                    status, reason, response_headers = await self._read_head(reader)
+                    break
+                except (ConnectionError, asyncio.IncompleteReadError):
+                    writer.close()
+                    # The server may have closed an idle connection; retry once on a fresh one.
+                    if not reused:
+                        raise
+                except BaseException:
+                    writer.close()
+                    raise
+
+            response = Response(status, reason, response_headers, reader, method, self.timeout)
+            try:
+                yield response
+            finally:
+                if response.complete and response.keep_alive:
+                    self._idle[key].append((reader, writer))
+                else:
+                    writer.close()
+
+    async def close(self):
+        for connections in self._idle.values():
+            for _, writer in connections:
+                writer.close()
+        self._idle = {}
+
+
+@contextlib.asynccontextmanager
+async def open_url(pool, url, headers=None, max_redirects=MAX_REDIRECTS):
+    """
+    pool.request() that follows up to `max_redirects` redirects and yields the final Response.
+    """
+    for _ in range(max_redirects + 1):
+        async with pool.request(url, headers) as response:
+            location = response.headers.get("location")
+            if response.status not in REDIRECT_STATUSES or not location:
+                yield response
+                return
+            await response.drain()
+        url = urljoin(url, location)
+    raise HttpError(response.status, "too many redirects", url)
+
+
+def csv_header_error(file_path, columns):
+    """
+    None if the first line of `file_path` is a CSV header containing every name in
+    `columns`, otherwise why it is not.
+    """
+    try:
+        with open(file_path, "r", encoding="utf-8-sig", newline="") as f:
+            header = next(csv.reader([f.readline()]), [])
+    except (OSError, UnicodeDecodeError, csv.Error) as e:
+        return f"not a readable CSV file ({type(e).__name__}: {e})"
+    missing = [column for column in columns if column not in header]
+    if missing:
+        return f"CSV header lacks {', '.join(missing)}"
+    return None
+
+
+class DownloadManifest:
+    """
+    Maps a local file to the URL it came from, the server's validators (ETag,
+    Last-Modified), and the size, mtime and SHA-256 it had when written. An
+    interrupted transfer keeps the validators of its .part file under 'partial'.
+    """
+
+    def __init__(self, path=MANIFEST_PATH):
+        self.path = path
+        self.files = {}
+        if os.path.exists(path):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    stored = json.load(f)
+                if stored.get("version") == MANIFEST_VERSION:
+                    self.files = stored.get("files", {})
+            except (OSError, json.JSONDecodeError):
+                self.files = {}
+
+    def get(self, file_path):
+        return self.files.setdefault(file_path, {})
+
+    def matches(self, file_path, url):
+        """
+        True if `file_path` is the unmodified copy of `url` the manifest describes.
+        Files whose size and mtime changed are re-hashed before deciding.
+        """
+        entry = self.files.get(file_path, {})
+        if entry.get("url") != url or "sha256" not in entry or not os.path.exists(file_path):
+            return False
+        stat = os.stat(file_path)
+        if stat.st_size == entry["size"] and stat.st_mtime_ns == entry["mtime_ns"]:
+            return True
+        if stat.st_size != entry["size"] or file_digest(file_path) != entry["sha256"]:
+            return False
+        entry["mtime_ns"] = stat.st_mtime_ns
+        return True
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"version": MANIFEST_VERSION, "files": self.files}, f, indent=1, sort_keys=True)
+        os.replace(tmp_path, self.path)
+
+
+async def download_file(pool, file_path, url, manifest, retries=RETRIES, columns=None):
+    """
+    Brings `file_path` up to date with `url`. Returns a result dict whose status is
+    'unchanged' (304), 'downloaded', 'resumed' (finished with a Range request) or 'failed'.
+    With `columns`, the download only replaces `file_path` if its CSV header has them;
+    without, a local file that has no manifest entry is left alone.
+    """
+    start = time.perf_counter()
+    entry = manifest.get(file_path)
+    result = {"file": file_path, "url": url, "status": "failed", "bytes": 0, "requests": 0, "error": None}
+    if columns is None and os.path.exists(file_path) and "sha256" not in entry:
+        result.update(error="local file has no manifest entry and no columns to check a download against; "
+                            "left unchanged", seconds=time.perf_counter() - start)
+        return result
+
+    conditional = {}
+    if manifest.matches(file_path, url):
+        if entry.get("etag"):
+            conditional["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            conditional["If-Modified-Since"] = entry["last_modified"]
+
+    part_path = file_path + ".part"
+    os.makedirs(os.path.dirname(file_path) or ".", exist_ok=True)
+    resumed = False
+    for attempt in range(retries + 1):
+        partial = entry.get("partial") or {}
+        offset = os.path.getsize(part_path) if os.path.exists(part_path) and partial.get("url") == url else 0
+        validator = partial.get("etag") or partial.get("last_modified")
+        headers = dict(conditional)
+        if offset and validator:
+            headers.update({"Range": f"bytes={offset}-", "If-Range": validator})
+        try:
+            result["requests"] += 1
+            async with open_url(pool, url, headers) as response:
+                if response.status == 304:
+                    await response.drain()
+                    result.update(status="unchanged", seconds=time.perf_counter() - start)
+                    return result
+                if response.status not in (200, 206):
+                    await response.drain()
+                    raise HttpError(response.status, response.reason, url)
+                if response.status == 206:
+                    match = CONTENT_RANGE_PATTERN.match(response.headers.get("content-range", ""))
+                    if not offset or not match or int(match.group(1)) != offset:
+                        # The body would not continue the partial file: drop both, start over.
+                        entry.pop("partial", None)
+                        with contextlib.suppress(FileNotFoundError):
+                            os.remove(part_path)
+                        raise RangeMismatch(f"Content-Range {response.headers.get('content-range')!r} "
+                                            f"does not resume at byte {offset}")
+                else:
+                    offset = 0
+                resumed = resumed or response.status == 206
+                entry["partial"] = {
+                    "url": url,
+                    "etag": response.headers.get("etag"),
+                    "last_modified": response.headers.get("last-modified"),
+                }
+                with open(part_path, "r+b" if offset else "wb") as f:
+                    f.seek(offset)
+                    f.truncate()
+                    async for chunk in response.iter_chunks():
+                        f.write(chunk)
+                        result["bytes"] += len(chunk)
+            break
+        except (OSError, asyncio.IncompleteReadError, asyncio.TimeoutError, HttpError, RangeMismatch) as e:
+            result["error"] = f"{type(e).__name__}: {e}"
+            client_error = isinstance(e, HttpError) and e.status < 500
+            if client_error or attempt == retries:
+                result["seconds"] = time.perf_counter() - start
+                return result
+            await asyncio.sleep(RETRY_DELAY * 2 ** attempt)
+
+    if columns is not None:
+        error = csv_header_error(part_path, columns)
+        if error:
+            entry.pop("partial", None)
+            os.remove(part_path)
+            result.update(error=f"download rejected, {error}; local file left unchanged",
+                          seconds=time.perf_counter() - start)
+            return result
+    sha256 = await asyncio.to_thread(file_digest, part_path)
+    os.replace(part_path, file_path)
+    stat = os.stat(file_path)
+    partial = entry.pop("partial")
+    entry.update({
+        "url": url,
+        "etag": partial["etag"],
+        "last_modified": partial["last_modified"],
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "sha256": sha256,
+    })
+    result.update(status="resumed" if resumed else "downloaded", error=None, seconds=time.perf_counter() - start)
+    return result
+
+
+async def download_all(sources, manifest_path=MANIFEST_PATH, connections=CONNECTIONS_PER_HOST, retries=RETRIES,
+                       columns=None):
+    """
+    Downloads {file: url} concurrently. `columns` maps files to the CSV columns a
+    download must have (see download_file()). Returns (results in source order, connections opened).
+    """
+    manifest = DownloadManifest(manifest_path)
+    pool = ConnectionPool(connections)
+    columns = columns or {}
+    try:
+        results = await asyncio.gather(*(
+            download_file(pool, file_path, url, manifest, retries, columns.get(file_path))
+            for file_path, url in sources.items()
+        ))
+    finally:
+        await pool.close()
+        manifest.save()
+    return list(results), pool.opened
+
+
+def download_sources(sources, manifest_path=MANIFEST_PATH, connections=CONNECTIONS_PER_HOST, retries=RETRIES,
+                     columns=None):
+    """
+    Brings every {file: url} source up to date and prints one line per file.
+    Sources without a URL are expected to be placed by hand. `columns` is passed
+    to download_all(). Returns the results.
+    """
+    print("\n--- Downloading Sources ---")
+    for file_path, url in sources.items():
+        if not url:
+            state = "present" if os.path.exists(file_path) else "MISSING"
+            print(f"  - {file_path}: no download URL configured, curated by hand ({state}).")
+    start = time.perf_counter()
+    results, opened = asyncio.run(download_all(
+        {f: u for f, u in sources.items() if u}, manifest_path, connections, retries, columns
+    ))
+    elapsed = time.perf_counter() - start
+
+    for r in results:
+        detail = f"{r['bytes'] / 1e6:.2f} MB in {r['seconds']:.2f}s" if r["bytes"] else f"{r['seconds']:.2f}s"
+        if r["status"] == "failed":
+            print(f"  - ❌ {r['file']}: {r['error']}")
+        else:
+            print(f"  - {r['file']}: {r['status']} ({detail}).")
+    counts = {status: sum(r["status"] == status for r in results) for status in ("unchanged", "downloaded", "resumed", "failed")}
+    total_mb = sum(r["bytes"] for r in results) / 1e6
+    print(f"  {counts['unchanged']} unchanged, {counts['downloaded']} downloaded, {counts['resumed']} resumed, "
+          f"{counts['failed']} failed; {total_mb:.2f} MB in {elapsed:.2f}s over {opened} connection(s).")
+    return results
+
+
+# --- Offline self-check against fixture_server.py ---
+
+FIXTURE_COLUMNS = ["REF_AREA", "MEASURE", "TIME_PERIOD", "OBS_VALUE"]
+
+
+def write_fixture(path, rows, seed):
+    rng = random.Random(seed)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(",".join(FIXTURE_COLUMNS) + "\n")
+        for i in range(rows):
+            f.write(f"C{i % 40:02d},M{seed},{1950 + i % 75},{rng.uniform(0, 500):.6f}\n")
+
+
+def check_cycle(n_files=6, rows=60_000, connections=2):
+    """
+    Downloads fixtures from a local FixtureServer through a cold run (one transfer
+    cut halfway, another also answered from the wrong offset on resume), a warm
+    run, an upstream change, a damaged local copy, a redirect and a hand-placed
+    file whose upstream is not a valid CSV. Returns [(check, passed)].
+    """
+    from fixture_server import FixtureServer
+
+    checks = []
+    with tempfile.TemporaryDirectory() as tmp:
+        upstream = os.path.join(tmp, "upstream")
+        work = os.path.join(tmp, "_artifacts")
+        os.makedirs(upstream)
+        names = [f"SOURCE_{i}.csv" for i in range(n_files)]
+        for i, name in enumerate(names):
+            write_fixture(os.path.join(upstream, name), rows * (i + 1), seed=i)
+        manifest_path = os.path.join(work, "_cache", "downloads.json")
+
+        def in_sync():
+            return all(
+                file_digest(os.path.join(work, name)) == file_digest(os.path.join(upstream, name)) for name in names
+            )
+
+        with FixtureServer(upstream) as server:
+            sources = {os.path.join(work, name): server.url(name) for name in names}
+            columns = {file_path: FIXTURE_COLUMNS for file_path in sources}
+
+            def run(sources=sources, columns=columns):
+                server.reset_log()
+                results, opened = asyncio.run(download_all(sources, manifest_path, connections, columns=columns))
+                return {os.path.basename(r["file"]): r["status"] for r in results}, opened
+
+            cut, misaligned = names[-1], names[-2]
+            for name in (cut, misaligned):
+                server.drop_after(name, os.path.getsize(os.path.join(upstream, name)) // 2)
+            server.misalign_range(misaligned)
+            statuses, opened = run()
+            checks.append(("cold run: every file downloaded and matches upstream", in_sync()))
+            checks.append(("cut transfer resumed with a Range request", statuses[cut] == "resumed" and any(
+                r["name"] == cut and r["status"] == 206 for r in server.requests
+            )))
+            checks.append(("resume answered from the wrong offset restarted from zero",
+                           statuses[misaligned] == "downloaded"
+                           and [r["status"] for r in server.requests if r["name"] == misaligned] == [200, 206, 200]))
+            # The two cut transfers and the abandoned misaligned one each cost a fresh connection.
+            checks.append((f"connections pooled ({opened} opened for {len(server.requests)} requests)",
+                           opened <= connections + 3))
+
+            statuses, _ = run()
+            checks.append(("warm run: exactly one 304 per file",
+                           sorted(r["status"] for r in server.requests) == [304] * n_files
+                           and set(statuses.values()) == {"unchanged"}))
+
+            changed = os.path.join(upstream, names[0])
+            with open(changed, "a", encoding="utf-8") as f:
+                f.write("ZZZ,M0,2030,1.0\n")
+            os.utime(changed, (time.time() + 10, time.time() + 10))
+            statuses, _ = run()
+            checks.append(("changed upstream file re-downloaded, the others 304",
+                           statuses[names[0]] == "downloaded"
+                           and sum(s == "unchanged" for s in statuses.values()) == n_files - 1 and in_sync()))
+
+            damaged = os.path.join(work, names[1])
+            with open(damaged, "r+b") as f:
+                f.write(b"XXXX")
+            statuses, _ = run()
+            checks.append(("damaged local copy fetched again in full",
+                           statuses[names[1]] == "downloaded" and in_sync()))
+
+            moved = os.path.join(work, "MOVED.csv")
+            server.redirect("moved/SOURCE_0.csv", names[0])
+            statuses, _ = run({moved: server.url("moved/SOURCE_0.csv")}, {moved: FIXTURE_COLUMNS})
+            checks.append(("redirect followed", statuses["MOVED.csv"] == "downloaded"
+                           and file_digest(moved) == file_digest(os.path.join(upstream, names[0]))))
+
+            curated = os.path.join(work, "CURATED.csv")
+            write_fixture(curated, 100, seed=99)
+            with open(os.path.join(upstream, "CURATED.csv"), "w", encoding="utf-8") as f:
+                f.write("<!DOCTYPE html><html><body>Service unavailable</body></html>\n")
+            before = file_digest(curated)
+            unchecked, _ = run({curated: server.url("CURATED.csv")}, None)
+            rejected, _ = run({curated: server.url("CURATED.csv")}, {curated: FIXTURE_COLUMNS})
+            checks.append(("hand-placed file kept: not replaced unchecked, invalid download rejected",
+                           unchecked["CURATED.csv"] == rejected["CURATED.csv"] == "failed"
+                           and file_digest(curated) == before and not os.path.exists(curated + ".part")))
+    return checks
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Resumable, conditional downloads of the source files.")
+    parser.add_argument("--check", action="store_true",
+                        help="Run a full download cycle against a local fixture server (no network access).")
+    args = parser.parse_args()
+
+    if args.check:
+        start = time.perf_counter()
+        checks = check_cycle()
+        for name, passed in checks:
+            print(f"{'✅' if passed else '❌'} {name}")
+        if not all(passed for _, passed in checks):
+            print("❌ Download check failed.")
+            sys.exit(1)
+        print(f"✅ All download checks passed in {time.perf_counter() - start:.2f}s.")
+    else:
+        parser.print_help()
@@ -0,0 +1,174 @@
+"""
+Streaming aggregation of high-frequency (daily, monthly) source feeds to annual values.
+
+Central bank feeds such as Banxico's are described declaratively (as overlay
+sources in OVERLAYS, 01_fetch_affordability_data.py): which columns hold the date and the value,
+the date format, sentinel strings that mark missing observations and how a year
+is summarized. The file is read in chunks and only per-year state is kept, so
+memory grows with the number of years, not the number of rows.
+
+Supported aggregates:
+    mean    running sum and count per year
+    sum     running sum per year
+    last    end-of-period value (the latest date of the year)
+    median  per-year quantile sketch; exact up to SKETCH_CAPACITY points a year
+"""
+import numpy as np
+import pandas as pd
+
+FEED_CHUNK_SIZE = 100_000
+SKETCH_CAPACITY = 512
+AGGREGATES = ("mean", "sum", "last", "median")
+
+
+class QuantileSketch:
+    """
+    Mergeable quantile sketch made of compactors (as in KLL/MRL sketches).
+
+    Level i holds items of weight 2**i. When a level exceeds `capacity` items it
+    is sorted and every other item is promoted to the next level, alternating the
+    kept half to stay unbiased. Quantiles are exact while everything fits in
+    level 0; afterwards the rank error is bounded by O(log(n / capacity) / capacity).
+    """
+    __slots__ = ("capacity", "levels", "count", "_offset")
+
+    def __init__(self, capacity=SKETCH_CAPACITY):
+        self.capacity = capacity
+        self.levels = [np.empty(0)]
+        self.count = 0
+        self._offset = 0
+
+    def update(self, values):
+        values = np.asarray(values, dtype=float)
+        self.count += len(values)
+        self.levels[0] = np.concatenate([self.levels[0], values])
+        level = 0
+        while len(self.levels[level]) > self.capacity:
+            items = np.sort(self.levels[level])
+            # An odd item out stays at this level so no weight is lost.
+            kept, items = (items[-1:], items[:-1]) if len(items) % 2 else (items[:0], items)
+            promoted = items[self._offset::2]
+            self._offset ^= 1
+            self.levels[level] = kept
+            if level + 1 == len(self.levels):
+                self.levels.append(np.empty(0))
+            self.levels[level + 1] = np.concatenate([self.levels[level + 1], promoted])
+            level += 1
+
+    def quantile(self, q):
+        if not self.count:
+            return None
+        if len(self.levels) == 1:
+            return float(np.quantile(self.levels[0], q))
+        items = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(level), 2.0 ** i) for i, level in enumerate(self.levels)])
+        order = np.argsort(items, kind="stable")
+        cumulative = np.cumsum(weights[order])
+        return float(items[order][np.searchsorted(cumulative, q * cumulative[-1])])
+
+
+class AnnualAggregator:
+    """
+    Per-year running state for one aggregate. Feed it (years, dates, values)
+    arrays chunk by chunk with update(); result() returns the annual series.
+    """
+
+    def __init__(self, how="mean", sketch_capacity=SKETCH_CAPACITY):
+        if how not in AGGREGATES:
+            raise ValueError(f"Unknown aggregate '{how}'. Expected one of {', '.join(AGGREGATES)}.")
+        self.how = how
+        self.sketch_capacity = sketch_capacity
+        self.sums = {}
+        self.counts = {}
+        self.last = {}
+        self.sketches = {}
+
+    def update(self, years, dates, values):
+        if not len(years):
+            return
+        unique_years, inverse = np.unique(years, return_inverse=True)
+
+        if self.how in ("mean", "sum"):
+            sums = np.bincount(inverse, weights=values)
+            counts = np.bincount(inverse)
+            for year, s, c in zip(unique_years.tolist(), sums.tolist(), counts.tolist()):
+                self.sums[year] = self.sums.get(year, 0.0) + s
+                self.counts[year] = self.counts.get(year, 0) + c
+
+        elif self.how == "last":
+            # Latest date of each year in this chunk; later rows win ties.
+            order = np.lexsort((np.arange(len(dates)), dates, inverse))
+            ends = np.flatnonzero(np.diff(inverse[order], append=len(unique_years)))
+            for i in order[ends].tolist():
+                year, date = int(years[i]), dates[i]
+                previous = self.last.get(year)
+                if previous is None or date >= previous[0]:
+                    self.last[year] = (date, float(values[i]))
+
+        else:
+            order = np.argsort(inverse, kind="stable")
+            bounds = np.searchsorted(inverse[order], np.arange(len(unique_years) + 1))
+            for k, year in enumerate(unique_years.tolist()):
+                sketch = self.sketches.setdefault(year, QuantileSketch(self.sketch_capacity))
+                sketch.update(values[order[bounds[k]:bounds[k + 1]]])
+
+    def result(self):
+        """
+        Returns [{'year', 'value'}, ...] sorted by year.
+        """
+        if self.how == "mean":
+            annual = {year: self.sums[year] / self.counts[year] for year in self.sums}
+        elif self.how == "sum":
+            annual = dict(self.sums)
+        elif self.how == "last":
+            annual = {year: value for year, (_, value) in self.last.items()}
+        else:
+            annual = {year: sketch.quantile(0.5) for year, sketch in self.sketches.items()}
+        return [{'year': year, 'value': value} for year, value in sorted(annual.items())]
+
+
+def aggregate_feed(feed, chunk_size=FEED_CHUNK_SIZE):
+    """
+    Streams the CSV described by `feed` and returns (annual series, stats).
+
+    `feed` keys: file, date_column, value_column, date_format (strftime, e.g.
+    "%d/%m/%Y"), aggregate (one of AGGREGATES, default "mean"), sentinels
+    (strings meaning "no observation", e.g. ["N/E"]) and decimals (rounding of
+    the annual values, optional). Rows whose date or value cannot be parsed are
+    skipped and counted in stats['invalid']; sentinel rows in stats['sentinel'].
+    """
+    date_column, value_column = feed["date_column"], feed["value_column"]
+    sentinels = list(feed.get("sentinels", []))
+    aggregator = AnnualAggregator(feed.get("aggregate", "mean"))
+    stats = {"rows": 0, "sentinel": 0, "invalid": 0}
+
+    reader = pd.read_csv(
+        feed["file"],
+        usecols=[date_column, value_column],
+        dtype={date_column: str, value_column: str},
+        keep_default_na=False,
+        chunksize=chunk_size,
+    )
+    for chunk in reader:
+        stats["rows"] += len(chunk)
+        raw = chunk[value_column].str.strip()
+        is_sentinel = raw.isin(sentinels) | (raw == "")
+        values = pd.to_numeric(raw.where(~is_sentinel), errors="coerce")
+        dates = pd.to_datetime(chunk[date_column], format=feed["date_format"], errors="coerce")
+        valid = values.notna() & dates.notna()
+        stats["sentinel"] += int(is_sentinel.sum())
+        stats["invalid"] += int((~valid & ~is_sentinel).sum())
+
+        dates = dates[valid]
+        aggregator.update(
+            dates.dt.year.to_numpy(),
+            dates.to_numpy(dtype="datetime64[ns]"),
+            values[valid].to_numpy(dtype=float),
+        )
+
+    series = aggregator.result()
+    decimals = feed.get("decimals")
+    if decimals is not None:
+        # np.round, like the pandas .round() this replaces.
+        series = [{'year': p['year'], 'value': float(np.round(p['value'], decimals))} for p in series]
+    return series, stats
@@ -0,0 +1,229 @@
+"""
+Local stand-in for the upstream data servers, for testing downloader.py offline.
+
+FixtureServer replays the files of a directory over HTTP/1.1 on 127.0.0.1 the
+way the real sources are expected to behave: persistent connections, strong
+ETags and Last-Modified headers, 304 answers to If-None-Match and
+If-Modified-Since, and byte ranges (206) guarded by If-Range. It can also cut a
+transfer short after a given number of bytes, once per file, to simulate a
+dropped connection, answer the next range request of a file from byte 0 like a
+server that ignores the requested offset, and redirect names to other files.
+It logs every request.
+
+    with FixtureServer("fixtures/") as server:
+        url = server.url("IRLT.csv")
+
+Running this file serves a directory until interrupted:
+
+    python fixture_server.py fixtures/ --port 8765
+"""
+import argparse
+import os
+import re
+import sys
+import threading
+from email.utils import formatdate, parsedate_to_datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import unquote, urlparse
+
+from build_manifest import file_digest
+
+BLOCK_SIZE = 1 << 16
+RANGE_PATTERN = re.compile(r"^bytes=(\d+)-(\d*)$")
+
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_HEAD(self):
+        self.respond(send_body=False)
+
+    def do_GET(self):
+        self.respond(send_body=True)
+
+    def respond(self, send_body):
+        server = self.server
+        name = unquote(urlparse(self.path).path).lstrip("/")
+        path = os.path.join(server.root, name)
+        if name in server.redirects:
+            self.finish_response(name, 302, {"Location": f"/{server.redirects[name]}", "Content-Length": "0"})
+            return
+        if not name or ".." in name.split("/") or not os.path.isfile(path):
+            self.finish_response(name, 404, {"Content-Length": "0"})
+            return
+
+        stat = os.stat(path)
+        etag, last_modified = server.validators(path, stat)
+        headers = {"ETag": etag, "Last-Modified": formatdate(stat.st_mtime, usegmt=True), "Accept-Ranges": "bytes"}
+
+        if self.not_modified(etag, last_modified):
+            self.finish_response(name, 304, headers)
+            return
+
+        start, end = 0, stat.st_size - 1
+        status = 200
+        match = RANGE_PATTERN.match(self.headers.get("Range", ""))
+        if match and self.headers.get("If-Range", etag) in (etag, headers["Last-Modified"]):
+            start = 0 if server.take_misaligned(name) else int(match.group(1))
+            end = min(int(match.group(2)), end) if match.group(2) else end
+            if start > end:
+                headers.update({"Content-Range": f"bytes */{stat.st_size}", "Content-Length": "0"})
+                self.finish_response(name, 416, headers)
+                return
+            status = 206
+            headers["Content-Range"] = f"bytes {start}-{end}/{stat.st_size}"
+
+        headers["Content-Type"] = "text/csv"
+        headers["Content-Length"] = str(end - start + 1)
+        self.finish_response(name, status, headers)
+        if send_body:
+            self.send_file(name, path, start, end - start + 1)
+
+    def not_modified(self, etag, last_modified):
+        if_none_match = self.headers.get("If-None-Match")
+        if if_none_match is not None:
+            return etag in [tag.strip() for tag in if_none_match.split(",")] or if_none_match.strip() == "*"
+        if_modified_since = self.headers.get("If-Modified-Since")
+        if if_modified_since:
+            try:
+                return int(last_modified) <= parsedate_to_datetime(if_modified_since).timestamp()
+            except (TypeError, ValueError):
+                return False
+        return False
+
+    def finish_response(self, name, status, headers):
+        self.server.record(self, name, status)
+        self.send_response(status)
+        for key, value in headers.items():
+            self.send_header(key, value)
+        self.end_headers()
+
+    def send_file(self, name, path, offset, length):
+        cut = self.server.take_drop(name)
+        with open(path, "rb") as f:
+            f.seek(offset)
+            remaining = length if cut is None else min(length, cut)
+            while remaining > 0:
+                block = f.read(min(BLOCK_SIZE, remaining))
+                if not block:
+                    break
+                self.wfile.write(block)
+                remaining -= len(block)
+        if cut is not None and cut < length:
+            # Simulated network failure: the client sees a short body and a closed connection.
+            self.wfile.flush()
+            self.close_connection = True
+            self.connection.shutdown(2)
+
+
+class FixtureServer(ThreadingHTTPServer):
+    """
+    Serves the files under `root` on 127.0.0.1 from a background thread.
+    `requests` logs (method, name, status, range, client port) of every request; the
+    client port tells connections apart.
+    """
+    daemon_threads = True
+
+    def __init__(self, root, port=0):
+        super().__init__(("127.0.0.1", port), FixtureHandler)
+        self.root = root
+        self.requests = []
+        self.redirects = {}
+        self._drops = {}
+        self._misaligned = set()
+        self._validators = {}
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def __enter__(self):
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.shutdown()
+        self.server_close()
+
+    def handle_error(self, request, client_address):
+        # Clients hanging up mid-body (a downloader dropping a response it will not use) are expected.
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+    def url(self, name=""):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/{name}"
+
+    def drop_after(self, name, n_bytes):
+        """
+        Cuts the next transfer of `name` after `n_bytes` bytes.
+        """
+        with self._lock:
+            self._drops[name] = n_bytes
+
+    def take_drop(self, name):
+        with self._lock:
+            return self._drops.pop(name, None)
+
+    def redirect(self, name, target):
+        """
+        Answers requests for `name` with a 302 to `target`.
+        """
+        self.redirects[name] = target
+
+    def misalign_range(self, name):
+        """
+        Serves the next range request of `name` from byte 0, still as a 206.
+        """
+        with self._lock:
+            self._misaligned.add(name)
+
+    def take_misaligned(self, name):
+        with self._lock:
+            if name not in self._misaligned:
+                return False
+            self._misaligned.discard(name)
+            return True
+
+    def validators(self, path, stat):
+        """
+        (strong ETag, mtime in whole seconds) of a file, re-hashed only when it changes.
+        """
+        key = (stat.st_size, stat.st_mtime_ns)
+        with self._lock:
+            cached = self._validators.get(path)
+        if cached is None or cached[0] != key:
+            cached = (key, f'"{file_digest(path)[:32]}"', str(int(stat.st_mtime)))
+            with self._lock:
+                self._validators[path] = cached
+        return cached[1], cached[2]
+
+    def record(self, handler, name, status):
+        with self._lock:
+            self.requests.append({
+                "method": handler.command,
+                "name": name,
+                "status": status,
+                "range": handler.headers.get("Range"),
+                "connection": handler.client_address[1],
+            })
+
+    def reset_log(self):
+        with self._lock:
+            self.requests = []
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serves a directory of fixture files like the upstream data sources.")
+    parser.add_argument("root", help="Directory whose files are served.")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    with FixtureServer(args.root, args.port) as server:
+        print(f"Serving {args.root} at {server.url()} (Ctrl+C to stop)")
+        try:
+            threading.Event().wait()
+        except KeyboardInterrupt:
+            pass
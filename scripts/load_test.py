@@ -0,0 +1,208 @@
+"""
+Load test for data_server.py on localhost.
+
+Starts the server in a subprocess on a free port (or targets a running one with
+--url) and drives it from --clients processes, each with its own keep-alive
+connection, for --duration seconds. Requests mix the index, whole countries and
+single series in both formats; a share ask for gzip and a share revalidate with
+If-None-Match, so cache hits, misses and 304s all occur.
+
+Prints requests per second, latency percentiles and status counts. With
+--min-rps the script exits with 1 below that throughput, for CI.
+
+    python load_test.py --clients 8 --duration 10 --precompress
+"""
+import argparse
+import collections
+import http.client
+import json
+import multiprocessing
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+from urllib.parse import urlsplit
+
+SERVER_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data_server.py")
+DIVIDER = "-" * 78
+STARTUP_TIMEOUT = 15
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def get_json(url, path):
+    parts = urlsplit(url)
+    connection = http.client.HTTPConnection(parts.hostname, parts.port, timeout=5)
+    try:
+        connection.request("GET", path)
+        return json.loads(connection.getresponse().read())
+    finally:
+        connection.close()
+
+
+def start_server(port, extra_args):
+    """
+    Runs data_server.py on `port` and waits until it answers /healthz. Returns the process.
+    """
+    process = subprocess.Popen(
+        [sys.executable, SERVER_SCRIPT, "--port", str(port), "--poll", "0"] + extra_args,
+        stdout=subprocess.DEVNULL,
+    )
+    deadline = time.monotonic() + STARTUP_TIMEOUT
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"data_server.py exited with code {process.returncode}")
+        try:
+            get_json(f"http://127.0.0.1:{port}", "/healthz")
+            return process
+        except OSError:
+            time.sleep(0.1)
+    process.terminate()
+    raise RuntimeError(f"data_server.py did not answer within {STARTUP_TIMEOUT}s")
+
+
+def workload(index):
+    """
+    Every resource path of the served dataset, from its /v1/index.
+    """
+    paths = ["/v1/index"]
+    for country, metrics in index["countries"].items():
+        paths.append(f"/v1/countries/{country}")
+        paths += [f"/v1/countries/{country}/{metric}" for metric, span in metrics.items() if span]
+    return paths
+
+
+def run_client(job):
+    """
+    One client: requests random paths over a single keep-alive connection until
+    the deadline. Returns its status counts and latencies in seconds.
+    """
+    url, paths, seed, deadline, gzip_share, revalidate_share = job
+    rng = random.Random(seed)
+    parts = urlsplit(url)
+    connection = http.client.HTTPConnection(parts.hostname, parts.port, timeout=10)
+    etags = {}
+    statuses = collections.Counter()
+    latencies = []
+    while time.perf_counter() < deadline:
+        path = rng.choice(paths)
+        if rng.random() < 0.2:
+            path += "?format=records"
+        headers = {}
+        if rng.random() < gzip_share:
+            headers["Accept-Encoding"] = "gzip"
+        key = (path, "Accept-Encoding" in headers)
+        if key in etags and rng.random() < revalidate_share:
+            headers["If-None-Match"] = etags[key]
+        start = time.perf_counter()
+        try:
+            connection.request("GET", path, headers=headers)
+            response = connection.getresponse()
+            response.read()
+        except (OSError, http.client.HTTPException):
+            statuses["error"] += 1
+            connection.close()
+            connection = http.client.HTTPConnection(parts.hostname, parts.port, timeout=10)
+            continue
+        latencies.append(time.perf_counter() - start)
+        statuses[response.status] += 1
+        if response.status == 200:
+            etags[key] = response.getheader("ETag")
+    connection.close()
+    return statuses, latencies
+
+
+def percentile(ordered, q):
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))] if ordered else float("nan")
+
+
+def load_test(url, clients, duration, gzip_share=0.5, revalidate_share=0.3):
+    """
+    Drives `url` from `clients` processes for `duration` seconds. Returns the summary dict.
+    """
+    paths = workload(get_json(url, "/v1/index"))
+    # Clients start together: the deadline is set after the pool is up.
+    with multiprocessing.Pool(clients) as pool:
+        deadline = time.perf_counter() + duration
+        jobs = [(url, paths, seed, deadline, gzip_share, revalidate_share) for seed in range(clients)]
+        started = time.perf_counter()
+        results = pool.map(run_client, jobs)
+        elapsed = time.perf_counter() - started
+
+    statuses = collections.Counter()
+    latencies = []
+    for client_statuses, client_latencies in results:
+        statuses.update(client_statuses)
+        latencies += client_latencies
+    latencies.sort()
+    requests = sum(statuses.values())
+    return {
+        "url": url,
+        "clients": clients,
+        "seconds": round(elapsed, 3),
+        "requests": requests,
+        "rps": round(requests / elapsed, 1),
+        "latency_ms": {name: round(percentile(latencies, q) * 1000, 3)
+                       for name, q in (("p50", 0.5), ("p95", 0.95), ("p99", 0.99), ("max", 1.0))},
+        "statuses": {str(status): count for status, count in sorted(statuses.items(), key=str)},
+        "resources": len(paths),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load-tests data_server.py on localhost.")
+    parser.add_argument("--url", default=None, help="Test a running server instead of starting one.")
+    parser.add_argument("--clients", type=int, default=8, help="Concurrent client processes, one connection each.")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds of load.")
+    parser.add_argument("--gzip", type=float, default=0.5, help="Share of requests that accept gzip.")
+    parser.add_argument("--revalidate", type=float, default=0.3, help="Share of repeat requests sent with If-None-Match.")
+    parser.add_argument("--precompress", action="store_true", help="Start the server with --precompress.")
+    parser.add_argument("--processes", type=int, default=1, help="Start the server with this many processes.")
+    parser.add_argument("--data", default=None, help="Dataset for the started server (default: the project's).")
+    parser.add_argument("--min-rps", type=float, default=None, help="Exit with 1 below this many requests per second.")
+    parser.add_argument("--save", default=None, metavar="PATH", help="Also write the summary as JSON.")
+    args = parser.parse_args()
+
+    server = None
+    url = args.url
+    if url is None:
+        port = free_port()
+        extra = ["--processes", str(args.processes)] + (["--precompress"] if args.precompress else [])
+        if args.data:
+            extra += ["--data", args.data]
+        server = start_server(port, extra)
+        url = f"http://127.0.0.1:{port}"
+    try:
+        print(f"Load test: {args.clients} clients x {args.duration:g}s against {url}")
+        summary = load_test(url, args.clients, args.duration, args.gzip, args.revalidate)
+        summary["server"] = get_json(url, "/healthz")
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+    latency = summary["latency_ms"]
+    print(DIVIDER)
+    print(f"{'REQUESTS':<10} {'REQ/S':<10} {'P50 MS':<8} {'P95 MS':<8} {'P99 MS':<8} {'MAX MS':<8}")
+    print(f"{summary['requests']:<10,} {summary['rps']:<10,.0f} {latency['p50']:<8.2f} {latency['p95']:<8.2f} "
+          f"{latency['p99']:<8.2f} {latency['max']:<8.2f}")
+    print(DIVIDER)
+    print("Statuses: " + ", ".join(f"{status}: {count:,}" for status, count in summary["statuses"].items()))
+    cache = summary["server"]["cache"]
+    print(f"Server: {summary['resources']} resources, {summary['server']['precompressed']} precompressed, "
+          f"cache {cache['hits']:,} hits / {cache['misses']:,} misses ({cache['entries']} entries, {cache['bytes'] / 1e3:.0f} kB)")
+
+    if args.save:
+        os.makedirs(os.path.dirname(args.save) or ".", exist_ok=True)
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(summary, f, indent=2)
+        print(f"Summary saved to {args.save}")
+    if args.min_rps is not None and summary["rps"] < args.min_rps:
+        print(f"❌ {summary['rps']:,.0f} requests/s is below --min-rps {args.min_rps:,.0f}.")
+        sys.exit(1)
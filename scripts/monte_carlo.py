@@ -0,0 +1,200 @@
+"""
+Monte Carlo bands for the buy-vs-rent outcome, precomputed at build time.
+
+For every country, annual home-price growth and market returns are bootstrapped
+jointly from its history in the generated dataset: each simulated year draws one
+historical year's real house price growth and its long-term rate plus an equity
+premium, deflated by that year's CPI inflation (recorded by the build in
+data/affordability.json), so both legs are in real terms like the front end's
+assumptions. Countries without a recorded CPI, e.g. in a dataset built before
+it was recorded, are deflated by a constant FALLBACK_INFLATION instead and
+listed in the output. Paths are simulated with the same model as
+lib/simulator.ts, evaluated year by year because growth varies along each path,
+and reduced to p5/p50/p95 home equity and investment value per horizon.
+
+Paths are generated in fixed-size chunks seeded by (seed, country, chunk), and
+countries are spread over a process pool, so the output is identical for any
+number of workers.
+
+01_fetch_affordability_data.py runs build_bands() in its "simulate_bands" stage
+and writes data/simulationBands.json; running this file directly regenerates it
+from the current data/affordability.ts.
+
+Usage:
+    python monte_carlo.py --paths 100000 --workers 4
+"""
+import argparse
+import json
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from dataset import load_cpi, load_packed
+from paths import project_path
+from simulator import (
+    DEFAULT_ASSUMPTIONS, country_inputs, geometric_sum, load_base_house_prices,
+    mortgage_payment, remaining_mortgage_balance,
+)
+
+DATA_FILE = project_path("data", "affordability.ts")
+OUTPUT_FILE = project_path("data", "simulationBands.json")
+
+PERCENTILES = [5, 50, 95]
+HORIZON = 30
+DOWN_PAYMENT_SHARE = 0.2
+MORTGAGE_TERM = 30
+# Added to the bootstrapped long-term rate to approximate a stock market return.
+EQUITY_PREMIUM = 3.0
+# Annual inflation, in percent, assumed for countries without a recorded CPI.
+FALLBACK_INFLATION = 2.0
+DEFAULT_PATHS = 20_000
+CHUNK_PATHS = 10_000
+
+
+def by_year(packed):
+    if not packed or not packed["values"]:
+        return {}
+    return dict(zip(range(packed["start"], packed["start"] + len(packed["values"])), packed["values"]))
+
+
+def historical_samples(metrics, cpi=None, premium=EQUITY_PREMIUM, inflation=FALLBACK_INFLATION):
+    """
+    Paired (real home price growth %, real market return %) observations for years
+    where the price index change, the long-term rate and inflation are all known.
+    The market return is the long-term rate plus `premium`, deflated by the year's
+    change in `cpi`, or by a constant `inflation` percent when `cpi` is None.
+    """
+    index, rates = by_year(metrics["realHousePriceIndex"]), by_year(metrics["mortgageRate"])
+    prices = by_year(cpi) if cpi is not None else None
+    growth, market_return = [], []
+    for year in sorted(index):
+        previous, current, r = index.get(year - 1), index[year], rates.get(year)
+        if prices is None:
+            price_change = 1 + inflation / 100
+        else:
+            previous_price, price = prices.get(year - 1), prices.get(year)
+            price_change = price / previous_price if previous_price and price is not None else None
+        if previous and current is not None and r is not None and price_change is not None:
+            growth.append((current / previous - 1) * 100)
+            market_return.append(((1 + (r + premium) / 100) / price_change - 1) * 100)
+    if not growth:
+        return None
+    return np.array(growth), np.array(market_return)
+
+
+def simulate_chunk(task):
+    """
+    Simulates one chunk of bootstrapped paths for one country.
+    Returns (home equity, investment value) arrays of shape (paths, horizon).
+    """
+    inputs, growth, returns, n_paths, horizon, seed_key = task
+    rng = np.random.default_rng(seed_key)
+    picks = rng.integers(0, len(growth), size=(n_paths, horizon))
+    home_growth = growth[picks]
+    market_return = returns[picks]
+    a = DEFAULT_ASSUMPTIONS
+
+    price = inputs["currentHomePrice"]
+    down = price * DOWN_PAYMENT_SHARE
+    mortgage_rate = inputs["mortgageRate"]
+    # Same monthly cost as calculateHomeownerPath(), including its payment quirk.
+    monthly_cost = float(mortgage_payment(np.float64(mortgage_rate), price, (down / price) * 100, MORTGAGE_TERM)) + (
+        price * a["annualOwnershipCostRate"] / 100 / 12
+    )
+
+    years = np.arange(1, horizon + 1)
+    remaining = remaining_mortgage_balance(np.float64(price - down), np.float64(mortgage_rate), MORTGAGE_TERM, years * 12)
+    equity = price * np.cumprod(1 + home_growth / 100, axis=1) - remaining
+
+    initial_rent = price * a["initialRentalYield"] / 100 / 12
+    surplus = np.maximum(monthly_cost - initial_rent * (1 + a["annualRentIncrease"] / 100) ** (years - 1), 0.0)
+    investment = np.empty((n_paths, horizon))
+    value = np.full(n_paths, down)
+    for t in range(horizon):
+        monthly_return = market_return[:, t] / 100 / 12
+        value = value * (1 + monthly_return) ** 12 + surplus[t] * geometric_sum(monthly_return, 12)
+        investment[:, t] = value
+    return equity, investment
+
+
+def country_bands(country_tasks):
+    """
+    Runs all chunks of one country and reduces them to percentile bands, so only
+    the small tables leave a worker process.
+    """
+    equity, investment = zip(*map(simulate_chunk, country_tasks))
+    equity, investment = np.concatenate(equity), np.concatenate(investment)
+    bands = {}
+    for name, values in (("homeEquity", equity), ("investment", investment)):
+        quantiles = np.percentile(values, PERCENTILES, axis=0)
+        bands[name] = {f"p{p}": np.round(q).tolist() for p, q in zip(PERCENTILES, quantiles)}
+    return bands
+
+
+def build_bands(data, cpi, base_prices, paths=DEFAULT_PATHS, horizon=HORIZON, seed=0, workers=1,
+                premium=EQUITY_PREMIUM):
+    """
+    Percentile bands of every country in the packed dataset `data`, with market
+    returns deflated by {country: packed annual CPI} `cpi`.
+    """
+    inputs = country_inputs(data, base_prices)
+    tasks = {}
+    constant_inflation = sorted(country for country in inputs if country not in cpi)
+    for country_index, country in enumerate(sorted(inputs)):
+        samples = historical_samples(data[country], cpi.get(country), premium)
+        if samples is None:
+            continue
+        growth, returns = samples
+        tasks[country] = [
+            (inputs[country], growth, returns, min(CHUNK_PATHS, paths - lo), horizon, [seed, country_index, chunk])
+            for chunk, lo in enumerate(range(0, paths, CHUNK_PATHS))
+        ]
+
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(country_bands, tasks.values()))
+    else:
+        results = [country_bands(country_tasks) for country_tasks in tasks.values()]
+    countries = dict(zip(tasks, results))
+    return {
+        "horizons": list(range(1, horizon + 1)),
+        "percentiles": PERCENTILES,
+        "paths": paths,
+        "seed": seed,
+        "assumptions": {
+            **DEFAULT_ASSUMPTIONS, "downPaymentShare": DOWN_PAYMENT_SHARE,
+            "mortgageTerm": MORTGAGE_TERM, "equityPremium": premium,
+            "fallbackInflation": FALLBACK_INFLATION,
+        },
+        # Countries whose market returns were deflated by fallbackInflation rather than their CPI.
+        "constantInflation": [country for country in constant_inflation if country in countries],
+        "countries": countries,
+    }
+
+
+def generate_bands_file(bands):
+    return json.dumps(bands, separators=(",", ":"))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Precomputes Monte Carlo buy-vs-rent bands for every country.")
+    parser.add_argument("--paths", type=int, default=DEFAULT_PATHS, help="Bootstrapped paths per country.")
+    parser.add_argument("--horizon", type=int, default=HORIZON, help="Years to simulate.")
+    parser.add_argument("--seed", type=int, default=0, help="Base seed; the output only depends on it, not on --workers.")
+    parser.add_argument("--workers", type=int, default=1, help="Worker processes for path generation.")
+    parser.add_argument("--premium", type=float, default=EQUITY_PREMIUM, help="Equity premium added to the long-term rate, in percent.")
+    parser.add_argument("--output", default=OUTPUT_FILE, help="Where to write the percentile tables.")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    bands = build_bands(load_packed(DATA_FILE), load_cpi(DATA_FILE), load_base_house_prices(), args.paths, args.horizon,
+                        args.seed, args.workers, args.premium)
+    elapsed = time.perf_counter() - start
+    with open(args.output, "w", encoding="utf-8") as f:
+        f.write(generate_bands_file(bands))
+    if bands["constantInflation"]:
+        print(f"  - WARNING: No CPI recorded for {', '.join(bands['constantInflation'])}; their market returns "
+              f"were deflated by a constant {FALLBACK_INFLATION}% a year.")
+    n = len(bands["countries"])
+    print(f"✅ {n} countries x {args.paths:,} paths x {args.horizon} years in {elapsed:.2f}s -> {args.output}")
@@ -0,0 +1,161 @@
+"""
+Declarative source overlays: country-specific fixes applied on top of the OECD series.
+
+Every overlay in OVERLAYS (01_fetch_affordability_data.py) names a country, a
+metric, a rule and a source. A source is either an annual CSV (year and value
+columns) or a high-frequency feed aggregated by feed_aggregator.py (it has a
+`date_column`). Rules:
+
+    replace            source values win wherever both have a year
+    fill_gaps          base values win; the source only adds missing years
+    splice_with_ratio  the source is rescaled to the base at their latest common
+                       year and adds the years the base lacks
+    extend_by_growth   source values are annual growth rates in percent,
+                       compounded from the base's last point for later years
+
+All overlays are applied together on long (country, metric, year, value)
+frames: the merges are joins and growth chains are grouped cumulative products,
+so adding overlays adds no per-country passes over the data. Rules run in the
+order above; within a rule, later overlays take precedence.
+"""
+import os
+
+import numpy as np
+import pandas as pd
+
+from feed_aggregator import aggregate_feed
+from timeseries import TimeSeries
+
+RULES = ("replace", "fill_gaps", "splice_with_ratio", "extend_by_growth")
+KEYS = ["country", "metric", "year"]
+
+
+def overlay_files(overlays):
+    """
+    {country: [source files]}, the inputs the incremental manifest fingerprints per country.
+    """
+    files = {}
+    for overlay in overlays:
+        files.setdefault(overlay["country"], []).append(overlay["source"]["file"])
+    return files
+
+
+def load_source(overlay):
+    """
+    Returns the overlay's annual (year, value) frame, or None when its file is missing.
+    Rows whose year or value is not numeric are dropped. Raises OSError, ValueError
+    or KeyError for a source that cannot be read, e.g. one missing a declared column.
+    """
+    source = overlay["source"]
+    if not os.path.exists(source["file"]):
+        return None
+    if "date_column" in source:
+        series, stats = aggregate_feed(source)
+        if stats["invalid"]:
+            print(f"  - WARNING: {overlay['name']}: skipped {stats['invalid']} of {stats['rows']} rows "
+                  "with an unparseable date or value.")
+        return pd.DataFrame(series, columns=["year", "value"])
+    frame = pd.read_csv(source["file"], usecols=[source["year_column"], source["value_column"]])
+    frame = frame[[source["year_column"], source["value_column"]]]
+    frame.columns = ["year", "value"]
+    frame = frame.apply(pd.to_numeric, errors="coerce").dropna()
+    return frame.astype({"year": np.int64})
+
+
+def target_frame(raw_data, targets):
+    """
+    Long frame of the (country, metric) annual series the overlays touch, and only those.
+    """
+    frames = []
+    for country, metric in targets:
+        series = raw_data.get(country, {}).get(metric)
+        if series:
+            years, values = series.observations()
+            frames.append(pd.DataFrame({"country": country, "metric": metric, "year": years, "value": values}))
+    if not frames:
+        return pd.DataFrame(columns=["country", "metric", "year", "value"]).astype({"year": np.int64, "value": float})
+    return pd.concat(frames, ignore_index=True)
+
+
+def apply_overlays(raw_data, overlays):
+    """
+    Applies `overlays` to {country: {metric: TimeSeries}} (annual series) in place
+    and returns it with a {overlay name: years written} summary.
+    """
+    for overlay in overlays:
+        if overlay["rule"] not in RULES:
+            raise ValueError(f"Unknown overlay rule '{overlay['rule']}' in '{overlay['name']}'.")
+
+    frames = []
+    for order, overlay in enumerate(overlays):
+        try:
+            source = load_source(overlay)
+        except (OSError, ValueError, KeyError) as e:
+            # A broken patch file skips that overlay, not the build.
+            print(f"  - ERROR: Could not read {overlay['source']['file']} ({type(e).__name__}: {e}). "
+                  f"Skipping {overlay['name']}.")
+            continue
+        if source is None:
+            print(f"  - WARNING: {overlay['source']['file']} not found. Skipping {overlay['name']}.")
+            continue
+        frames.append(source.assign(
+            country=overlay["country"], metric=overlay["metric"], rule=overlay["rule"],
+            order=order, decimals=overlay.get("decimals", np.nan),
+        ))
+    if not frames:
+        return raw_data, {}
+
+    src = pd.concat(frames, ignore_index=True).astype({"year": np.int64, "value": float})
+    targets = sorted(set(zip(src["country"], src["metric"])))
+    base = target_frame(raw_data, targets).assign(order=-1, decimals=np.nan)
+    by_rule = {rule: src[src["rule"] == rule].drop(columns="rule") for rule in RULES}
+
+    # replace / fill_gaps: one priority-ordered union, keeping the winning row per year.
+    combined = pd.concat([by_rule["fill_gaps"], base, by_rule["replace"]], ignore_index=True)
+    combined = combined.drop_duplicates(KEYS, keep="last")
+
+    # splice_with_ratio: scale each source to the base at their latest common year.
+    splice = by_rule["splice_with_ratio"]
+    if not splice.empty:
+        overlap = splice.merge(combined[KEYS + ["value"]], on=KEYS, suffixes=("", "_base"))
+        anchors = overlap.sort_values("year").groupby("order").tail(1)
+        for order in sorted(set(splice["order"]) - set(anchors["order"])):
+            print(f"  - WARNING: {overlays[order]['name']}: no year in common with the "
+                  f"{overlays[order]['country']} {overlays[order]['metric']} series to splice onto. Skipping.")
+        ratios = (anchors["value_base"] / anchors["value"]).rename("ratio")
+        splice = splice.merge(pd.concat([anchors["order"], ratios], axis=1), on="order")
+        splice["value"] = splice["value"] * splice["ratio"]
+        splice = splice.drop(columns="ratio").drop_duplicates(KEYS, keep="last")
+        combined = pd.concat([combined, splice], ignore_index=True).drop_duplicates(KEYS, keep="first")
+
+    # extend_by_growth: cumulative product of growth factors, seeded with each series' last value.
+    growth = by_rule["extend_by_growth"]
+    if not growth.empty:
+        last = combined.sort_values("year").groupby(["country", "metric"]).tail(1)
+        last = last[["country", "metric", "year", "value"]].rename(columns={"year": "last_year", "value": "last_value"})
+        extended = growth.merge(last, on=["country", "metric"])
+        for order in sorted(set(growth["order"]) - set(extended["order"])):
+            print(f"  - WARNING: {overlays[order]['name']}: no {overlays[order]['country']} "
+                  f"{overlays[order]['metric']} series to extend. Skipping.")
+        growth = extended[extended["year"] > extended["last_year"]].sort_values(["order", "year"])
+        seeds = growth.drop_duplicates("order").assign(value=lambda f: f["last_value"], year=-1)
+        growth = growth.assign(value=1 + growth["value"] / 100.0)
+        chain = pd.concat([seeds, growth]).sort_values(["order", "year"], kind="stable")
+        chain["value"] = chain.groupby("order")["value"].cumprod()
+        chain = chain[chain["year"] >= 0].drop(columns=["last_year", "last_value"])
+        combined = pd.concat([combined, chain], ignore_index=True).drop_duplicates(KEYS, keep="last")
+
+    # Round what each overlay wrote to its own precision.
+    for decimals in combined["decimals"].dropna().unique():
+        mask = combined["decimals"] == decimals
+        combined.loc[mask, "value"] = combined.loc[mask, "value"].round(int(decimals))
+
+    written = combined[combined["order"] >= 0]["order"].value_counts()
+    summary = {overlays[order]["name"]: int(count) for order, count in written.items()}
+
+    combined = combined.sort_values(KEYS)
+    for (country, metric), group in combined.groupby(["country", "metric"], sort=False):
+        raw_data.setdefault(country, {})[metric] = TimeSeries.from_points(
+            group["year"].to_numpy(), group["value"].to_numpy()
+        )
+    return raw_data, summary
@@ -0,0 +1,144 @@
+"""
+On-disk cache of the filtered source frames built by 01_fetch_affordability_data.py.
+
+Each entry is a Parquet file keyed on the source file's content hash plus the
+configuration used to filter it, so a warm run only reads a few small files.
+"""
+import hashlib
+import json
+import os
+
+import pandas as pd
+
+try:
+    import pyarrow  # noqa: F401  (Parquet engine used by pandas)
+except ImportError:
+    pyarrow = None
+
+from build_manifest import file_digest
+from paths import PROJECT_ROOT, project_path
+
+CACHE_DIR = project_path("_artifacts", "_cache")
+INDEX_FILE = "index.json"
+# Bump when the layout of cached frames changes.
+CACHE_VERSION = 1
+
+
+class ParseCache:
+    """
+    Maps (source file content, filter configuration) -> filtered DataFrame.
+
+    Content hashes are remembered per path alongside the file's size and mtime,
+    so unchanged files are not re-hashed on every run.
+    """
+
+    def __init__(self, cache_dir=CACHE_DIR, rebuild=False):
+        self.cache_dir = cache_dir
+        self.rebuild = rebuild
+        self.enabled = pyarrow is not None
+        self.index_path = os.path.join(cache_dir, INDEX_FILE)
+        self.index = {}
+
+        if not self.enabled:
+            print("  - WARNING: pyarrow is not installed. Parsed-artifact cache disabled.")
+            return
+
+        os.makedirs(cache_dir, exist_ok=True)
+        if os.path.exists(self.index_path):
+            try:
+                with open(self.index_path, "r", encoding="utf-8") as f:
+                    self.index = json.load(f)
+            except (OSError, json.JSONDecodeError):
+                self.index = {}
+
+    def file_digest(self, file_path):
+        """
+        Returns the SHA-256 of the file, reusing the stored hash if size and mtime match.
+        """
+        stat = os.stat(file_path)
+        entry = self.index.get(file_path)
+        if entry and entry["size"] == stat.st_size and entry["mtime_ns"] == stat.st_mtime_ns:
+            return entry["sha256"]
+
+        sha256 = file_digest(file_path)
+        self.index[file_path] = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "sha256": sha256}
+        return sha256
+
+    def entry_key(self, file_path, config):
+        payload = json.dumps(
+            {"version": CACHE_VERSION, "sha256": self.file_digest(file_path), "config": config},
+            sort_keys=True,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:20]
+
+    def _entry_prefix(self, file_path):
+        """
+        Name prefix of a source's entries: its stem plus a hash of its path relative to
+        the project root, so same-named files in different directories stay apart.
+        """
+        relative = os.path.relpath(os.path.abspath(file_path), PROJECT_ROOT).replace(os.sep, "/")
+        path_hash = hashlib.sha256(relative.encode("utf-8")).hexdigest()[:8]
+        return f"{os.path.splitext(os.path.basename(file_path))[0]}-{path_hash}"
+
+    def _entry_path(self, file_path, key):
+        return os.path.join(self.cache_dir, f"{self._entry_prefix(file_path)}.{key}.parquet")
+
+    def contains(self, file_path, config):
+        """
+        Returns True when load() would find an entry for this file and configuration.
+        """
+        if not self.enabled or self.rebuild:
+            return False
+        return os.path.exists(self._entry_path(file_path, self.entry_key(file_path, config)))
+
+    def load(self, file_path, config):
+        """
+        Returns the cached frame for this file and configuration, or None on a miss.
+        """
+        if not self.enabled or self.rebuild:
+            return None
+
+        entry_path = self._entry_path(file_path, self.entry_key(file_path, config))
+        if not os.path.exists(entry_path):
+            return None
+
+        try:
+            return pd.read_parquet(entry_path)
+        except Exception as e:
+            print(f"  - WARNING: Could not read cache entry {entry_path}. Reason: {e}")
+            return None
+
+    def store(self, file_path, config, df):
+        """
+        Writes the frame for this file and configuration, evicting stale entries for the same file
+        (same path; a file of the same name elsewhere keeps its entries).
+        """
+        if not self.enabled:
+            return
+
+        entry_path = self._entry_path(file_path, self.entry_key(file_path, config))
+        tmp_path = entry_path + ".tmp"
+        df.to_parquet(tmp_path, index=False)
+        os.replace(tmp_path, entry_path)
+
+        # Entries named after the bare stem predate per-path prefixes; nothing reads them any more.
+        prefixes = {self._entry_prefix(file_path), os.path.splitext(os.path.basename(file_path))[0]}
+        for name in os.listdir(self.cache_dir):
+            stale_path = os.path.join(self.cache_dir, name)
+            if not name.endswith(".parquet") or stale_path == entry_path:
+                continue
+            if name[:-len(".parquet")].rsplit(".", 1)[0] in prefixes:
+                os.remove(stale_path)
+
+    def save(self):
+        """
+        Persists the hash index, dropping entries for source files that no longer exist.
+        """
+        if not self.enabled:
+            return
+
+        self.index = {path: entry for path, entry in self.index.items() if os.path.exists(path)}
+        tmp_path = self.index_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.index, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.index_path)
@@ -0,0 +1,10 @@
+"""
+Locations inside the project, independent of the working directory.
+"""
+import os
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def project_path(*parts):
+    return os.path.join(PROJECT_ROOT, *parts)
@@ -0,0 +1,76 @@
+"""
+Vectorized parsing of SDMX TIME_PERIOD labels into (year, frequency, period).
+
+OECD extracts mix annual ("2015"), semi-annual ("2015-S1"), quarterly
+("2015-Q3") and monthly ("2015-07" or "2015-M07") observations. A source file
+has millions of rows but only a few hundred distinct labels, so every distinct
+label is parsed once (and remembered for the rest of the process) and the
+result is broadcast back to the rows through their category codes.
+
+A parsed period is (year, freq, period): `freq` observations per year and the
+1-based `period` within the year, e.g. "2015-Q3" is (2015, 4, 3) and "2015" is
+(2015, 1, 1). Within a series, period_index() numbers the observations
+consecutively, which is what timeseries.TimeSeries and interpolation run on.
+"""
+import numpy as np
+import pandas as pd
+
+# Observations per year by the letter in front of the period number.
+FREQUENCIES = {"A": 1, "S": 2, "Q": 4, "M": 12}
+PERIOD_PATTERN = r"^\s*(\d{4})(?:-([SQM]?)(\d{1,2}))?\s*$"
+
+# label -> (year, freq, period); unparseable labels map to (nan, 0, 0).
+_PARSED_LABELS = {}
+
+
+def parse_labels(labels):
+    """
+    Returns (year, freq, period) arrays for a list of distinct labels.
+    """
+    new = [label for label in dict.fromkeys(labels) if label not in _PARSED_LABELS]
+    if new:
+        parts = pd.Series(new, dtype=object).str.extract(PERIOD_PATTERN)
+        year = pd.to_numeric(parts[0], errors="coerce").to_numpy(dtype=float)
+        # No suffix: annual. A bare number ("2015-07") is a month.
+        letters = parts[1].fillna("A").replace("", "M")
+        freq = letters.map(FREQUENCIES).to_numpy(dtype=np.int64)
+        period = pd.to_numeric(parts[2], errors="coerce").fillna(1).to_numpy(dtype=np.int64)
+        valid = ~np.isnan(year) & (period >= 1) & (period <= freq)
+        for label, y, f, p, ok in zip(new, year.tolist(), freq.tolist(), period.tolist(), valid.tolist()):
+            _PARSED_LABELS[label] = (y, f, p) if ok else (np.nan, 0, 0)
+
+    parsed = [_PARSED_LABELS[label] for label in labels]
+    year, freq, period = (np.array(column) for column in zip(*parsed)) if parsed else ([], [], [])
+    return (
+        np.asarray(year, dtype=float),
+        np.asarray(freq, dtype=np.int64),
+        np.asarray(period, dtype=np.int64),
+    )
+
+
+def parse_periods(labels):
+    """
+    Parses a Series of TIME_PERIOD labels. Returns a frame aligned with `labels`
+    holding year (NaN where the label is missing or unparseable), freq and period.
+    """
+    if isinstance(labels.dtype, pd.CategoricalDtype):
+        codes, categories = labels.cat.codes.to_numpy(), labels.cat.categories
+    else:
+        codes, categories = pd.factorize(labels)
+    year, freq, period = parse_labels([str(c) for c in categories])
+
+    # Code -1 (a missing label) picks the trailing "unparseable" entry.
+    codes = np.where(codes < 0, len(categories), codes)
+    return pd.DataFrame({
+        "year": np.append(year, np.nan)[codes],
+        "freq": np.append(freq, 0)[codes],
+        "period": np.append(period, 0)[codes],
+    }, index=labels.index)
+
+
+def period_index(year, freq, period):
+    """
+    Consecutive number of an observation at its frequency (the year itself for annual data).
+    """
+    return year * freq + (period - 1)
+
@@ -0,0 +1,124 @@
+"""
+Stage-level instrumentation for 01_fetch_affordability_data.py.
+
+Every stage records wall time, CPU time, rows in/out and the process's peak RSS.
+The run report is written as JSON; with profiling enabled each stage is also
+run under cProfile and its stats are dumped to <profile_dir>/<stage>.prof.
+"""
+import contextlib
+import cProfile
+import datetime
+import json
+import os
+import re
+import sys
+import time
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+from paths import project_path
+
+REPORT_PATH = project_path("_artifacts", "run_report.json")
+PROFILE_DIR = project_path("_artifacts", "profiles")
+
+
+def peak_rss_mb():
+    """
+    Peak resident set size of this process in MB (None where unsupported).
+    """
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is reported in bytes on macOS and in kilobytes elsewhere.
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def count_points(data):
+    """
+    Number of data points in a {country: {metric: series}} dict (TimeSeries or point lists).
+    """
+    return sum(len(series) for metrics in data.values() for series in metrics.values())
+
+
+class StageRecord:
+    __slots__ = ("name", "wall_s", "cpu_s", "rows_in", "rows_out", "peak_rss_mb", "error")
+
+    def __init__(self, name, rows_in=None):
+        self.name = name
+        self.wall_s = None
+        self.cpu_s = None
+        self.rows_in = rows_in
+        self.rows_out = None
+        self.peak_rss_mb = None
+        self.error = None
+
+    def as_dict(self):
+        return {slot: getattr(self, slot) for slot in self.__slots__}
+
+
+class RunReport:
+    """
+    Collects StageRecords for one pipeline run.
+    """
+
+    def __init__(self, profile_dir=None):
+        self.profile_dir = profile_dir
+        self.started_at = datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds")
+        self.start = time.perf_counter()
+        self.stages = []
+        if profile_dir:
+            os.makedirs(profile_dir, exist_ok=True)
+
+    @contextlib.contextmanager
+    def stage(self, name, rows_in=None):
+        """
+        Times the enclosed block. Set `rows_out` on the yielded record; an exception
+        raised inside the block is recorded and re-raised.
+        """
+        record = StageRecord(name, rows_in)
+        self.stages.append(record)
+        profiler = cProfile.Profile() if self.profile_dir else None
+        wall, cpu = time.perf_counter(), time.process_time()
+        if profiler is not None:
+            profiler.enable()
+        try:
+            yield record
+        except BaseException as e:
+            record.error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            if profiler is not None:
+                profiler.disable()
+                file_name = re.sub(r"[^A-Za-z0-9_.-]+", "_", name).strip("_") + ".prof"
+                profiler.dump_stats(os.path.join(self.profile_dir, file_name))
+            record.wall_s = round(time.perf_counter() - wall, 6)
+            record.cpu_s = round(time.process_time() - cpu, 6)
+            record.peak_rss_mb = peak_rss_mb()
+
+    def as_dict(self):
+        return {
+            "started_at": self.started_at,
+            "total_wall_s": round(time.perf_counter() - self.start, 6),
+            "peak_rss_mb": peak_rss_mb(),
+            "stages": [record.as_dict() for record in self.stages],
+        }
+
+    def save(self, path=REPORT_PATH):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.as_dict(), f, indent=2)
+        os.replace(tmp_path, path)
+
+    def print_summary(self):
+        print(f"\n{'STAGE':<44} {'WALL s':>8} {'CPU s':>8} {'ROWS IN':>10} {'ROWS OUT':>10} {'RSS MB':>8}")
+        print("-" * 93)
+        for r in self.stages:
+            rows_in = f"{r.rows_in:,}" if r.rows_in is not None else "-"
+            rows_out = f"{r.rows_out:,}" if r.rows_out is not None else "-"
+            rss = f"{r.peak_rss_mb:.1f}" if r.peak_rss_mb is not None else "-"
+            flag = "  ❌" if r.error else ""
+            print(f"{r.name:<44} {r.wall_s:>8.3f} {r.cpu_s:>8.3f} {rows_in:>10} {rows_out:>10} {rss:>8}{flag}")
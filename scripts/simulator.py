@@ -0,0 +1,434 @@
+"""
+Vectorized buy-vs-rent simulation matching lib/simulator.ts.
+
+run_simulation() evaluates calculateHomeownerPath/calculateRenterPath for whole
+arrays of scenarios at once. The renter's monthly loop is replaced by closed-form
+annuity sums: rent is constant within a simulated year and grows geometrically
+between years, so the invested surplus over the run of years where it is
+positive is a pair of geometric series.
+reference_simulation() is a line-by-line scalar port of the TS code.
+`python simulator.py --check` compares both with golden vectors produced by
+lib/simulator.ts itself (simulator_golden.json, regenerated under node with
+--update-golden), then the vectorized engine with the scalar port on random
+scenarios.
+
+Usage:
+    python simulator.py --check 100000   # golden vectors, then parity against the scalar port
+    python simulator.py --update-golden  # rerun lib/simulator.ts under node
+    python simulator.py --bench 2000000  # scenarios per second
+    python simulator.py --grid out.npz   # every country x parameter grid
+"""
+import argparse
+import json
+import math
+import re
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+from paths import project_path
+
+# Mirrors DEFAULT_SIMULATION_ASSUMPTIONS in lib/simulationConstants.ts.
+DEFAULT_ASSUMPTIONS = {
+    "annualHomePriceGrowth": 3.0,
+    "annualStockMarketReturn": 7.0,
+    "annualRentIncrease": 2.0,
+    "annualOwnershipCostRate": 1.5,
+    "initialRentalYield": 4.0,
+}
+
+PARAMETERS = ["downPayment", "yearsToSimulate", "currentHomePrice", "mortgageRate", "mortgageTerm"] + list(DEFAULT_ASSUMPTIONS)
+RESULTS = ["finalHomeValue", "remainingMortgage", "homeEquity", "totalMonthlyCost",
+           "initialInvestment", "extraMonthlyInvestment", "finalInvestmentValue"]
+
+# Scenarios evaluated per block; bounds the (scenarios x years) temporaries of the renter path.
+CHUNK_SIZE = 1 << 16
+
+BASE_PRICES_FILE = project_path("lib", "constants.ts")
+# Scenarios evaluated by lib/simulator.ts under node, and the script that runs it.
+GOLDEN_FILE = project_path("scripts", "simulator_golden.json")
+GOLDEN_SCRIPT = project_path("scripts", "simulator_golden.mjs")
+GOLDEN_SCENARIOS = 500
+GOLDEN_SEED = 1
+
+
+# --- Vectorized engine ---
+
+def mortgage_payment(rate, price, ltv, term):
+    """
+    calcMortgagePayment() from lib/metrics.ts.
+    """
+    principal = price * (ltv / 100)
+    monthly_rate = rate / 100 / 12
+    n = term * 12
+    growth = (1 + monthly_rate) ** n
+    with np.errstate(divide="ignore", invalid="ignore"):
+        payment = principal * (monthly_rate * growth) / (growth - 1)
+    return np.where(monthly_rate == 0, principal / n, payment)
+
+
+def remaining_mortgage_balance(principal, annual_rate, term_years, payments_made):
+    """
+    calculateRemainingMortgageBalance() from lib/simulator.ts.
+    """
+    monthly_rate = annual_rate / 100 / 12
+    total = term_years * 12
+    with np.errstate(divide="ignore", invalid="ignore"):
+        balance = principal * ((1 + monthly_rate) ** total - (1 + monthly_rate) ** payments_made) / (
+            (1 + monthly_rate) ** total - 1
+        )
+    # Like the TS code, the zero-rate balance is not floored at 0.
+    linear = principal - (principal / (term_years * 12)) * payments_made
+    return np.where(annual_rate == 0, linear, np.where(balance > 0, balance, 0.0))
+
+
+def homeowner_path(p):
+    # The TS code passes the down-payment share as `ltv`, so the payment is computed
+    # on the down payment rather than the loan; kept as-is for parity.
+    price, down = p["currentHomePrice"], p["downPayment"]
+    monthly_mortgage = mortgage_payment(p["mortgageRate"], price, (down / price) * 100, p["mortgageTerm"])
+    final_home_value = price * (1 + p["annualHomePriceGrowth"] / 100) ** p["yearsToSimulate"]
+    remaining = remaining_mortgage_balance(price - down, p["mortgageRate"], p["mortgageTerm"], p["yearsToSimulate"] * 12)
+    ownership = (price * p["annualOwnershipCostRate"]) / 100 / 12
+    return {
+        "finalHomeValue": final_home_value,
+        "remainingMortgage": remaining,
+        "homeEquity": final_home_value - remaining,
+        "totalMonthlyCost": monthly_mortgage + ownership,
+    }
+
+
+def geometric_sum(d, n):
+    """
+    sum_{j < n} (1 + d) ** j, accurate for d near 0.
+    """
+    with np.errstate(divide="ignore", invalid="ignore"):
+        total = np.expm1(n * np.log1p(d)) / d
+    return np.where(d == 0, n, total)
+
+
+def surplus_years(initial_rent, rent_growth, monthly_cost, years):
+    """
+    The renter invests max(cost - rent, 0) each month and rent grows geometrically
+    once a year, so the years with a positive surplus form one contiguous run
+    [first, last). Returns (first, last) per scenario, clipped to [0, years).
+    """
+    with np.errstate(divide="ignore", invalid="ignore"):
+        crossing = np.ceil(np.log(monthly_cost / initial_rent) / np.log1p(rent_growth))
+    # Rent that starts at 0 never reaches the cost: +inf becomes "after the horizon".
+    crossing = np.nan_to_num(crossing, nan=0.0, posinf=np.iinfo(np.int32).max, neginf=0.0)
+    # Snap the float estimate onto the exact first year on the other side of the cost.
+    def below(y):
+        with np.errstate(over="ignore", invalid="ignore"):
+            return initial_rent * (1 + rent_growth) ** y < monthly_cost
+
+    rising = rent_growth > 0
+    crossing = np.where(rising & (crossing > 0) & ~below(crossing - 1), crossing - 1, crossing)
+    crossing = np.where(rising & below(crossing), crossing + 1, crossing)
+    crossing = np.where(~rising & (crossing > 0) & below(crossing - 1), crossing - 1, crossing)
+    crossing = np.where(~rising & ~below(crossing), crossing + 1, crossing)
+    crossing = np.clip(crossing, 0, years)
+
+    starts_below = below(0)
+    no_surplus = ~(monthly_cost > 0)
+    first = np.where(rising, 0.0, np.where(rent_growth == 0, 0.0, np.where(starts_below, 0.0, crossing)))
+    last = np.where(rising, np.where(starts_below, crossing, 0.0), np.where(rent_growth == 0, np.where(starts_below, years, 0.0), years))
+    last = np.where(no_surplus, first, last)
+    return first, np.maximum(last, first)
+
+
+def renter_path(p, monthly_cost):
+    years = p["yearsToSimulate"]
+    monthly_return = p["annualStockMarketReturn"] / 100 / 12
+    rent_growth = p["annualRentIncrease"] / 100
+    initial_rent = (p["currentHomePrice"] * p["initialRentalYield"]) / 100 / 12
+    months = years * 12
+
+    # Within a year every monthly contribution is the same, so a year's contributions are
+    # worth surplus * annuity_12 at its end, then compound yearly until the horizon.
+    annuity_12 = geometric_sum(monthly_return, 12)
+    yearly_return_m1 = np.expm1(12 * np.log1p(monthly_return))
+    log_yearly_return = 12 * np.log1p(monthly_return)
+
+    first, last = surplus_years(initial_rent, rent_growth, monthly_cost, years)
+    n = last - first
+    # sum over surplus years y of (cost - rent_y) * yearly_return ** (years - 1 - y)
+    cost_part = monthly_cost * np.exp((years - last) * log_yearly_return) * geometric_sum(yearly_return_m1, n)
+    ratio_m1 = (rent_growth - yearly_return_m1) / (1 + yearly_return_m1)
+    rent_part = (
+        initial_rent * (1 + rent_growth) ** first * np.exp((years - 1 - first) * log_yearly_return)
+        * geometric_sum(ratio_m1, n)
+    )
+    total_extra = 12 * (monthly_cost * n - initial_rent * (1 + rent_growth) ** first * geometric_sum(rent_growth, n))
+
+    final_value = p["downPayment"] * (1 + monthly_return) ** months + annuity_12 * (cost_part - rent_part)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        extra_monthly = np.where(months > 0, total_extra / months, 0.0)
+    return {
+        "initialInvestment": p["downPayment"],
+        "extraMonthlyInvestment": extra_monthly,
+        "finalInvestmentValue": final_value,
+    }
+
+
+def run_simulation(chunk_size=CHUNK_SIZE, **params):
+    """
+    runSimulation() over broadcast arrays of scenarios. Takes the SimulationParams
+    fields and the SimulationAssumptions fields as keyword arguments (assumptions
+    default to DEFAULT_ASSUMPTIONS; yearsToSimulate must be whole years) and
+    returns {result field: array} with the broadcast shape.
+    """
+    missing = [name for name in PARAMETERS if name not in params and name not in DEFAULT_ASSUMPTIONS]
+    if missing:
+        raise TypeError(f"run_simulation() missing parameters: {missing}")
+    values = [np.asarray(params.get(name, DEFAULT_ASSUMPTIONS.get(name)), dtype=np.float64) for name in PARAMETERS]
+    arrays = np.broadcast_arrays(*values)
+    shape = arrays[0].shape
+    flat = {name: np.ascontiguousarray(a).reshape(-1) for name, a in zip(PARAMETERS, arrays)}
+    if np.any(flat["yearsToSimulate"] != np.floor(flat["yearsToSimulate"])):
+        raise ValueError("yearsToSimulate must be whole years.")
+
+    n = flat["downPayment"].size
+    out = {name: np.empty(n) for name in RESULTS}
+    for lo in range(0, n, chunk_size):
+        block = {name: a[lo:lo + chunk_size] for name, a in flat.items()}
+        homeowner = homeowner_path(block)
+        renter = renter_path(block, homeowner["totalMonthlyCost"])
+        for name, value in {**homeowner, **renter}.items():
+            out[name][lo:lo + chunk_size] = value
+    return {name: a.reshape(shape) for name, a in out.items()}
+
+
+def parameter_grid(**axes):
+    """
+    Cartesian product of parameter axes as broadcastable arrays, e.g.
+    parameter_grid(downPayment=[...], mortgageRate=[...]). Returns (names, arrays).
+    """
+    names = list(axes)
+    grids = np.meshgrid(*(np.asarray(axes[name], dtype=np.float64) for name in names), indexing="ij")
+    return names, dict(zip(names, grids))
+
+
+# --- Scalar reference (line-by-line port of lib/simulator.ts) ---
+
+def reference_simulation(params):
+    a = {**DEFAULT_ASSUMPTIONS, **{k: params[k] for k in DEFAULT_ASSUMPTIONS if k in params}}
+    price, down = params["currentHomePrice"], params["downPayment"]
+    rate, term, years = params["mortgageRate"], params["mortgageTerm"], params["yearsToSimulate"]
+
+    principal = price * (((down / price) * 100) / 100)
+    monthly_rate = rate / 100 / 12
+    n = term * 12
+    if monthly_rate == 0:
+        monthly_mortgage = principal / n
+    else:
+        monthly_mortgage = principal * (monthly_rate * math.pow(1 + monthly_rate, n)) / (math.pow(1 + monthly_rate, n) - 1)
+
+    final_home_value = price * math.pow(1 + a["annualHomePriceGrowth"] / 100, years)
+    loan, paid = price - down, years * 12
+    if rate == 0:
+        remaining = loan - (loan / (term * 12)) * paid
+    else:
+        balance = loan * (math.pow(1 + monthly_rate, n) - math.pow(1 + monthly_rate, paid)) / (math.pow(1 + monthly_rate, n) - 1)
+        remaining = balance if balance > 0 else 0
+    total_monthly_cost = monthly_mortgage + (price * a["annualOwnershipCostRate"]) / 100 / 12
+
+    monthly_market_return = a["annualStockMarketReturn"] / 100 / 12
+    initial_monthly_rent = (price * a["initialRentalYield"]) / 100 / 12
+    months = int(years * 12)
+    investment, total_extra = down, 0.0
+    for month in range(1, months + 1):
+        investment *= 1 + monthly_market_return
+        rent = initial_monthly_rent * math.pow(1 + a["annualRentIncrease"] / 100, (month - 1) // 12)
+        extra = total_monthly_cost - rent
+        if extra > 0:
+            investment += extra
+            total_extra += extra
+
+    return {
+        "finalHomeValue": final_home_value,
+        "remainingMortgage": remaining,
+        "homeEquity": final_home_value - remaining,
+        "totalMonthlyCost": total_monthly_cost,
+        "initialInvestment": down,
+        "extraMonthlyInvestment": total_extra / months if months > 0 else 0,
+        "finalInvestmentValue": investment,
+    }
+
+
+def random_scenarios(n, seed=0):
+    rng = np.random.default_rng(seed)
+    price = rng.uniform(5e4, 5e6, n)
+    return {
+        "currentHomePrice": price,
+        "downPayment": price * rng.uniform(0.05, 0.6, n),
+        "yearsToSimulate": rng.integers(0, 41, n).astype(np.float64),
+        "mortgageRate": np.where(rng.random(n) < 0.05, 0.0, rng.uniform(0.5, 15, n)),
+        "mortgageTerm": rng.choice([10.0, 15.0, 20.0, 25.0, 30.0], n),
+        "annualHomePriceGrowth": rng.uniform(-3, 8, n),
+        "annualStockMarketReturn": np.where(rng.random(n) < 0.05, 0.0, rng.uniform(-5, 15, n)),
+        "annualRentIncrease": rng.uniform(-2, 6, n),
+        "annualOwnershipCostRate": rng.uniform(0, 3, n),
+        "initialRentalYield": rng.uniform(1, 10, n),
+    }
+
+
+def check_parity(n, rtol=1e-9, seed=0):
+    """
+    Compares run_simulation() with the scalar port on `n` random scenarios.
+    Returns the largest relative difference per result field.
+    """
+    scenarios = random_scenarios(n, seed)
+    batch = run_simulation(**scenarios)
+    worst = {name: 0.0 for name in RESULTS}
+    for i in range(n):
+        expected = reference_simulation({k: float(v[i]) for k, v in scenarios.items()})
+        for name in RESULTS:
+            worst[name] = max(worst[name], relative_diff(float(batch[name][i]), expected[name]))
+    return worst
+
+
+def relative_diff(got, want):
+    return abs(got - want) / max(abs(want), abs(got), 1.0)
+
+
+def update_golden(path=GOLDEN_FILE, n=GOLDEN_SCENARIOS, seed=GOLDEN_SEED):
+    """
+    Runs `n` random scenarios through runSimulation() of lib/simulator.ts under
+    node and stores the scenarios with its results in `path`.
+    """
+    scenarios = {name: values.tolist() for name, values in random_scenarios(n, seed).items()}
+    output = subprocess.run(
+        ["node", GOLDEN_SCRIPT], input=json.dumps(scenarios), capture_output=True, text=True, check=True
+    ).stdout
+    results = json.loads(output)
+    if any(value is None for values in results.values() for value in values):
+        raise ValueError("lib/simulator.ts returned a non-finite result; not writing golden vectors.")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"parameters": scenarios, "results": results}, f, separators=(",", ":"))
+    return n
+
+
+def check_golden(path=GOLDEN_FILE):
+    """
+    Compares run_simulation() and reference_simulation() with the results of
+    lib/simulator.ts stored in `path`. Returns (scenarios, largest relative
+    difference per result field for each engine).
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        golden = json.load(f)
+    scenarios, expected = golden["parameters"], golden["results"]
+    n = len(scenarios["downPayment"])
+    batch = run_simulation(**scenarios)
+    worst = {name: 0.0 for name in RESULTS}
+    for i in range(n):
+        reference = reference_simulation({k: v[i] for k, v in scenarios.items()})
+        for name in RESULTS:
+            want = expected[name][i]
+            worst[name] = max(worst[name], relative_diff(float(batch[name][i]), want),
+                              relative_diff(reference[name], want))
+    return n, worst
+
+
+# --- Country inputs ---
+
+def load_base_house_prices(path=BASE_PRICES_FILE):
+    """
+    Reads BASE_HOUSE_PRICES_2015 from lib/constants.ts.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        content = f.read()
+    return {code: float(price) for code, price in re.findall(r"\b([A-Z]{3}): \{\s*price: ([\d.]+)", content)}
+
+
+def country_inputs(data, base_prices):
+    """
+    Current home price and mortgage rate per country, derived as on the home page
+    (getMetricsForYear() at the last realIncome year; last mortgageRate point).
+    `data` is the packed dataset from dataset.load_packed().
+    """
+    inputs = {}
+    for country, metrics in sorted(data.items()):
+        price_index, income, rates = metrics["realHousePriceIndex"], metrics["realIncome"], metrics["mortgageRate"]
+        if country not in base_prices or not income["values"] or not price_index["values"] or not rates["values"]:
+            continue
+        end_year = income["start"] + len(income["values"]) - 1
+        index_by_year = dict(zip(range(price_index["start"], price_index["start"] + len(price_index["values"])), price_index["values"]))
+        current, base = index_by_year.get(end_year), index_by_year.get(2015, price_index["values"][0])
+        if current is None or not base:
+            continue
+        inputs[country] = {"currentHomePrice": base_prices[country] * (current / base), "mortgageRate": rates["values"][-1]}
+    return inputs
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Vectorized buy-vs-rent simulation matching lib/simulator.ts.")
+    parser.add_argument("--check", type=int, metavar="N",
+                        help="Compare with the golden vectors of lib/simulator.ts, then N random scenarios with the scalar port.")
+    parser.add_argument("--update-golden", action="store_true",
+                        help=f"Rerun lib/simulator.ts under node on {GOLDEN_SCENARIOS} scenarios and rewrite the golden vectors.")
+    parser.add_argument("--bench", type=int, metavar="N", help="Time N random scenarios.")
+    parser.add_argument("--grid", metavar="PATH", help="Simulate every country over the default parameter grid and save an .npz.")
+    args = parser.parse_args()
+
+    if args.update_golden:
+        n = update_golden()
+        print(f"✅ Golden vectors of {n} scenarios from lib/simulator.ts written to {GOLDEN_FILE}")
+
+    if args.check:
+        n, worst = check_golden()
+        for name, diff in worst.items():
+            print(f"{name:<24} max rel diff {diff:.2e}")
+        if max(worst.values()) > 1e-9:
+            print("❌ Golden vector check against lib/simulator.ts failed.")
+            sys.exit(1)
+        print(f"✅ {n:,} golden scenarios of lib/simulator.ts match the NumPy engine and the scalar port.")
+
+        worst = check_parity(args.check)
+        for name, diff in worst.items():
+            print(f"{name:<24} max rel diff {diff:.2e}")
+        if max(worst.values()) > 1e-9:
+            print("❌ Parity check failed.")
+            sys.exit(1)
+        print(f"✅ {args.check:,} random scenarios match the scalar port.")
+
+    if args.bench:
+        scenarios = random_scenarios(args.bench)
+        start = time.perf_counter()
+        run_simulation(**scenarios)
+        elapsed = time.perf_counter() - start
+        print(f"{args.bench:,} scenarios in {elapsed:.3f}s ({args.bench / elapsed:,.0f} scenarios/s)")
+
+    if args.grid:
+        from dataset import load_packed
+
+        data = load_packed(project_path("data", "affordability.ts"))
+        inputs = country_inputs(data, load_base_house_prices())
+        down_share = np.linspace(0.05, 0.5, 10)
+        axes = {
+            "downPaymentShare": down_share,
+            "mortgageTerm": np.array([15.0, 20.0, 25.0, 30.0]),
+            "yearsToSimulate": np.arange(5.0, 31.0, 5.0),
+            "annualHomePriceGrowth": np.linspace(0, 6, 7),
+            "annualStockMarketReturn": np.linspace(2, 10, 9),
+        }
+        names, grid = parameter_grid(**axes)
+        out = {f"axis_{name}": values for name, values in axes.items()}
+        start = time.perf_counter()
+        for country, inp in inputs.items():
+            result = run_simulation(
+                currentHomePrice=inp["currentHomePrice"],
+                mortgageRate=inp["mortgageRate"],
+                downPayment=inp["currentHomePrice"] * grid["downPaymentShare"],
+                mortgageTerm=grid["mortgageTerm"],
+                yearsToSimulate=grid["yearsToSimulate"],
+                annualHomePriceGrowth=grid["annualHomePriceGrowth"],
+                annualStockMarketReturn=grid["annualStockMarketReturn"],
+            )
+            out[f"{country}_homeEquity"] = result["homeEquity"]
+            out[f"{country}_finalInvestmentValue"] = result["finalInvestmentValue"]
+        elapsed = time.perf_counter() - start
+        np.savez_compressed(args.grid, **out)
+        print(f"{len(inputs)} countries x {grid['mortgageTerm'].size:,} scenarios in {elapsed:.2f}s -> {args.grid}")
@@ -0,0 +1,75 @@
+// Runs runSimulation() from lib/simulator.ts on a batch of scenarios, for the
+// golden vectors `python simulator.py --update-golden` writes.
+//
+// Reads {parameter: [values]} (the SimulationParams and SimulationAssumptions
+// fields) as JSON on stdin and prints {result field: [values]} as JSON.
+//
+// The .ts sources are transpiled with the project's `typescript` devDependency
+// when it is installed (npm install). Without it, the type annotations these
+// two files use are stripped by stripTypes(); evaluation fails loudly if that
+// ever stops being enough.
+import { readFileSync } from "node:fs";
+import { createRequire } from "node:module";
+import { dirname, join } from "node:path";
+import { fileURLToPath } from "node:url";
+
+const LIB_DIR = join(dirname(fileURLToPath(import.meta.url)), "..", "lib");
+const SOURCES = ["metrics.ts", "simulator.ts"];
+const ASSUMPTIONS = [
+  "annualHomePriceGrowth",
+  "annualStockMarketReturn",
+  "annualRentIncrease",
+  "annualOwnershipCostRate",
+  "initialRentalYield",
+];
+const RESULTS = {
+  homeowner: ["finalHomeValue", "remainingMortgage", "homeEquity", "totalMonthlyCost"],
+  renter: ["initialInvestment", "extraMonthlyInvestment", "finalInvestmentValue"],
+};
+
+function stripTypes(source) {
+  return source
+    .replace(/^import .*;$/gm, "")
+    .replace(/export interface \w+ \{[^}]*\}/g, "")
+    .replace(/\)\s*:\s*(\{[^{}]*\}|[\w.]+(\[\])?)\s*\{/g, ") {")
+    .replace(/function (\w+)\(([^)]*)\)/g, (_, name, params) =>
+      `function ${name}(${params.replace(/:\s*[\w.]+(\[\])?/g, "")})`)
+    .replace(/^export /gm, "");
+}
+
+function transpile(source) {
+  try {
+    const ts = createRequire(join(LIB_DIR, "..", "package.json"))("typescript");
+    const { outputText } = ts.transpileModule(source, {
+      compilerOptions: { module: ts.ModuleKind.ESNext, target: ts.ScriptTarget.ES2020 },
+    });
+    return outputText.replace(/^import .*;$/gm, "").replace(/^export /gm, "");
+  } catch (e) {
+    if (e.code !== "MODULE_NOT_FOUND") throw e;
+    return stripTypes(source);
+  }
+}
+
+function loadSimulator() {
+  const code = SOURCES.map((name) => transpile(readFileSync(join(LIB_DIR, name), "utf8"))).join("\n");
+  return new Function(`${code}\nreturn runSimulation;`)();
+}
+
+const runSimulation = loadSimulator();
+const scenarios = JSON.parse(readFileSync(0, "utf8"));
+const n = scenarios.downPayment.length;
+const results = Object.fromEntries(Object.values(RESULTS).flat().map((name) => [name, []]));
+for (let i = 0; i < n; i++) {
+  const result = runSimulation({
+    downPayment: scenarios.downPayment[i],
+    yearsToSimulate: scenarios.yearsToSimulate[i],
+    currentHomePrice: scenarios.currentHomePrice[i],
+    mortgageRate: scenarios.mortgageRate[i],
+    mortgageTerm: scenarios.mortgageTerm[i],
+    assumptions: Object.fromEntries(ASSUMPTIONS.map((name) => [name, scenarios[name][i]])),
+  });
+  for (const [side, names] of Object.entries(RESULTS)) {
+    for (const name of names) results[name].push(result[side][name]);
+  }
+}
+process.stdout.write(JSON.stringify(results));
@@ -0,0 +1,166 @@
+"""
+Compact, array-backed series for the intermediate state of 01_fetch_affordability_data.py.
+
+Between stages every (country, metric) series is a TimeSeries instead of a list
+of {'year', 'value'} dicts: the period index of its first slot, its frequency,
+one contiguous float64 array and a boolean mask of the slots that hold an
+observation (unobserved slots are NaN). Stages read and build the arrays
+directly, and series are only turned into point records when the output files
+are written (to_records()).
+
+Period indexes are those of periods.period_index(): for annual series the index is
+the year itself; a quarterly series counts year * 4 + quarter - 1.
+"""
+import math
+
+import numpy as np
+
+
+class TimeSeries:
+    """
+    One series on a regular grid. `values[i]` is the observation of period
+    `start + i` when `mask[i]` is set, NaN otherwise.
+    """
+    __slots__ = ("start", "freq", "values", "mask")
+
+    def __init__(self, start, values, mask=None, freq=1):
+        self.start = int(start)
+        self.freq = int(freq)
+        self.values = np.asarray(values, dtype=np.float64)
+        self.mask = ~np.isnan(self.values) if mask is None else np.asarray(mask, dtype=bool)
+
+    @classmethod
+    def empty(cls, freq=1):
+        return cls(0, np.empty(0), np.empty(0, dtype=bool), freq)
+
+    @classmethod
+    def from_points(cls, index, values, freq=1):
+        """
+        Builds a series from (period index, value) pairs in any order. Repeated
+        periods keep their first value.
+        """
+        index = np.asarray(index, dtype=np.int64)
+        if not len(index):
+            return cls.empty(freq)
+        start = int(index.min())
+        slots = index - start
+        _, first = np.unique(slots, return_index=True)
+        data = np.full(int(slots.max()) + 1, np.nan)
+        mask = np.zeros(len(data), dtype=bool)
+        data[slots[first]] = np.asarray(values, dtype=np.float64)[first]
+        mask[slots[first]] = True
+        return cls(start, data, mask, freq)
+
+    @classmethod
+    def from_packed(cls, packed):
+        """
+        Inverse of to_packed().
+        """
+        if packed["start"] is None:
+            return cls.empty(packed.get("freq", 1))
+        values = np.array([np.nan if v is None else v for v in packed["values"]], dtype=np.float64)
+        return cls(packed["start"], values, freq=packed.get("freq", 1))
+
+    def __len__(self):
+        """
+        Number of observations.
+        """
+        return int(np.count_nonzero(self.mask))
+
+    def __repr__(self):
+        return f"TimeSeries(start={self.start}, freq={self.freq}, observations={len(self)})"
+
+    def index(self):
+        """
+        Period indexes of the observations.
+        """
+        return self.start + np.flatnonzero(self.mask)
+
+    def observations(self):
+        """
+        (period indexes, values) of the observations.
+        """
+        return self.index(), self.values[self.mask]
+
+    def span(self):
+        """
+        (first, last) observed period index, or None when the series is empty.
+        """
+        observed = np.flatnonzero(self.mask)
+        if not len(observed):
+            return None
+        return self.start + int(observed[0]), self.start + int(observed[-1])
+
+    def trim(self):
+        """
+        The series cut to its first and last observation.
+        """
+        span = self.span()
+        if span is None:
+            return TimeSeries.empty(self.freq)
+        lo, hi = span[0] - self.start, span[1] - self.start + 1
+        if lo == 0 and hi == len(self.values):
+            return self
+        return TimeSeries(span[0], self.values[lo:hi], self.mask[lo:hi], self.freq)
+
+    def between(self, first_year, last_year):
+        """
+        The slots of years `first_year` through `last_year` (views, not copies).
+        """
+        lo = max(first_year * self.freq, self.start)
+        hi = min((last_year + 1) * self.freq, self.start + len(self.values))
+        if lo >= hi:
+            return TimeSeries.empty(self.freq)
+        return TimeSeries(lo, self.values[lo - self.start:hi - self.start], self.mask[lo - self.start:hi - self.start], self.freq)
+
+    def annual(self, decimals=4):
+        """
+        Annual series of the yearly means of the observations; annual series are returned as they are.
+        """
+        if self.freq == 1:
+            return self
+        index, values = self.observations()
+        if not len(index):
+            return TimeSeries.empty()
+        years = index // self.freq
+        starts = np.flatnonzero(np.diff(years, prepend=years[0] - 1))
+        # Exactly rounded sums, so a year's mean does not depend on the order of its periods.
+        means = [math.fsum(chunk) / len(chunk) for chunk in np.split(values, starts[1:])]
+        return TimeSeries.from_points(years[starts], np.round(means, decimals))
+
+    def to_packed(self):
+        """
+        {'start': first period, 'values': [...]} with None for unobserved periods
+        (plus 'freq' when sub-annual), the layout of dataset.pack_series().
+        """
+        trimmed = self.trim()
+        packed = {"start": None, "values": []}
+        if len(trimmed.values):
+            values = trimmed.values.tolist()
+            packed = {
+                "start": trimmed.start,
+                "values": values if trimmed.mask.all() else [v if m else None for v, m in zip(values, trimmed.mask.tolist())],
+            }
+        if self.freq != 1:
+            packed["freq"] = self.freq
+        return packed
+
+    def to_records(self):
+        """
+        [{'year', 'value'}, ...] of the observations ('period' and 'freq' are added when sub-annual).
+        """
+        index, values = self.observations()
+        if self.freq == 1:
+            return [{'year': y, 'value': v} for y, v in zip(index.tolist(), values.tolist())]
+        years, periods = (index // self.freq).tolist(), (index % self.freq + 1).tolist()
+        return [
+            {'year': y, 'period': p, 'freq': self.freq, 'value': v}
+            for y, p, v in zip(years, periods, values.tolist())
+        ]
+
+
+def to_records(data):
+    """
+    {country: {metric: TimeSeries}} -> {country: {metric: [{'year', 'value'}, ...]}}.
+    """
+    return {country: {metric: series.to_records() for metric, series in metrics.items()} for country, metrics in data.items()}
@@ -0,0 +1,406 @@
+"""
+Data-quality checks on the synchronized dataset, run by 01_fetch_affordability_data.py
+between synchronize_data() and emission.
+
+Every (country, metric) series becomes one row of a series x year panel, and
+each check is a handful of array operations over the whole panel:
+
+- yoy_jump: a year-over-year change beyond the metric's limits. Changes are
+  relative for indexes and levels, absolute (percentage points) for rates.
+- zscore: a change that is an outlier against the series' own preceding
+  ZSCORE_WINDOW changes.
+- level_shift: a break where the mean level of the LEVEL_SHIFT_WINDOW years
+  from a year on differs from the years before it by many times their spread,
+  e.g. a badly spliced or rebased index, or a unit change.
+- revision: the series differs from the previously generated dataset across
+  the board (median over the years both have), e.g. a rebased index. When the
+  build settings changed since that dataset (a new --base-year or --deflator),
+  revisions are expected and reported as warnings only.
+- dropped / shortened: a series of the previous dataset is gone, or ends earlier.
+
+Each finding is a warning or an error according to THRESHOLDS. The report is
+written as JSON, and by default any error stops the build before data/ is written.
+"""
+import datetime
+import json
+import os
+import warnings
+
+import numpy as np
+
+from dataset import load_packed
+from paths import project_path
+from timeseries import TimeSeries
+
+VALIDATION_REPORT_PATH = project_path("_artifacts", "validation_report.json")
+
+# Metrics whose changes are measured in absolute terms (percentage points);
+# all others change relative to their previous value.
+ABSOLUTE_METRICS = {"mortgageRate"}
+
+# (warning, error) limits per check and metric, in the metric's unit of change
+# (a fraction for relative metrics, percentage points for absolute ones).
+# None disables that level.
+THRESHOLDS = {
+    # |Year-over-year change|.
+    "yoy_jump": {
+        "realHousePriceIndex": (0.25, 0.75),
+        "rentPriceIndex": (0.20, 0.75),
+        "realIncome": (0.15, 0.50),
+        "numberOfHouseholds": (0.10, 0.40),
+        "mortgageRate": (4.0, 20.0),
+    },
+    # |Mean level after a break / mean level before - 1| (difference for absolute metrics).
+    "level_shift": {
+        "realHousePriceIndex": (0.15, 0.40),
+        "rentPriceIndex": (0.15, 0.40),
+        "realIncome": (0.10, 0.30),
+        "numberOfHouseholds": (0.10, 0.30),
+        "mortgageRate": (1.5, 3.0),
+    },
+    # Median |revision| against the previous dataset over the years both have.
+    "revision": {
+        "realHousePriceIndex": (0.02, 0.10),
+        "rentPriceIndex": (0.02, 0.10),
+        "realIncome": (0.02, 0.10),
+        "numberOfHouseholds": (0.02, 0.10),
+        "mortgageRate": (0.25, 1.0),
+    },
+}
+DEFAULT_LIMITS = {"relative": (0.25, None), "absolute": (2.0, None)}
+
+# A change is compared with the mean and standard deviation of the series'
+# preceding ZSCORE_WINDOW changes, once at least ZSCORE_MIN_PERIODS of them exist.
+ZSCORE_WINDOW = 10
+ZSCORE_MIN_PERIODS = 5
+ZSCORE_LIMITS = (5.0, None)
+# Smaller deviations from the rolling mean are never outliers. Interpolated
+# stretches change by a constant amount, so their standard deviation is ~0.
+ZSCORE_MIN_DEVIATION = {"relative": 0.05, "absolute": 0.75}
+
+# Years averaged on each side of a candidate break, and how many pooled
+# standard deviations of those years the two means must differ by.
+LEVEL_SHIFT_WINDOW = 5
+LEVEL_SHIFT_SIGMAS = 8.0
+# Floor of the standard deviations above, so perfectly steady stretches give large but finite scores.
+MIN_SPREAD = 1e-9
+
+# Panel rows checked at a time, so the temporaries of the checks stay in cache.
+BLOCK_ROWS = 2048
+
+CHECKS = ["yoy_jump", "zscore", "level_shift", "revision", "dropped", "shortened"]
+
+
+def build_panel(data, keys=None):
+    """
+    Stacks {country: {metric: TimeSeries}} (annual) into a series x year panel.
+    Returns (keys, first_year, panel); `keys` lists the (country, metric) of each
+    row, and missing values are NaN.
+    """
+    if keys is None:
+        keys = [(country, metric) for country in sorted(data) for metric in data[country]]
+    # Unobserved slots are already NaN, so every series is copied as it is.
+    rows = [data.get(country, {}).get(metric) for country, metric in keys]
+    rows = [series if series is not None and len(series.values) else None for series in rows]
+    placed = [series for series in rows if series is not None]
+    if not placed:
+        return keys, 0, np.full((len(keys), 0), np.nan)
+    first_year = min(series.start for series in placed)
+    end = max(series.start + len(series.values) for series in placed)
+    panel = np.full((len(keys), end - first_year), np.nan)
+    for row, series in enumerate(rows):
+        if series is not None:
+            offset = series.start - first_year
+            panel[row, offset:offset + len(series.values)] = series.values
+    return keys, first_year, panel
+
+
+def row_limits(keys, check, level):
+    """
+    The `level` (0: warning, 1: error) limit of `check` for every row; inf where disabled.
+    """
+    by_metric = {}
+    for metric in {metric for _, metric in keys}:
+        default = DEFAULT_LIMITS["absolute" if metric in ABSOLUTE_METRICS else "relative"]
+        limit = THRESHOLDS[check].get(metric, default)[level]
+        by_metric[metric] = np.inf if limit is None else limit
+    return np.array([by_metric[metric] for _, metric in keys], dtype=float)
+
+
+def yoy_changes(panel, absolute):
+    """
+    Change from the previous year at every panel position (NaN in the first column
+    and next to missing years). Relative changes are NaN where the previous value is <= 0.
+    """
+    change = np.full(panel.shape, np.nan)
+    previous, current = panel[:, :-1], panel[:, 1:]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        relative = np.where(previous > 0, current / previous - 1, np.nan)
+    change[:, 1:] = np.where(absolute[:, None], current - previous, relative)
+    return change
+
+
+def window_sums(values, window):
+    """
+    Sums, sums of squares and counts of the non-NaN `values` in the `window`
+    positions before each position.
+    """
+    filled = np.nan_to_num(values)
+    n_rows, n_columns = values.shape
+    sums = []
+    for terms in (filled, filled * filled, ~np.isnan(values)):
+        # prefix[:, e] is the sum of the positions before e.
+        prefix = np.zeros((n_rows, n_columns + 1))
+        np.cumsum(terms, axis=1, out=prefix[:, 1:])
+        window_sum = prefix[:, :n_columns].copy()
+        window_sum[:, window:] -= prefix[:, :n_columns - window]
+        sums.append(window_sum)
+    return tuple(sums)
+
+
+def rolling_zscores(change, absolute):
+    """
+    z-score of every change against the mean and sample standard deviation of
+    the ZSCORE_WINDOW changes before it (NaN with fewer than ZSCORE_MIN_PERIODS),
+    set to 0 where the deviation is below ZSCORE_MIN_DEVIATION.
+    """
+    total, square, count = window_sums(change, ZSCORE_WINDOW)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mean = total / count
+        std = np.sqrt(np.maximum(square - count * mean * mean, 0) / (count - 1))
+        deviation = change - mean
+        z = deviation / np.maximum(std, MIN_SPREAD)
+    min_deviation = np.where(absolute, ZSCORE_MIN_DEVIATION["absolute"], ZSCORE_MIN_DEVIATION["relative"])
+    z = np.where(np.abs(deviation) < min_deviation[:, None], 0.0, z)
+    return np.where(count >= ZSCORE_MIN_PERIODS, z, np.nan)
+
+
+def level_shifts(panel, absolute, window=LEVEL_SHIFT_WINDOW):
+    """
+    For every year t, the shift between the mean level of years [t, t + window)
+    and [t - window, t) (log levels for relative metrics), and that shift in
+    pooled standard deviations of the two windows. NaN unless both windows are complete.
+    """
+    n_years = panel.shape[1]
+    shift = np.full(panel.shape, np.nan)
+    sigmas = np.full(panel.shape, np.nan)
+    if n_years < 2 * window:
+        return shift, sigmas
+    with np.errstate(divide="ignore", invalid="ignore"):
+        levels = np.where(absolute[:, None], panel, np.log(np.where(panel > 0, panel, np.nan)))
+    total, square, count = window_sums(np.concatenate([levels, np.full((len(panel), 1), np.nan)], axis=1), window)
+    # Window sums ending at t cover [t - window, t); those ending at t + window cover [t, t + window).
+    t = np.arange(window, n_years - window + 1)
+    before, after = t, t + window
+    complete = (count[:, before] == window) & (count[:, after] == window)
+    mean_before, mean_after = total[:, before] / window, total[:, after] / window
+    var_before = np.maximum(square[:, before] / window - mean_before ** 2, 0)
+    var_after = np.maximum(square[:, after] / window - mean_after ** 2, 0)
+    difference = mean_after - mean_before
+    with np.errstate(divide="ignore", invalid="ignore"):
+        shift[:, t] = np.where(complete, np.where(absolute[:, None], difference, np.expm1(difference)), np.nan)
+        sigmas[:, t] = np.where(complete, np.abs(difference) / np.maximum(np.sqrt((var_before + var_after) / 2), MIN_SPREAD), np.nan)
+    return shift, sigmas
+
+
+def local_maxima(values):
+    """
+    True where a value is at least as large as both its neighbours (NaN counts as -inf).
+    """
+    filled = np.where(np.isnan(values), -np.inf, values)
+    padded = np.pad(filled, ((0, 0), (1, 1)), constant_values=-np.inf)
+    return (filled >= padded[:, :-2]) & (filled >= padded[:, 2:]) & ~np.isnan(values)
+
+
+def flag(findings, check, keys, first_year, values, warn, error, extra=None):
+    """
+    Appends a finding for every value whose magnitude exceeds its row's warning
+    limit; beyond the error limit it is an error. `values` is a panel, or one
+    value per row for series-level checks (reported without a year).
+    """
+    per_year = values.ndim == 2
+    values = values if per_year else values[:, None]
+    magnitude = np.abs(np.nan_to_num(values, nan=0.0))
+    warn, error = np.asarray(warn)[:, None], np.asarray(error)[:, None]
+    rows, columns = np.nonzero(magnitude > warn)
+    is_error = magnitude[rows, columns] > error[rows, 0]
+    for row, column, severe in zip(rows.tolist(), columns.tolist(), is_error.tolist()):
+        country, metric = keys[row]
+        finding = {
+            "check": check,
+            "severity": "error" if severe else "warning",
+            "country": country,
+            "metric": metric,
+            "year": first_year + column if per_year else None,
+            "value": round(float(values[row, column]), 6),
+            "limit": float(error[row, 0] if severe else warn[row, 0]),
+        }
+        if extra is not None:
+            finding.update(extra(row, column))
+        findings.append(finding)
+
+
+def compare_previous(findings, keys, first_year, panel, previous, absolute):
+    """
+    Revisions, dropped and shortened series against the previous dataset.
+    """
+    previous_keys = [
+        (country, metric) for country in sorted(previous) for metric, series in previous[country].items() if len(series)
+    ]
+    row_of = {key: row for row, key in enumerate(keys)}
+    observed = ~np.isnan(panel).all(axis=1)
+    shared = [key for key in previous_keys if key in row_of and observed[row_of[key]]]
+    shared_keys = set(shared)
+    for country, metric in previous_keys:
+        if (country, metric) not in shared_keys:
+            findings.append({
+                "check": "dropped", "severity": "error", "country": country, "metric": metric,
+                "year": None, "value": float(len(previous[country][metric])), "limit": 0.0,
+            })
+    if not shared:
+        return
+
+    _, old_first, old = build_panel(previous, shared)
+    new = panel[[row_of[key] for key in shared]]
+    # Align both panels on the union of their years.
+    lo, hi = min(first_year, old_first), max(first_year + new.shape[1], old_first + old.shape[1])
+    aligned_new = np.full((len(shared), hi - lo), np.nan)
+    aligned_old = np.full_like(aligned_new, np.nan)
+    aligned_new[:, first_year - lo:first_year - lo + new.shape[1]] = new
+    aligned_old[:, old_first - lo:old_first - lo + old.shape[1]] = old
+    shared_absolute = np.asarray([key[1] in ABSOLUTE_METRICS for key in shared])
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        relative = np.where(aligned_old > 0, aligned_new / aligned_old - 1, np.nan)
+    revision = np.abs(np.where(shared_absolute[:, None], aligned_new - aligned_old, relative))
+    with warnings.catch_warnings():
+        # Series without common years have no median.
+        warnings.simplefilter("ignore", RuntimeWarning)
+        median = np.nanmedian(revision, axis=1)
+        largest = np.nanmax(revision, axis=1)
+    flag(
+        findings, "revision", shared, lo, median,
+        row_limits(shared, "revision", 0), row_limits(shared, "revision", 1),
+        extra=lambda row, _: {"max": round(float(largest[row]), 6)},
+    )
+
+    years = np.arange(lo, hi)
+    old_end = np.where(np.isfinite(aligned_old), years, -1).max(axis=1)
+    new_end = np.where(np.isfinite(aligned_new), years, -1).max(axis=1)
+    for row in np.flatnonzero(new_end < old_end).tolist():
+        country, metric = shared[row]
+        findings.append({
+            "check": "shortened", "severity": "warning", "country": country, "metric": metric,
+            "year": int(new_end[row]), "value": float(old_end[row] - new_end[row]), "limit": 0.0,
+        })
+
+
+def check_block(findings, keys, first_year, panel, absolute):
+    """
+    Year-over-year, z-score and level-shift checks of a block of panel rows.
+    """
+    change = yoy_changes(panel, absolute)
+    flag(findings, "yoy_jump", keys, first_year, change,
+         row_limits(keys, "yoy_jump", 0), row_limits(keys, "yoy_jump", 1))
+
+    z = rolling_zscores(change, absolute)
+    warn, error = ZSCORE_LIMITS
+    flag(findings, "zscore", keys, first_year, z,
+         np.full(len(keys), warn), np.full(len(keys), np.inf if error is None else error),
+         extra=lambda row, column: {"change": round(float(change[row, column]), 6)})
+
+    shift, sigmas = level_shifts(panel, absolute)
+    # One finding per break: the year where the separation peaks, if it is large enough.
+    breaks = local_maxima(sigmas) & (sigmas > LEVEL_SHIFT_SIGMAS)
+    flag(findings, "level_shift", keys, first_year, np.where(breaks, shift, np.nan),
+         row_limits(keys, "level_shift", 0), row_limits(keys, "level_shift", 1),
+         extra=lambda row, column: {"sigmas": round(float(sigmas[row, column]), 2)})
+
+
+def validate(data, previous=None, config_changes=None):
+    """
+    Runs every check on {country: {metric: TimeSeries}} (annual), comparing with
+    the `previous` dataset when given. `config_changes` ({setting: [previous,
+    current]}) lists the build settings that differ from the previous dataset's;
+    revisions are then expected and never errors. Returns the JSON-ready report.
+    """
+    keys, first_year, panel = build_panel(data)
+    absolute = np.asarray([metric in ABSOLUTE_METRICS for _, metric in keys], dtype=bool)
+    findings = []
+    for lo in range(0, len(keys), BLOCK_ROWS):
+        block = slice(lo, lo + BLOCK_ROWS)
+        check_block(findings, keys[block], first_year, panel[block], absolute[block])
+
+    if previous is not None:
+        compare_previous(findings, keys, first_year, panel, previous, absolute)
+        if config_changes:
+            for finding in findings:
+                if finding["check"] == "revision":
+                    finding["severity"] = "warning"
+
+    by_check = {check: {"warning": 0, "error": 0} for check in CHECKS}
+    for finding in findings:
+        by_check[finding["check"]][finding["severity"]] += 1
+    findings.sort(key=lambda f: (f["severity"] != "error", CHECKS.index(f["check"]), f["country"], f["metric"], f["year"] or 0))
+    return {
+        "created_at": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+        "series": len(keys),
+        "years": [first_year, first_year + panel.shape[1] - 1] if panel.shape[1] else None,
+        "compared_with_previous": previous is not None,
+        "config_changes": config_changes or {},
+        "thresholds": {
+            **THRESHOLDS,
+            "zscore": {"limits": ZSCORE_LIMITS, "window": ZSCORE_WINDOW, "min_periods": ZSCORE_MIN_PERIODS,
+                       "min_deviation": ZSCORE_MIN_DEVIATION},
+            "level_shift_window": LEVEL_SHIFT_WINDOW,
+            "level_shift_sigmas": LEVEL_SHIFT_SIGMAS,
+        },
+        "errors": sum(counts["error"] for counts in by_check.values()),
+        "warnings": sum(counts["warning"] for counts in by_check.values()),
+        "by_check": by_check,
+        "findings": findings,
+    }
+
+
+def load_previous(ts_path):
+    """
+    The previously generated dataset as {country: {metric: TimeSeries}}, or None
+    when there is none or it cannot be read.
+    """
+    if not os.path.exists(ts_path):
+        return None
+    try:
+        packed = load_packed(ts_path)
+    except (OSError, ValueError) as e:
+        print(f"  - WARNING: Could not read the previous dataset {ts_path} ({e}). Skipping the comparison.")
+        return None
+    return {
+        country: {metric: TimeSeries.from_packed(series) for metric, series in metrics.items()}
+        for country, metrics in packed.items()
+    }
+
+
+def save_report(report, path=VALIDATION_REPORT_PATH):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+
+
+def print_report(report, shown=15):
+    """
+    Prints the finding counts per check and the first `shown` findings (errors first).
+    """
+    print("\n--- Validation ---")
+    if report.get("config_changes"):
+        changes = ", ".join(f"{key} {old} -> {new}" for key, (old, new) in report["config_changes"].items())
+        print(f"Build settings changed since the previous dataset ({changes}): revisions are warnings only.")
+    print(f"{'CHECK':<14} {'WARNINGS':>9} {'ERRORS':>7}")
+    for check, counts in report["by_check"].items():
+        print(f"{check:<14} {counts['warning']:>9} {counts['error']:>7}")
+    for finding in report["findings"][:shown]:
+        icon = "❌" if finding["severity"] == "error" else "⚠️ "
+        year = f" {finding['year']}" if finding["year"] is not None else ""
+        print(f"  {icon} {finding['check']:<12} {finding['country']} {finding['metric']}{year}: "
+              f"{finding['value']:g} (limit {finding['limit']:g})")
+    if len(report["findings"]) > shown:
+        print(f"  ... {len(report['findings']) - shown} more in the report.")